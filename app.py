@@ -1,23 +1,38 @@
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import io
 import time
 import requests
 import httpx
 import asyncio
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from flask import Flask, jsonify, render_template, request, g, session, redirect, url_for
+from urllib.parse import urlparse
+import click
+from flask import Flask, Response, jsonify, render_template, request, g, session, redirect, url_for, send_file
+from werkzeug.utils import secure_filename
+from flask.json.provider import DefaultJSONProvider
 import secrets
 from functools import wraps
 from flask_sqlalchemy import SQLAlchemy
 from dotenv import load_dotenv
-import stripe
 from flask_babel import Babel, _
-from facebook_business.api import FacebookAdsApi
-from facebook_business.adobjects.adaccount import AdAccount
-from facebook_business.exceptions import FacebookRequestError
 import google_ai
+from bootstrap import once
+import crawler
+from background_loop import run_on_loop
+from auth_cache import AuthCache, AuthenticatedUser
+from jobs import JobQueue
+import database
+from database import WriteQueue
+from webhooks import EventApplier
+from versions import VersionCounter
+from scaffolds import scaffold
+import website_spec
+from rate_limit import RateLimiter
+import metrics
+import tracing
+from profiler import profiler
 import json
 import sqlite3
 
@@ -64,19 +79,59 @@ class Payment(db.Model):
     def __repr__(self):
         return f'<Payment {self.id}>'
 
+class StripeEvent(db.Model):
+    """Stripe webhook deliveries, keyed by event id so that retries are recognized (see webhooks.py)."""
+    id = db.Column(db.String(255), primary_key=True)
+    type = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    retry_at = db.Column(db.Float, nullable=True)
+    created = db.Column(db.Integer, nullable=True)
+    received_at = db.Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return f'<StripeEvent {self.id}>'
+
 # --- Flask App Setup ---
-app = Flask(__name__, template_folder='frontend/templates', static_folder='frontend/static')
+class TracedJSONProvider(DefaultJSONProvider):
+    """Records the JSON serialization of every jsonify() response as a span."""
+
+    def response(self, *args, **kwargs):
+        with tracing.tracer.span('response.serialize'):
+            return super().response(*args, **kwargs)
+
+# INSTANCE_PATH moves the instance folder (SQLite databases, version files) elsewhere.
+app = Flask(__name__, template_folder='frontend/templates', static_folder='frontend/static',
+            instance_path=os.path.abspath(os.environ['INSTANCE_PATH']) if os.environ.get('INSTANCE_PATH') else None)
+app.json = TracedJSONProvider(app)
 app.config['SECRET_KEY'] = secrets.token_hex(16)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///project.db'
+# DATABASE_URL and the pool / SQLite settings are documented in .env.example and database.py.
+app.config['SQLALCHEMY_DATABASE_URI'] = database.database_uri()
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database.engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['LANGUAGES'] = LANGUAGES
 app.config['BABEL_DEFAULT_LOCALE'] = 'en'
 babel = Babel()
 db.init_app(app)
-stripe.api_key = os.environ.get("STRIPE_SECRET_KEY")
+with app.app_context():
+    database.configure_sqlite(db.engine)
+# On SQLite, payment and subscription writes are committed by a single writer thread.
+db_writes = WriteQueue.from_env(app, db)
+
+# --- Stripe Integration ---
+@once
+def get_stripe():
+    """Imports and configures the Stripe SDK on first use."""
+    import stripe
+    stripe.api_key = os.environ.get("STRIPE_SECRET_KEY")
+    return stripe
 
 # --- Meta/Facebook Business SDK Integration ---
+@once
 def initialize_meta_sdk():
-    """Initializes the Meta Business SDK."""
+    """Initializes the Meta Business SDK. Runs once, before the first Meta API call."""
+    from facebook_business.api import FacebookAdsApi
     meta_app_id = os.environ.get('META_APP_ID')
     meta_app_secret = os.environ.get('META_APP_SECRET')
     meta_access_token = os.environ.get('META_ACCESS_TOKEN')
@@ -89,10 +144,6 @@ def initialize_meta_sdk():
     else:
         print("Meta Business SDK credentials not found in environment variables. Skipping initialization.")
 
-with app.app_context():
-    initialize_meta_sdk()
-    google_ai.init_vertexai()
-
 def get_locale():
     if 'language' in session:
         return session['language']
@@ -150,17 +201,12 @@ def get_weather(prompt):
     except Exception as e:
         return _("An unexpected error occurred: %(error)s", error=e)
 
-def generate_game(prompt):
-    name = _("Guess the Number")
-    description = _("A simple number guessing game.")
-    for line in prompt.splitlines():
-        if ':' in line:
-            key, value = line.split(':', 1)
-            if key.strip().lower() == 'name':
-                name = value.strip()
-            elif key.strip().lower() == 'description':
-                description = value.strip()
-
+# Scaffolds render once per locale with markers for their fields; see scaffolds.py.
+@scaffold('name', 'description', defaults=lambda: {
+    'name': _("Guess the Number"),
+    'description': _("A simple number guessing game."),
+})
+def game_scaffold(name, description):
     html_content = f"""
 <!DOCTYPE html>
 <html lang="en">
@@ -216,33 +262,18 @@ document.addEventListener('DOMContentLoaded', () => {{
     }});
 }});
 """
-    response_message = f"""
-{_("Here is the generated code for your game.")}
-**index.html:**
-```html
-{html_content.strip()}
-```
-**style.css:**
-```css
-{css_content.strip()}
-```
-**script.js:**
-```javascript
-{js_content.strip()}
-```
-"""
-    return response_message.strip()
+    return _("Here is the generated code for your game."), {
+        'index.html': html_content, 'style.css': css_content, 'script.js': js_content,
+    }
 
-def generate_app(prompt):
-    name = _("To-Do App")
-    description = _("A simple to-do list application.")
-    for line in prompt.splitlines():
-        if ':' in line:
-            key, value = line.split(':', 1)
-            if key.strip().lower() == 'name':
-                name = value.strip()
-            elif key.strip().lower() == 'description':
-                description = value.strip()
+def generate_game(prompt):
+    return game_scaffold.message(**game_scaffold.values(prompt))
+
+@scaffold('name', 'description', defaults=lambda: {
+    'name': _("To-Do App"),
+    'description': _("A simple to-do list application."),
+})
+def app_scaffold(name, description):
     html_content = f"""
 <!DOCTYPE html>
 <html lang="en">
@@ -296,70 +327,23 @@ document.addEventListener('DOMContentLoaded', () => {{
     }}
 }});
 """
-    response_message = f"""
-{_("Here is the generated code for your app.")}
-**index.html:**
-```html
-{html_content.strip()}
-```
-**style.css:**
-```css
-{css_content.strip()}
-```
-**script.js:**
-```javascript
-{js_content.strip()}
-```
-"""
-    return response_message.strip()
+    return _("Here is the generated code for your app."), {
+        'index.html': html_content, 'style.css': css_content, 'script.js': js_content,
+    }
 
-def generate_website(prompt):
-    import datetime
-    structure = {'sections': []}
-    current_section = None
-    errors = []
-    for i, line in enumerate(prompt.splitlines()):
-        if not line.strip():
-            continue
-        indentation = len(line) - len(line.lstrip(' '))
-        try:
-            key, value = line.strip().split(':', 1)
-            key = key.strip().lower()
-            value = value.strip()
-        except ValueError:
-            return _("Error on line %(line_number)s: Invalid format. Each line must be in 'key: value' format.", line_number=i+1)
-
-        if indentation == 0:
-            if key == 'section':
-                current_section = {'title': value, 'content': {}}
-                structure['sections'].append(current_section)
-            else:
-                structure[key] = value
-                current_section = None
-        elif indentation > 0 and current_section:
-            current_section['content'][key] = value
-        else:
-            return _("Error on line %(line_number)s: Indentation error or item outside of a section.", line_number=i+1)
-
-    title = structure.get('title', _('My Website'))
-    header_content = structure.get('header', '')
-    footer_content = structure.get('footer', '')
-    main_content = ""
-    for section in structure['sections']:
-        main_content += f"    <section>\n"
-        main_content += f"      <h2>{section.get('title', '')}</h2>\n"
-        if 'text' in section['content']:
-            main_content += f"      <p>{section['content']['text']}</p>\n"
-        if 'images' in section['content']:
-            try:
-                num_images = int(section['content']['images'])
-                if not (0 <= num_images <= 10):
-                    return _("Error: Number of images must be between 0 and 10.")
-                for i in range(num_images):
-                    main_content += f"      <img src='https://via.placeholder.com/150' alt='{_("placeholder image %(number)s", number=i+1)}'>\n"
-            except ValueError:
-                return _("Error: Invalid number for images. Please use an integer.")
-        main_content += f"    </section>\n"
+def generate_app(prompt):
+    return app_scaffold.message(**app_scaffold.values(prompt))
+
+def website_images():
+    """The image tags of a section for each allowed image count (0-10)."""
+    tags = [f"      <img src='https://via.placeholder.com/150' alt='{_('placeholder image %(number)s', number=i + 1)}'>\n"
+            for i in range(10)]
+    return {'images': ["".join(tags[:count]) for count in range(11)]}
+
+@scaffold('title', 'header', 'footer', 'main', defaults=lambda: {
+    'title': _('My Website'), 'header': '', 'footer': '',
+}, constants=website_images)
+def website_scaffold(title, header, footer, main):
     html_content = f"""
 <!DOCTYPE html>
 <html lang="en">
@@ -371,13 +355,13 @@ def generate_website(prompt):
 </head>
 <body>
     <header>
-        <h1>{header_content}</h1>
+        <h1>{header}</h1>
     </header>
     <main>
-{main_content}
+{main}
     </main>
     <footer>
-        <p>{footer_content}</p>
+        <p>{footer}</p>
     </footer>
 </body>
 </html>
@@ -392,30 +376,33 @@ h2 { color: #333; }
 img { max-width: 100%; height: auto; margin: 0.5rem; }
 footer { text-align: center; padding: 1rem 0; background: #333; color: #fff; margin-top: 1rem; }
     """
-    response_message = f"""
-{_("Here is the generated code for your website.")}
-**index.html:**
-```html
-{html_content.strip()}
-```
-**style.css:**
-```css
-{css_content.strip()}
-```
-"""
-    return response_message.strip()
+    return _("Here is the generated code for your website."), {'index.html': html_content, 'style.css': css_content}
 
-def generate_backend(prompt):
-    route = "/api/data"
-    message = "Hello from your new backend!"
-    for line in prompt.splitlines():
-        if ':' in line:
-            key, value = line.split(':', 1)
-            if key.strip().lower() == 'route':
-                route = value.strip()
-            elif key.strip().lower() == 'message':
-                message = value.strip()
+def website_spec_error(error):
+    if error.kind == website_spec.INVALID_FORMAT:
+        return _("Error on line %(line_number)s: Invalid format. Each line must be in 'key: value' format.", line_number=error.line)
+    if error.kind == website_spec.OUTSIDE_SECTION:
+        return _("Error on line %(line_number)s: Indentation error or item outside of a section.", line_number=error.line)
+    if error.kind == website_spec.INVALID_IMAGES:
+        return _("Error on line %(line_number)s: Invalid number for images. Please use an integer.", line_number=error.line)
+    return _("Error on line %(line_number)s: Number of images must be between 0 and 10.", line_number=error.line)
 
+def generate_website(prompt):
+    site, errors = website_spec.parse(prompt)
+    if errors:
+        return "\n".join(website_spec_error(error) for error in errors)
+    values = website_scaffold.defaults()
+    for field in website_spec.SITE_FIELDS:
+        if getattr(site, field) is not None:
+            values[field] = getattr(site, field)
+    values['main'] = website_spec.emit_main(site, website_scaffold.constants()['images'])
+    return website_scaffold.message(**values)
+
+@scaffold('route', 'message', defaults=lambda: {
+    'route': "/api/data",
+    'message': "Hello from your new backend!",
+})
+def backend_scaffold(route, message):
     backend_code = f"""
 from flask import Flask, jsonify
 
@@ -428,14 +415,10 @@ def get_data():
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
 """
-    response_message = f"""
-{_("Here is the generated code for your Python backend.")}
-**backend.py:**
-```python
-{backend_code.strip()}
-```
-"""
-    return response_message.strip()
+    return _("Here is the generated code for your Python backend."), {'backend.py': backend_code}
+
+def generate_backend(prompt):
+    return backend_scaffold.message(**backend_scaffold.values(prompt))
 
 def generate_art_criticism(prompt):
     criticism = _("This is a placeholder for an art criticism based on your prompt: %(prompt)s", prompt=prompt)
@@ -524,61 +507,22 @@ def optimize_ads(prompt):
         ]
     }
 
-async def check_link(client, link_data, results, headers):
-    full_url = link_data['url']
-    anchor_text = link_data['text']
-    try:
-        start_time = time.time()
-        response = await client.head(full_url, headers=headers, timeout=5)
-        end_time = time.time()
-        response_time = round((end_time - start_time) * 1000)
-        status_code = response.status_code
-        link_result = {
-            'url': full_url,
-            'text': anchor_text,
-            'status': status_code,
-            'time_ms': response_time
-        }
-        if status_code >= 400:
-            results['broken'].append(link_result)
-        elif response_time > 1000:
-            results['slow'].append(link_result)
-        else:
-            results['ok'].append(link_result)
-    except httpx.RequestError as e:
-        results['broken'].append({
-            'url': full_url,
-            'text': anchor_text,
-            'status': 'Error',
-            'error': str(e)
-        })
-
 async def analyze_website(url):
     try:
-        headers = {'User-Agent': 'AI-Agent-Checker/1.0'}
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-    except httpx.RequestError as e:
+        return await run_on_loop(crawler.crawl(url))
+    except httpx.HTTPError as e:
         return {'error': _("Error fetching URL: %(error)s", error=e)}
 
-    soup = BeautifulSoup(response.content, 'lxml')
-    links_to_check = []
-    for a_tag in soup.find_all('a', href=True):
-        href = a_tag.get('href')
-        full_url = urljoin(url, href)
-        if urlparse(full_url).scheme in ['http', 'https']:
-            links_to_check.append({
-                'url': full_url,
-                'text': a_tag.get_text(strip=True)
-            })
-
-    results = {'ok': [], 'broken': [], 'slow': []}
-    async with httpx.AsyncClient() as client:
-        tasks = [check_link(client, link_data, results, headers) for link_data in links_to_check]
-        await asyncio.gather(*tasks)
-
-    return results
+def link_check_events(links):
+    """Yields ('link', result) for every checked link as it completes, then ('summary', counts)."""
+    started = time.perf_counter()
+    counts = {'ok': 0, 'broken': 0, 'slow': 0, 'unchecked': 0}
+    for category, result in crawler.iter_check_links(links):
+        counts[category] += 1
+        yield 'link', dict(result, category=category)
+    counts['total'] = sum(counts.values())
+    counts['elapsed_ms'] = round((time.perf_counter() - started) * 1000)
+    yield 'summary', counts
 
 def fetch_github_file(url):
     try:
@@ -601,19 +545,182 @@ def fetch_github_file(url):
         return _("An unexpected error occurred: %(error)s", error=e)
 
 # --- API Endpoints ---
+def wants_stream():
+    """Streaming is opt-in via ?stream=1 or an Accept: text/event-stream header."""
+    return request.args.get('stream') == '1' or request.accept_mimetypes.best == 'text/event-stream'
+
+def wants_ndjson():
+    """Newline-delimited JSON streaming is opt-in via ?stream=ndjson or an Accept: application/x-ndjson header."""
+    return request.args.get('stream') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson'
+
+def event_stream_response(events, as_ndjson):
+    """
+    Streams (kind, payload) events as NDJSON lines ({"link": ...}) or as server-sent events
+    of that kind. A 'summary' event ends the stream.
+    """
+    def generate():
+        for kind, payload in events:
+            if as_ndjson:
+                yield json.dumps({kind: payload}) + "\n"
+            elif kind == 'summary':
+                yield f"event: done\ndata: {json.dumps({'status': 'success', 'summary': payload})}\n\n"
+            else:
+                yield f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+    return Response(generate(), mimetype='application/x-ndjson' if as_ndjson else 'text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def sse_response(chunks):
+    """Sends each text chunk as a server-sent event, followed by a final 'done' event."""
+    def generate():
+        for chunk in chunks:
+            yield f"data: {json.dumps({'token': chunk})}\n\n"
+        yield f"event: done\ndata: {json.dumps({'status': 'success'})}\n\n"
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+async def assistant_response(service_fn, *args):
+    """
+    Awaits a google_ai service (see google_ai.acall) and wraps its text in the standard response,
+    or streams its tokens as server-sent events when the client asked for a stream.
+    """
+    if wants_stream():
+        return sse_response(google_ai.stream(service_fn, *args))
+    message = await google_ai.acall(service_fn, *args)
+    return jsonify({"status": "success", "message": message})
+
+# Authenticated keys are served from memory for AUTH_CACHE_TTL seconds. Each worker has its
+# own cache, so payment_webhook invalidates the local entry and the TTL bounds the others.
+api_key_cache = AuthCache.from_env()
+
+def authenticate_api_key(api_key):
+    """Returns an AuthenticatedUser for the key, or None if no user has it."""
+    user = api_key_cache.get(api_key)
+    if user is not None:
+        return user
+    started = time.perf_counter()
+    row = User.query.filter_by(api_key=api_key).first()
+    metrics.auth_db_seconds.observe(time.perf_counter() - started)
+    if row is None:
+        return None
+    user = AuthenticatedUser.from_model(row)
+    api_key_cache.put(api_key, user)
+    return user
+
+def effective_plan(user):
+    """The plan a user is served under: lapsed subscriptions fall back to free."""
+    if user.subscription_status != 'active':
+        return 'free'
+    return user.subscription_plan or 'free'
+
+# Requests per minute per user, by plan (RATE_LIMIT_* in .env.example).
+rate_limiter = RateLimiter.from_env(os.path.join(app.instance_path, 'rate_limits.db'))
+
+def rate_limit_exceeded(plan, remaining, retry_after):
+    headers = {'X-RateLimit-Limit': str(rate_limiter.limit(plan)), 'X-RateLimit-Remaining': str(remaining)}
+    if retry_after is None:
+        return (jsonify({"error": _("This request costs more than the %(limit)s requests per minute of your plan.",
+                                    limit=rate_limiter.limit(plan))}), 429, headers)
+    headers['Retry-After'] = str(retry_after)
+    return jsonify({"error": _("Rate limit exceeded. Retry in %(seconds)s seconds.", seconds=retry_after)}), 429, headers
+
+def rate_limit_cost(cost):
+    """
+    Marks a view whose requests do the work of several: they take cost() tokens (called
+    during the request) instead of one.
+    """
+    def decorate(f):
+        f.rate_limit_cost = cost
+        return f
+    return decorate
+
 def require_api_key(f):
+    cost = getattr(f, 'rate_limit_cost', None)
+
     @wraps(f)
     async def decorated_function(*args, **kwargs):
         api_key = request.headers.get('X-API-Key')
         if not api_key:
             return jsonify({"error": _("API key is missing")}), 401
-        user = User.query.filter_by(api_key=api_key).first()
+        with tracing.tracer.span('auth') as span:
+            user = authenticate_api_key(api_key)
+            if user:
+                plan = effective_plan(user)
+                allowed, remaining, retry_after = rate_limiter.check(user.id, plan, cost() if cost else 1)
+                span.set(user_id=user.id, plan=plan, allowed=allowed)
         if not user:
             return jsonify({"error": _("Invalid API key")}), 401
+        if not allowed:
+            return rate_limit_exceeded(plan, remaining, retry_after)
+        if remaining is not None:
+            g.rate_limit = (rate_limiter.limit(plan), remaining)
         g.user = user
         return await f(*args, **kwargs) if asyncio.iscoroutinefunction(f) else f(*args, **kwargs)
     return decorated_function
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.before_request
+def start_profiler():
+    # Started on the first request so that every forked worker gets its own sampling thread.
+    profiler.ensure_started()
+
+# Scrapes and the trace views themselves are not traced.
+UNTRACED_ENDPOINTS = {'static', 'prometheus_metrics', 'debug_traces', 'debug_trace', 'debug_profile'}
+
+@app.before_request
+def start_trace():
+    if request.endpoint in UNTRACED_ENDPOINTS:
+        return
+    rule = request.url_rule.rule if request.url_rule is not None else None
+    span = tracing.tracer.start_span(f"{request.method} {rule or 'unmatched'}", kind='server',
+                                     traceparent=request.headers.get('traceparent'),
+                                     **{'http.method': request.method, 'http.route': rule or '',
+                                        'http.target': request.path})
+    g.trace = (span, tracing.tracer.activate(span))
+
+@app.after_request
+def finish_trace(response):
+    if 'trace' not in g:
+        return response
+    span = g.trace[0]
+    span.set(**{'http.status_code': response.status_code})
+    if span.trace_id:
+        response.headers['X-Trace-Id'] = span.trace_id
+    if response.is_streamed and not response.direct_passthrough:
+        # The body is produced after teardown, so the request span stays open until it closes.
+        response.response = tracing.iterate_in(span, response.response)
+        response.call_on_close(span.end)
+        g.trace_streamed = True
+    return response
+
+@app.teardown_request
+def end_trace(error=None):
+    if 'trace' not in g:
+        return
+    span, token = g.pop('trace')
+    tracing.tracer.deactivate(token)
+    if not g.get('trace_streamed'):
+        span.end(error)
+
+@app.after_request
+def record_request_metrics(response):
+    # Labelled by route template, so /api/v1/jobs/<job_id> is one series however many jobs exist.
+    # Streamed bodies are timed until their headers are ready.
+    if request.url_rule is not None and 'request_started' in g:
+        metrics.http_request_seconds.observe(time.perf_counter() - g.request_started,
+                                             (request.method, request.url_rule.rule, str(response.status_code)))
+    return response
+
+@app.after_request
+def add_rate_limit_headers(response):
+    if 'rate_limit' in g:
+        limit, remaining = g.rate_limit
+        response.headers['X-RateLimit-Limit'] = str(limit)
+        response.headers['X-RateLimit-Remaining'] = str(remaining)
+    return response
+
 @app.route('/api/config')
 def get_config():
     return jsonify({
@@ -631,12 +738,12 @@ def index():
 
 @app.route('/api/v1/develop/website', methods=['POST'])
 @require_api_key
-def develop_website_endpoint():
+async def develop_website_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    html, css = google_ai.generate_website(prompt)
+    html, css = await google_ai.acall(google_ai.generate_website, prompt)
     message = f"""
 {_("Here is the generated code for your website.")}
 **index.html:**
@@ -650,6 +757,13 @@ def develop_website_endpoint():
 """
     return jsonify({"status": "success", "message": message})
 
+def scaffold_download(project, prompt, default_name):
+    """The generated files as a zip download (?format=zip on the develop endpoints)."""
+    values = project.values(prompt)
+    name = secure_filename(values.get('name', '')) or default_name
+    return send_file(io.BytesIO(project.bundle(**values)), mimetype='application/zip',
+                     as_attachment=True, download_name=f'{name}.zip')
+
 @app.route('/api/v1/develop/game', methods=['POST'])
 @require_api_key
 def develop_game_endpoint():
@@ -657,6 +771,8 @@ def develop_game_endpoint():
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
+    if request.args.get('format') == 'zip':
+        return scaffold_download(game_scaffold, prompt, 'game')
     message = generate_game(prompt)
     return jsonify({"status": "success", "message": message})
 
@@ -667,6 +783,8 @@ def develop_app_endpoint():
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
+    if request.args.get('format') == 'zip':
+        return scaffold_download(app_scaffold, prompt, 'app')
     message = generate_app(prompt)
     return jsonify({"status": "success", "message": message})
 
@@ -677,12 +795,14 @@ def develop_backend_endpoint():
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
+    if request.args.get('format') == 'zip':
+        return scaffold_download(backend_scaffold, prompt, 'backend')
     message = generate_backend(prompt)
     return jsonify({"status": "success", "message": message})
 
 @app.route('/api/v1/debug', methods=['POST'])
 @require_api_key
-def debug_endpoint():
+async def debug_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
@@ -693,7 +813,7 @@ def debug_endpoint():
     if prompt.strip().startswith('{') or '{' in prompt and '}' in prompt:
         language = 'css'
 
-    errors = google_ai.debug_code(prompt, language)
+    errors = await google_ai.acall(google_ai.debug_code, prompt, language)
     if not errors:
         message = _("No obvious issues found in your %(lang)s code.", lang=language)
     else:
@@ -703,13 +823,12 @@ def debug_endpoint():
 
 @app.route('/api/v1/market/post', methods=['POST'])
 @require_api_key
-def market_post_endpoint():
+async def market_post_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.generate_social_media_post(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.generate_social_media_post, prompt)
 
 @app.route('/api/v1/optimize/ads', methods=['POST'])
 @require_api_key
@@ -728,6 +847,12 @@ async def analyze_website_endpoint():
     url = data.get('url')
     if not url:
         return jsonify({"error": _("URL is required")}), 400
+    if wants_stream() or wants_ndjson():
+        try:
+            links = await run_on_loop(crawler.fetch_links(url))
+        except httpx.HTTPError as e:
+            return jsonify({"status": "success", "message": {'error': _("Error fetching URL: %(error)s", error=e)}})
+        return event_stream_response(link_check_events(links), as_ndjson=wants_ndjson())
     message = await analyze_website(url)
     return jsonify({"status": "success", "message": message})
 
@@ -743,13 +868,12 @@ def weather_endpoint():
 
 @app.route('/api/v1/finance/advice', methods=['POST'])
 @require_api_key
-def financial_advice_endpoint():
+async def financial_advice_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_financial_advice(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_financial_advice, prompt)
 
 @app.route('/api/v1/art/criticism', methods=['POST'])
 @require_api_key
@@ -775,894 +899,813 @@ def automate_script_endpoint():
 
 @app.route('/api/v1/business/strategy', methods=['POST'])
 @require_api_key
-def business_strategy_endpoint():
+async def business_strategy_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.generate_business_strategy(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.generate_business_strategy, prompt)
 
 
 @app.route('/api/v1/business/monetization', methods=['POST'])
 @require_api_key
-def business_monetization_endpoint():
+async def business_monetization_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_monetization_advice(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_monetization_advice, prompt)
 
 
 @app.route('/api/v1/business/partnership', methods=['POST'])
 @require_api_key
-def business_partnership_endpoint():
+async def business_partnership_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_partnership_advice(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_partnership_advice, prompt)
 
 
 @app.route('/api/v1/business/fundraising', methods=['POST'])
 @require_api_key
-def business_fundraising_endpoint():
+async def business_fundraising_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_fundraising_advice(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_fundraising_advice, prompt)
 
 
 @app.route('/api/v1/support/it', methods=['POST'])
 @require_api_key
-def it_support_endpoint():
+async def it_support_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_it_support(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_it_support, prompt)
 
 
 @app.route('/api/v1/support/telecommunication', methods=['POST'])
 @require_api_key
-def telecommunication_support_endpoint():
+async def telecommunication_support_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_telecommunication_support(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_telecommunication_support, prompt)
 
 
 @app.route('/api/v1/assistant/telecommunication', methods=['POST'])
 @require_api_key
-def telecommunication_assistant_endpoint():
+async def telecommunication_assistant_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.generate_telecommunication_assistant_response(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.generate_telecommunication_assistant_response, prompt)
 
 
 @app.route('/api/v1/data/analyze', methods=['POST'])
 @require_api_key
-def analyze_data_endpoint():
+async def analyze_data_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.analyze_data(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.analyze_data, prompt)
 
 
 @app.route('/api/v1/develop/blockchain', methods=['POST'])
 @require_api_key
-def blockchain_code_endpoint():
+async def blockchain_code_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.generate_blockchain_code(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.generate_blockchain_code, prompt)
 
 
 @app.route('/api/v1/develop/blogger', methods=['POST'])
 @require_api_key
-def blogger_bots_page_endpoint():
+async def blogger_bots_page_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.generate_blogger_bots_page(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.generate_blogger_bots_page, prompt)
 
 
 @app.route('/api/v1/develop/messenger', methods=['POST'])
 @require_api_key
-def messenger_code_endpoint():
+async def messenger_code_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.generate_messenger_code(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.generate_messenger_code, prompt)
 
 
 @app.route('/api/v1/learn/language', methods=['POST'])
 @require_api_key
-def learn_language_endpoint():
+async def learn_language_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.learn_language(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.learn_language, prompt)
 
 
 @app.route('/api/v1/sciences/educator', methods=['POST'])
 @require_api_key
-def sciences_educator_endpoint():
+async def sciences_educator_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_science_education(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_science_education, prompt)
 
 
 @app.route('/api/v1/assistance/transaction', methods=['POST'])
 @require_api_key
-def transaction_assistance_endpoint():
+async def transaction_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_transaction_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_transaction_assistance, prompt)
 
 
 @app.route('/api/v1/play/music', methods=['POST'])
 @require_api_key
-def play_music_endpoint():
+async def play_music_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.play_music_instrumental(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.play_music_instrumental, prompt)
 
 
 @app.route('/api/v1/assistance/geometry', methods=['POST'])
 @require_api_key
-def geometry_assistance_endpoint():
+async def geometry_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_geometry_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_geometry_assistance, prompt)
 
 
 @app.route('/api/v1/assistance/cartography', methods=['POST'])
 @require_api_key
-def cartography_assistance_endpoint():
+async def cartography_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_cartography_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_cartography_assistance, prompt)
 
 
 @app.route('/api/v1/assistance/document', methods=['POST'])
 @require_api_key
-def document_assistance_endpoint():
+async def document_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_document_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_document_assistance, prompt)
 
 
 @app.route('/api/v1/business/plan', methods=['POST'])
 @require_api_key
-def business_plan_endpoint():
+async def business_plan_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_business_plan_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_business_plan_assistance, prompt)
 
 
 @app.route('/api/v1/investigation/security', methods=['POST'])
 @require_api_key
-def investigation_security_endpoint():
+async def investigation_security_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_investigation_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_investigation_assistance, prompt)
 
 
 @app.route('/api/v1/military/assistance', methods=['POST'])
 @require_api_key
-def military_assistance_endpoint():
+async def military_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_military_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_military_assistance, prompt)
 
 
 @app.route('/api/v1/gendarmerie/assistance', methods=['POST'])
 @require_api_key
-def gendarmerie_assistance_endpoint():
+async def gendarmerie_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_gendarmerie_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_gendarmerie_assistance, prompt)
 
 
 @app.route('/api/v1/police/assistance', methods=['POST'])
 @require_api_key
-def police_assistance_endpoint():
+async def police_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_police_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_police_assistance, prompt)
 
 
 @app.route('/api/v1/security/optimization', methods=['POST'])
 @require_api_key
-def security_optimization_endpoint():
+async def security_optimization_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_security_optimization_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_security_optimization_assistance, prompt)
 
 
 @app.route('/api/v1/podcast/assistance', methods=['POST'])
 @require_api_key
-def podcast_assistance_endpoint():
+async def podcast_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_podcast_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_podcast_assistance, prompt)
 
 
 @app.route('/api/v1/supply-chain/assistance', methods=['POST'])
 @require_api_key
-def supply_chain_assistance_endpoint():
+async def supply_chain_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_supply_chain_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_supply_chain_assistance, prompt)
 
 
 @app.route('/api/v1/logistics/assistance', methods=['POST'])
 @require_api_key
-def logistics_assistance_endpoint():
+async def logistics_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_logistics_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_logistics_assistance, prompt)
 
 
 @app.route('/api/v1/data-engineering/assistance', methods=['POST'])
 @require_api_key
-def data_engineering_assistance_endpoint():
+async def data_engineering_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_data_engineering_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_data_engineering_assistance, prompt)
 
 
 @app.route('/api/v1/incoterms/assistance', methods=['POST'])
 @require_api_key
-def incoterms_assistance_endpoint():
+async def incoterms_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_incoterms_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_incoterms_assistance, prompt)
 
 
 @app.route('/api/v1/ecommerce/assistance', methods=['POST'])
 @require_api_key
-def ecommerce_assistance_endpoint():
+async def ecommerce_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_ecommerce_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_ecommerce_assistance, prompt)
 
 
 @app.route('/api/v1/government/assistance', methods=['POST'])
 @require_api_key
-def government_assistance_endpoint():
+async def government_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_government_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_government_assistance, prompt)
 
 @app.route('/api/v1/togo/assistance', methods=['POST'])
 @require_api_key
-def togo_assistance_endpoint():
+async def togo_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_togo_public_service_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_togo_public_service_assistance, prompt)
 
 @app.route('/api/v1/government/policy', methods=['POST'])
 @require_api_key
-def public_policy_endpoint():
+async def public_policy_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_public_policy_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_public_policy_assistance, prompt)
 
 @app.route('/api/v1/government/engagement', methods=['POST'])
 @require_api_key
-def citizen_engagement_endpoint():
+async def citizen_engagement_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_citizen_engagement_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_citizen_engagement_assistance, prompt)
 
 @app.route('/api/v1/government/smart-city', methods=['POST'])
 @require_api_key
-def smart_city_endpoint():
+async def smart_city_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_smart_city_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_smart_city_assistance, prompt)
 
 @app.route('/api/v1/government/bias-detection', methods=['POST'])
 @require_api_key
-def government_bias_detection_endpoint():
+async def government_bias_detection_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_bias_detection_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_bias_detection_assistance, prompt)
 
 
 @app.route('/api/v1/biotech/assistance', methods=['POST'])
 @require_api_key
-def biotech_assistance_endpoint():
+async def biotech_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_biotech_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_biotech_assistance, prompt)
 
 
 @app.route('/api/v1/legal/assistance', methods=['POST'])
 @require_api_key
-def legal_assistance_endpoint():
+async def legal_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_legal_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_legal_assistance, prompt)
 
 
 @app.route('/api/v1/fintech/assistance', methods=['POST'])
 @require_api_key
-def fintech_assistance_endpoint():
+async def fintech_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_fintech_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_fintech_assistance, prompt)
 
 
 @app.route('/api/v1/music/production', methods=['POST'])
 @require_api_key
-def music_production_endpoint():
+async def music_production_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_music_production_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_music_production_assistance, prompt)
 
 
 @app.route('/api/v1/aerospace-automotive/assistance', methods=['POST'])
 @require_api_key
-def aerospace_automotive_assistance_endpoint():
+async def aerospace_automotive_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_aerospace_automotive_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_aerospace_automotive_assistance, prompt)
 
 
 @app.route('/api/v1/data-science-stewardship/assistance', methods=['POST'])
 @require_api_key
-def data_science_stewardship_assistance_endpoint():
+async def data_science_stewardship_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_data_science_stewardship_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_data_science_stewardship_assistance, prompt)
 
 
 @app.route('/api/v1/logo-thumbnail/assistance', methods=['POST'])
 @require_api_key
-def logo_thumbnail_assistance_endpoint():
+async def logo_thumbnail_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_logo_thumbnail_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_logo_thumbnail_assistance, prompt)
 
 
 @app.route('/api/v1/fake-content/verification', methods=['POST'])
 @require_api_key
-def fake_content_verification_endpoint():
+async def fake_content_verification_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_fake_content_verification_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_fake_content_verification_assistance, prompt)
 
 
 @app.route('/api/v1/automatic-learning/assistance', methods=['POST'])
 @require_api_key
-def automatic_learning_assistance_endpoint():
+async def automatic_learning_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_automatic_learning_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_automatic_learning_assistance, prompt)
 
 
 @app.route('/api/v1/ia-data-engineering/assistance', methods=['POST'])
 @require_api_key
-def ia_data_engineering_assistance_endpoint():
+async def ia_data_engineering_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_ia_data_engineering_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_ia_data_engineering_assistance, prompt)
 
 
 @app.route('/api/v1/data-lab-center/assistance', methods=['POST'])
 @require_api_key
-def data_lab_center_assistance_endpoint():
+async def data_lab_center_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_data_lab_center_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_data_lab_center_assistance, prompt)
 
 
 @app.route('/api/v1/computer-vision/assistance', methods=['POST'])
 @require_api_key
-def computer_vision_assistance_endpoint():
+async def computer_vision_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_computer_vision_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_computer_vision_assistance, prompt)
 
 
 @app.route('/api/v1/ia-researcher/assistance', methods=['POST'])
 @require_api_key
-def ia_researcher_assistance_endpoint():
+async def ia_researcher_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_ia_researcher_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_ia_researcher_assistance, prompt)
 
 
 @app.route('/api/v1/esports/assistance', methods=['POST'])
 @require_api_key
-def esports_assistance_endpoint():
+async def esports_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_esports_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_esports_assistance, prompt)
 
 
 @app.route('/api/v1/dermatology/assistance', methods=['POST'])
 @require_api_key
-def dermatology_assistance_endpoint():
+async def dermatology_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_dermatology_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_dermatology_assistance, prompt)
 
 
 @app.route('/api/v1/microsoft-ignite/assistance', methods=['POST'])
 @require_api_key
-def microsoft_ignite_assistance_endpoint():
+async def microsoft_ignite_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_microsoft_ignite_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_microsoft_ignite_assistance, prompt)
 
 
 @app.route('/api/v1/diagnostic/assistance', methods=['POST'])
 @require_api_key
-def diagnostic_assistance_endpoint():
+async def diagnostic_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_diagnostic_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_diagnostic_assistance, prompt)
 
 
 @app.route('/api/v1/eshop/assistance', methods=['POST'])
 @require_api_key
-def eshop_assistance_endpoint():
+async def eshop_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_eshop_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_eshop_assistance, prompt)
 
 
 @app.route('/api/v1/it-operations/assistance', methods=['POST'])
 @require_api_key
-def it_operations_assistance_endpoint():
+async def it_operations_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_it_operations_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_it_operations_assistance, prompt)
 
 
 @app.route('/api/v1/maintenance/assistance', methods=['POST'])
 @require_api_key
-def maintenance_assistance_endpoint():
+async def maintenance_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_maintenance_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_maintenance_assistance, prompt)
 
 
 @app.route('/api/v1/google-sites/assistance', methods=['POST'])
 @require_api_key
-def google_sites_assistance_endpoint():
+async def google_sites_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_google_sites_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_google_sites_assistance, prompt)
 
 
 @app.route('/api/v1/marketing/assistance', methods=['POST'])
 @require_api_key
-def marketing_assistance_endpoint():
+async def marketing_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_marketing_bot_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_marketing_bot_assistance, prompt)
 
 
 @app.route('/api/v1/digital-repair/assistance', methods=['POST'])
 @require_api_key
-def digital_repair_assistance_endpoint():
+async def digital_repair_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_digital_repair_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_digital_repair_assistance, prompt)
 
 
 @app.route('/api/v1/investment-trading/assistance', methods=['POST'])
 @require_api_key
-def investment_trading_assistance_endpoint():
+async def investment_trading_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_investment_trading_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_investment_trading_assistance, prompt)
 
 
 @app.route('/api/v1/autogpt/assistance', methods=['POST'])
 @require_api_key
-def autogpt_assistance_endpoint():
+async def autogpt_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_autogpt_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_autogpt_assistance, prompt)
 
 
 @app.route('/api/v1/conflict-debug/assistance', methods=['POST'])
 @require_api_key
-def conflict_debug_assistance_endpoint():
+async def conflict_debug_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_conflict_debug_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_conflict_debug_assistance, prompt)
 
 
 @app.route('/api/v1/generic/assistance', methods=['POST'])
 @require_api_key
-def generic_assistance_endpoint():
+async def generic_assistance_endpoint():
     data = request.get_json()
     system_message = data.get('system_message')
     prompt = data.get('prompt')
     if not all([system_message, prompt]):
         return jsonify({"error": _("system_message and prompt are required")}), 400
-    message = google_ai.generic_ai_service(system_message, prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.generic_ai_service, system_message, prompt)
 
 
 @app.route('/api/v1/automl/feature-engineering', methods=['POST'])
 @require_api_key
-def automl_feature_engineering_endpoint():
+async def automl_feature_engineering_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_feature_engineering_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_feature_engineering_assistance, prompt)
 
 
 @app.route('/api/v1/automl/hyperparameter-tuning', methods=['POST'])
 @require_api_key
-def automl_hyperparameter_tuning_endpoint():
+async def automl_hyperparameter_tuning_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_hyperparameter_tuning_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_hyperparameter_tuning_assistance, prompt)
 
 
 @app.route('/api/v1/automl/model-selection', methods=['POST'])
 @require_api_key
-def automl_model_selection_endpoint():
+async def automl_model_selection_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_model_selection_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_model_selection_assistance, prompt)
 
 
 @app.route('/api/v1/automl/mlops', methods=['POST'])
 @require_api_key
-def automl_mlops_endpoint():
+async def automl_mlops_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_mlops_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_mlops_assistance, prompt)
 
 
 @app.route('/api/v1/cloud-infrastructure/assistance', methods=['POST'])
 @require_api_key
-def cloud_infrastructure_assistance_endpoint():
+async def cloud_infrastructure_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_cloud_infrastructure_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_cloud_infrastructure_assistance, prompt)
 
 
 @app.route('/api/v1/iaas/assistance', methods=['POST'])
 @require_api_key
-def iaas_assistance_endpoint():
+async def iaas_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_iaas_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_iaas_assistance, prompt)
 
 
 @app.route('/api/v1/paas/assistance', methods=['POST'])
 @require_api_key
-def paas_assistance_endpoint():
+async def paas_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_paas_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_paas_assistance, prompt)
 
 
 @app.route('/api/v1/saas/assistance', methods=['POST'])
 @require_api_key
-def saas_assistance_endpoint():
+async def saas_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_saas_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_saas_assistance, prompt)
 
 
 @app.route('/api/v1/itaas/assistance', methods=['POST'])
 @require_api_key
-def itaas_assistance_endpoint():
+async def itaas_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_itaas_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_itaas_assistance, prompt)
 
 
 @app.route('/api/v1/malware-defense/assistance', methods=['POST'])
 @require_api_key
-def malware_defense_assistance_endpoint():
+async def malware_defense_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_malware_defense_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_malware_defense_assistance, prompt)
 
 
 @app.route('/api/v1/ussd-blockchain/assistance', methods=['POST'])
 @require_api_key
-def ussd_blockchain_assistance_endpoint():
+async def ussd_blockchain_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_ussd_blockchain_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_ussd_blockchain_assistance, prompt)
 
 
 @app.route('/api/v1/domain-codex/assistance', methods=['POST'])
 @require_api_key
-def domain_codex_assistance_endpoint():
+async def domain_codex_assistance_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_domain_codex_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_domain_codex_assistance, prompt)
 
 
 @app.route('/api/v1/llama/intelligence', methods=['POST'])
 @require_api_key
-def llama_intelligence_endpoint():
+async def llama_intelligence_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_llama_intelligence(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_llama_intelligence, prompt)
 
 
 @app.route('/api/v1/llama/guard', methods=['POST'])
 @require_api_key
-def llama_guard_endpoint():
+async def llama_guard_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_llama_guard_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_llama_guard_assistance, prompt)
 
 
 @app.route('/api/v1/nvidia/nemotron', methods=['POST'])
 @require_api_key
-def nvidia_nemotron_endpoint():
+async def nvidia_nemotron_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_nemotron_reasoning(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_nemotron_reasoning, prompt)
 
 
 @app.route('/api/v1/nvidia/mixtral', methods=['POST'])
 @require_api_key
-def nvidia_mixtral_endpoint():
+async def nvidia_mixtral_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_mixtral_multilingual_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_mixtral_multilingual_assistance, prompt)
 
 
 @app.route('/api/v1/anthropic/intelligence', methods=['POST'])
 @require_api_key
-def anthropic_intelligence_endpoint():
+async def anthropic_intelligence_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_claude_intelligence(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_claude_intelligence, prompt)
 
 
 @app.route('/api/v1/anthropic/coding', methods=['POST'])
 @require_api_key
-def anthropic_coding_endpoint():
+async def anthropic_coding_endpoint():
     data = request.get_json()
     prompt = data.get('prompt')
     if not prompt:
         return jsonify({"error": _("Prompt is required")}), 400
-    message = google_ai.provide_claude_coding_assistance(prompt)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.provide_claude_coding_assistance, prompt)
 
 
 @app.route('/api/v1/langflow/execute', methods=['POST'])
 @require_api_key
-def execute_langflow_endpoint():
+async def execute_langflow_endpoint():
     data = request.get_json()
     flow_name = data.get('flow_name', 'sample_flow')
     prompt = data.get('prompt')
@@ -1680,7 +1723,7 @@ def execute_langflow_endpoint():
             flow_config = json.load(f)
 
         # Simulate execution using LangChain (as Langflow is built on LangChain)
-        message = google_ai.generic_ai_service(f"Executing Langflow: {flow_config.get('name')}", prompt)
+        message = await google_ai.acall(google_ai.generic_ai_service, f"Executing Langflow: {flow_config.get('name')}", prompt)
         return jsonify({
             "status": "success",
             "message": message,
@@ -1695,14 +1738,214 @@ def execute_langflow_endpoint():
 
 @app.route('/api/v1/translate', methods=['POST'])
 @require_api_key
-def translate_endpoint():
+async def translate_endpoint():
     data = request.get_json()
     text = data.get('text')
     target_language = data.get('target_language', 'English')
     if not text:
         return jsonify({"error": _("Text is required")}), 400
-    message = google_ai.translate_text(text, target_language)
-    return jsonify({"status": "success", "message": message})
+    return await assistant_response(google_ai.translate_text, text, target_language)
+
+
+def batch_cost():
+    # Every item is a provider call. Malformed batches are rejected by the view at the price of one request.
+    items = (request.get_json(silent=True) or {}).get('items')
+    return len(items) if isinstance(items, list) and items else 1
+
+@app.route('/api/v1/batch', methods=['POST'])
+@require_api_key
+@rate_limit_cost(batch_cost)
+def batch_endpoint():
+    """
+    Runs many {service, prompt} items in one authenticated request and streams the results
+    as NDJSON lines in completion order, each tagged with the index of its item.
+    """
+    data = request.get_json()
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": _("A non-empty list of items is required")}), 400
+    if len(items) > google_ai.BATCH_MAX_ITEMS:
+        return jsonify({"error": _("A batch holds at most %(max)s items", max=google_ai.BATCH_MAX_ITEMS)}), 400
+    concurrency = data.get('concurrency', google_ai.BATCH_CONCURRENCY)
+    if not isinstance(concurrency, int) or concurrency < 1:
+        return jsonify({"error": _("Concurrency must be a positive integer")}), 400
+    concurrency = min(concurrency, google_ai.BATCH_MAX_CONCURRENCY)
+    lines = (json.dumps(result) + "\n" for result in google_ai.batch_services(items, concurrency))
+    return Response(lines, mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+# --- Background Jobs ---
+# Services that can run as jobs. Handlers look the google_ai function up at call time and
+# return JSON-serializable results.
+JOB_HANDLERS = {
+    'generate_website': lambda prompt: dict(zip(('html', 'css'), google_ai.generate_website(prompt))),
+    'provide_conflict_debug_assistance': lambda prompt: google_ai.provide_conflict_debug_assistance(prompt),
+    'provide_llama_intelligence': lambda prompt: google_ai.provide_llama_intelligence(prompt),
+}
+# Queued jobs of paying plans are claimed first.
+JOB_PRIORITIES = {'free': 0, 'premium': 10, 'pro': 20}
+job_queue = JobQueue.from_env(os.path.join(app.instance_path, 'jobs.db'), JOB_HANDLERS)
+
+def job_priority(user):
+    return JOB_PRIORITIES.get(effective_plan(user), JOB_PRIORITIES['free'])
+
+@app.route('/api/v1/jobs', methods=['POST'])
+@require_api_key
+def submit_job():
+    """Queues a {service, prompt} job and returns it right away; poll GET /api/v1/jobs/<id> for the result."""
+    data = request.get_json()
+    service = data.get('service')
+    prompt = data.get('prompt')
+    if service not in JOB_HANDLERS:
+        return jsonify({"error": _("Unknown service: %(service)s", service=service)}), 400
+    if not prompt:
+        return jsonify({"error": _("Prompt is required")}), 400
+    job = job_queue.submit(g.user.id, service, {'prompt': prompt}, priority=job_priority(g.user))
+    return jsonify({"status": "success", "job": job}), 202, {'Location': url_for('get_job', job_id=job['id'])}
+
+@app.route('/api/v1/jobs/<job_id>', methods=['GET'])
+@require_api_key
+def get_job(job_id):
+    job = job_queue.get(job_id, g.user.id)
+    if job is None:
+        return jsonify({"error": _("Job not found")}), 404
+    job_queue.ensure_started()
+    return jsonify({"status": "success", "job": job})
+
+@app.route('/api/v1/jobs/<job_id>', methods=['DELETE'])
+@require_api_key
+def cancel_job(job_id):
+    job = job_queue.cancel(job_id, g.user.id)
+    if job is None:
+        return jsonify({"error": _("Job not found")}), 404
+    return jsonify({"status": "success", "job": job})
+
+
+# --- Metrics ---
+@metrics.registry.collector
+def cache_metrics():
+    """Hits, misses and hit ratio of the response, API key and model client caches."""
+    caches = {'response': google_ai.response_cache.stats(), 'api_key': api_key_cache.stats(),
+              'model_client': google_ai.model_registry.stats()}
+    hits, misses, ratios = [], [], []
+    for cache, stats in caches.items():
+        cache_hits = stats['hits'] + stats.get('semantic_hits', 0)
+        lookups = cache_hits + stats['misses']
+        hits.append(({'cache': cache}, cache_hits))
+        misses.append(({'cache': cache}, stats['misses']))
+        ratios.append(({'cache': cache}, round(cache_hits / lookups, 4) if lookups else 0.0))
+    return [
+        ('cache_hits_total', 'counter', 'Cache lookups that found an entry.', hits),
+        ('cache_misses_total', 'counter', 'Cache lookups that found nothing.', misses),
+        ('cache_hit_ratio', 'gauge', 'Share of cache lookups that found an entry.', ratios),
+    ]
+
+@metrics.registry.collector
+def llm_metrics():
+    """Coalescing, provider concurrency, circuit breakers, HTTP pools and hedging."""
+    flight = google_ai.singleflight.stats()
+    limits = google_ai.provider_limits.stats()
+    routing = google_ai.model_router.stats()
+    pools = google_ai.http_pool.stats()
+    hedges = google_ai.hedge_policy.stats()
+    states = {'closed': 0, 'half_open': 1, 'open': 2}
+    return [
+        ('llm_calls_total', 'counter', 'LLM calls, including those coalesced into an identical in-flight call.',
+         [({}, flight['calls'])]),
+        ('llm_coalesced_calls_total', 'counter', 'LLM calls answered by an identical in-flight call.',
+         [({}, flight['coalesced'])]),
+        ('llm_in_flight', 'gauge', 'LLM calls holding a provider concurrency slot.',
+         [({'provider': provider}, stats['in_flight']) for provider, stats in limits.items()]),
+        ('llm_waiting', 'gauge', 'LLM calls waiting for a provider concurrency slot.',
+         [({'provider': provider}, stats['waiting']) for provider, stats in limits.items()]),
+        ('llm_circuit_state', 'gauge', 'Provider circuit breaker: 0 closed, 1 half-open, 2 open.',
+         [({'provider': provider}, states[stats['state']]) for provider, stats in routing['providers'].items()]),
+        ('llm_provider_health', 'gauge', 'Provider health score used to order fallbacks.',
+         [({'provider': provider}, stats['health']) for provider, stats in routing['providers'].items()]),
+        ('llm_reroutes_total', 'counter', 'LLM calls served by a fallback model.', [({}, routing['reroutes'])]),
+        ('http_pool_requests_total', 'counter', 'HTTP requests sent to LLM providers.',
+         [({'provider': provider}, stats['requests']) for provider, stats in pools.items()]),
+        ('http_pool_saturated_total', 'counter', 'Provider HTTP requests that found every pooled connection busy.',
+         [({'provider': provider}, stats['saturated']) for provider, stats in pools.items()]),
+        ('http_pool_utilization', 'gauge', 'Share of the provider connection pool in use.',
+         [({'provider': provider}, stats['utilization']) for provider, stats in pools.items()]),
+        ('llm_hedged_total', 'counter', 'Hedge requests sent because the primary model was slow.',
+         [({'service': service}, stats['hedged']) for service, stats in hedges.items()]),
+        ('llm_hedge_wins_total', 'counter', 'Hedge requests that answered first.',
+         [({'service': service}, stats['hedge_wins']) for service, stats in hedges.items()]),
+    ]
+
+@metrics.registry.collector
+def job_metrics():
+    return [('jobs', 'gauge', 'Background jobs by status.',
+             [({'status': status}, count) for status, count in job_queue.stats().items()])]
+
+@metrics.registry.collector
+def webhook_metrics():
+    stats = stripe_events.stats()
+    return [('stripe_events', 'gauge', 'Recorded Stripe webhook events by status.',
+             [({'status': status}, count) for status, count in stats['events'].items()]),
+            ('stripe_event_duplicates_total', 'counter', 'Stripe webhook deliveries that were already recorded.',
+             [({}, stats['duplicates'])])]
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint. With METRICS_TOKEN set, scrapers must send it as a bearer token."""
+    token = os.environ.get('METRICS_TOKEN')
+    if token and not secrets.compare_digest(request.headers.get('Authorization', '').encode(),
+                                            f'Bearer {token}'.encode()):
+        return jsonify({"error": _("Unauthorized")}), 401
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+
+# --- Debug views ---
+def require_admin_token(f):
+    """Debug views answer 404 unless ADMIN_TOKEN is set, and then require it as a bearer token."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        token = os.environ.get('ADMIN_TOKEN')
+        if not token:
+            return jsonify({"error": _("Not found")}), 404
+        if not secrets.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+            return jsonify({"error": _("Unauthorized")}), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
+@app.route('/debug/traces')
+@require_admin_token
+def debug_traces():
+    """Recent traces, newest first; ?min_ms= keeps only slower ones and ?limit= caps the list."""
+    limit = min(request.args.get('limit', 50, type=int), tracing.buffer.capacity)
+    min_ms = request.args.get('min_ms', 0, type=float)
+    return jsonify({"status": "success", "traces": tracing.buffer.traces(limit, min_ms / 1000)})
+
+@app.route('/debug/profile')
+@require_admin_token
+def debug_profile():
+    """
+    Stacks sampled since the profiler started (or since the last ?reset=1), in
+    collapsed-stack format for flamegraph.pl or speedscope. ?idle=1 includes waiting threads.
+    """
+    if not profiler.enabled:
+        return jsonify({"error": _("The profiler is off. Set PROFILER=1 to enable it.")}), 404
+    stats = profiler.stats()
+    body = profiler.collapsed(include_idle=request.args.get('idle') == '1')
+    if request.args.get('reset') == '1':
+        profiler.reset()
+    return Response(body, content_type='text/plain; charset=utf-8', headers={
+        'X-Profile-Samples': str(stats['samples']),
+        'X-Profile-Seconds': str(stats['seconds']),
+        'X-Profile-Sampling-Ms': str(stats['sampling_ms_per_sample']),
+    })
+
+@app.route('/debug/traces/<trace_id>')
+@require_admin_token
+def debug_trace(trace_id):
+    trace = tracing.buffer.get(trace_id)
+    if trace is None:
+        return jsonify({"error": _("Trace not found")}), 404
+    return jsonify({"status": "success", "trace": trace})
 
 
 @app.route('/api/v1/register_public', methods=['POST'])
@@ -1777,17 +2020,45 @@ def me():
         "username": g.user.username
     })
 
+PROJECTS_PAGE_SIZE = 24
+PROJECTS_MAX_PAGE_SIZE = 100
+# Bumped whenever projects change; the portfolio ETags are derived from it.
+projects_version = VersionCounter(os.path.join(app.instance_path, 'projects.version'))
+
 @app.route('/api/v1/portfolio/projects', methods=['GET'])
 def get_projects():
-    projects = Project.query.all()
-    return jsonify([
-        {
-            'id': project.id,
-            'title': project.title,
-            'description': project.description,
-            'image_url': project.image_url
-        } for project in projects
-    ])
+    """
+    Projects in id order. With `limit` or `cursor`, they come `limit` at a time
+    (PROJECTS_PAGE_SIZE by default), and the next page, if any, is linked in the Link
+    header as rel="next" with a `cursor` (the last id returned). Without either, every
+    project is returned, as clients written before paging expect. Responses carry an
+    ETag, and a matching If-None-Match gets a 304 without a database query.
+    """
+    paged = 'cursor' in request.args or 'limit' in request.args
+    try:
+        cursor = int(request.args.get('cursor', 0))
+        limit = int(request.args.get('limit', PROJECTS_PAGE_SIZE)) if paged else None
+    except ValueError:
+        return jsonify({"error": _("cursor and limit must be integers")}), 400
+    if cursor < 0 or paged and not 1 <= limit <= PROJECTS_MAX_PAGE_SIZE:
+        return jsonify({"error": _("limit must be between 1 and %(max)s", max=PROJECTS_MAX_PAGE_SIZE)}), 400
+
+    # Read before the query: a project created in between makes the page newer than its
+    # ETag, which only costs the client one extra refetch.
+    etag = f'projects-{projects_version.value()}-{cursor}-{limit or "all"}'
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        query = (db.select(Project.id, Project.title, Project.description, Project.image_url)
+                 .where(Project.id > cursor).order_by(Project.id))
+        rows = db.session.execute(query.limit(limit + 1) if paged else query).mappings().all()
+        response = jsonify([dict(row) for row in rows[:limit]])
+        if paged and len(rows) > limit:
+            next_url = url_for('get_projects', cursor=rows[limit - 1]['id'], limit=limit)
+            response.headers['Link'] = f'<{next_url}>; rel="next"'
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/v1/projects', methods=['POST'])
 @require_api_key
@@ -1806,6 +2077,7 @@ def create_project():
     )
     db.session.add(new_project)
     db.session.commit()
+    projects_version.bump()
 
     return jsonify({
         'id': new_project.id,
@@ -1816,20 +2088,20 @@ def create_project():
 
 @app.route('/api/v1/promotions', methods=['POST'])
 @require_api_key
-def create_promotion():
+async def create_promotion():
     data = request.get_json()
     description = data.get('description')
 
     if not description:
         return jsonify({"error": _("Description is required")}), 400
 
-    promotion_text = google_ai.generate_social_media_post(description)
+    promotion_text = await google_ai.acall(google_ai.generate_social_media_post, description)
     return jsonify({"promotion_text": promotion_text})
 
 
 @app.route('/api/v1/promote', methods=['POST'])
 @require_api_key
-def create_promotion_from_url():
+async def create_promotion_from_url():
     data = request.get_json()
     url = data.get('url')
     if not url:
@@ -1844,7 +2116,7 @@ def create_promotion_from_url():
         if not text_content:
             return jsonify({"error": _("Could not extract meaningful content from the URL.")}), 400
         # Limit the content size to avoid overly large payloads to the AI model
-        promotion_text = google_ai.generate_promotion_from_content(url, text_content[:4000])
+        promotion_text = await google_ai.acall(google_ai.generate_promotion_from_content, url, text_content[:4000])
         return jsonify({"promotion_text": promotion_text})
     except requests.RequestException as e:
         return jsonify({"error": _("Error fetching URL: %(error)s", error=str(e))}), 400
@@ -1887,7 +2159,7 @@ def create_subscription_checkout():
         else:
             checkout_params['customer_email'] = g.user.username if '@' in g.user.username else None
 
-        checkout_session = stripe.checkout.Session.create(**checkout_params)
+        checkout_session = get_stripe().checkout.Session.create(**checkout_params)
         return jsonify({'url': checkout_session.url})
     except Exception as e:
         return jsonify(error=str(e)), 403
@@ -1909,27 +2181,33 @@ def create_payment_intent():
         return jsonify({"error": _("Invalid amount")}), 400
 
     # Create a payment record in our database
-    new_payment = Payment(
-        user_id=g.user.id,
-        amount=amount_in_cents,
-        currency=currency,
-        status='pending' # Start with pending status
-    )
-    db.session.add(new_payment)
-    db.session.commit()
+    user_id = g.user.id
+
+    def create_payment():
+        new_payment = Payment(
+            user_id=user_id,
+            amount=amount_in_cents,
+            currency=currency,
+            status='pending' # Start with pending status
+        )
+        db.session.add(new_payment)
+        db.session.flush()
+        return new_payment.id
+
+    payment_id = db_writes.run(create_payment)
 
     try:
-        intent = stripe.PaymentIntent.create(
+        intent = get_stripe().PaymentIntent.create(
             amount=amount_in_cents,
             currency=currency,
             automatic_payment_methods={"enabled": True},
             metadata={
-                'payment_id': new_payment.id # Pass our internal payment ID to Stripe
+                'payment_id': payment_id # Pass our internal payment ID to Stripe
             }
         )
         return jsonify({
             'clientSecret': intent.client_secret,
-            'paymentId': new_payment.id
+            'paymentId': payment_id
         })
     except Exception as e:
         # If Stripe fails, we should probably roll back the DB transaction or mark the payment as failed.
@@ -1937,42 +2215,22 @@ def create_payment_intent():
         return jsonify(error=str(e)), 403
 
 
-@app.route('/api/v1/payment/webhook', methods=['POST'])
-def payment_webhook():
-    payload = request.data
-    sig_header = request.headers.get('Stripe-Signature')
-    endpoint_secret = os.environ.get("STRIPE_WEBHOOK_SECRET")
-
-    if not endpoint_secret:
-        return jsonify({"error": "Stripe webhook secret not configured"}), 500
-
-    try:
-        event = stripe.Webhook.construct_event(
-            payload, sig_header, endpoint_secret
-        )
-    except ValueError as e:
-        # Invalid payload
-        return jsonify(error=str(e)), 400
-    except stripe.error.SignatureVerificationError as e:
-        # Invalid signature
-        return jsonify(error=str(e)), 400
-
-    # Handle the event
+def apply_stripe_event(event):
+    """Applies a decoded Stripe event to the database; returns the id of a user whose subscription changed."""
     if event['type'] == 'payment_intent.succeeded':
         payment_intent = event['data']['object']
         payment_id = payment_intent['metadata'].get('payment_id')
         if payment_id:
-            payment = Payment.query.get(int(payment_id))
+            payment = db.session.get(Payment, int(payment_id))
             if payment:
                 payment.status = 'succeeded'
-                payment.meta_payment_id = payment_intent.id # Let's store the stripe payment intent id here
-                db.session.commit()
+                payment.meta_payment_id = payment_intent['id'] # Let's store the stripe payment intent id here
     elif event['type'] == 'checkout.session.completed':
         session_obj = event['data']['object']
         user_id = session_obj.get('client_reference_id')
         customer_id = session_obj.get('customer')
         if user_id:
-            user = User.query.get(int(user_id))
+            user = db.session.get(User, int(user_id))
             if user:
                 user.subscription_status = 'active'
                 if customer_id:
@@ -1980,35 +2238,75 @@ def payment_webhook():
                 # Plan can be retrieved from metadata if set during session creation
                 plan = session_obj.get('metadata', {}).get('plan', 'premium')
                 user.subscription_plan = plan
-                db.session.commit()
+                return user.id
     elif event['type'] == 'customer.subscription.deleted':
         subscription = event['data']['object']
-        user = User.query.filter_by(stripe_customer_id=subscription.customer).first()
+        user = User.query.filter_by(stripe_customer_id=subscription['customer']).first()
         if user:
             user.subscription_status = 'inactive'
             user.subscription_plan = 'free'
-            db.session.commit()
+            return user.id
     elif event['type'] == 'customer.subscription.updated':
         subscription = event['data']['object']
-        user = User.query.filter_by(stripe_customer_id=subscription.customer).first()
+        user = User.query.filter_by(stripe_customer_id=subscription['customer']).first()
         if user:
-            if subscription.status in ['active', 'trialing']:
+            if subscription['status'] in ['active', 'trialing']:
                 user.subscription_status = 'active'
             else:
                 user.subscription_status = 'inactive'
-            db.session.commit()
+            return user.id
     elif event['type'] == 'payment_intent.payment_failed':
         payment_intent = event['data']['object']
         payment_id = payment_intent['metadata'].get('payment_id')
         if payment_id:
-            payment = Payment.query.get(int(payment_id))
+            payment = db.session.get(Payment, int(payment_id))
             if payment:
                 payment.status = 'failed'
-                db.session.commit()
     else:
         print('Unhandled event type {}'.format(event['type']))
+    return None
 
-    return jsonify(status='success')
+@app.route('/api/v1/payment/webhook', methods=['POST'])
+def payment_webhook():
+    payload = request.data
+    sig_header = request.headers.get('Stripe-Signature')
+    endpoint_secret = os.environ.get("STRIPE_WEBHOOK_SECRET")
+
+    if not endpoint_secret:
+        return jsonify({"error": "Stripe webhook secret not configured"}), 500
+
+    stripe = get_stripe()
+    try:
+        event = stripe.Webhook.construct_event(
+            payload, sig_header, endpoint_secret
+        )
+    except ValueError as e:
+        # Invalid payload
+        return jsonify(error=str(e)), 400
+    except stripe.error.SignatureVerificationError as e:
+        # Invalid signature
+        return jsonify(error=str(e)), 400
+
+    # Record the event and acknowledge; stripe_events applies it in the background.
+    recorded = stripe_events.record(event['id'], event['type'], payload.decode('utf-8'), event['created'])
+    return jsonify(status='success', duplicate=not recorded)
+
+
+def invalidate_subscriptions(user_ids):
+    for user_id in set(user_ids):
+        api_key_cache.invalidate_user(user_id)
+
+stripe_events = EventApplier.from_env(app, db, db_writes, StripeEvent, apply_stripe_event, invalidate_subscriptions)
+
+def start_webhook_applier():
+    """
+    Called by the servers when a worker starts (gunicorn.conf.py, asgi.py, app.run below)
+    rather than left to the next new webhook: events left pending by a process that died
+    must be applied even if Stripe's retries of them are all duplicates. Scripts and CLI
+    commands that import the app do not start it.
+    """
+    if not app.config['TESTING']:
+        stripe_events.ensure_started()
 
 
 @app.route('/api/v1/meta/campaigns', methods=['GET'])
@@ -2018,6 +2316,9 @@ def get_meta_campaigns():
     ad_account_id = os.environ.get('META_AD_ACCOUNT_ID')
     if not ad_account_id:
         return jsonify({"error": "Meta Ad Account ID is not configured."}), 500
+    initialize_meta_sdk()
+    from facebook_business.adobjects.adaccount import AdAccount
+    from facebook_business.exceptions import FacebookRequestError
     try:
         account = AdAccount(f'act_{ad_account_id}')
         campaigns = account.get_campaigns(fields=[
@@ -2038,8 +2339,10 @@ def get_meta_campaigns():
 # The database initialization is also handled separately in a production environment.
 def update_db_schema():
     """Add new columns to existing database if they don't exist."""
-    db_path = app.config['SQLALCHEMY_DATABASE_URI'].replace('sqlite:///', '')
-    if os.path.exists(db_path):
+    if db.engine.dialect.name != 'sqlite':
+        return
+    db_path = db.engine.url.database
+    if db_path and os.path.exists(db_path):
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
 
@@ -2054,6 +2357,13 @@ def update_db_schema():
         if 'stripe_customer_id' not in columns:
             cursor.execute("ALTER TABLE user ADD COLUMN stripe_customer_id VARCHAR(120)")
 
+        cursor.execute("PRAGMA table_info(stripe_event)")
+        columns = [column[1] for column in cursor.fetchall()]
+        if columns and 'attempts' not in columns:
+            cursor.execute("ALTER TABLE stripe_event ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        if columns and 'retry_at' not in columns:
+            cursor.execute("ALTER TABLE stripe_event ADD COLUMN retry_at FLOAT")
+
         conn.commit()
         conn.close()
 
@@ -2069,6 +2379,8 @@ if __name__ == '__main__':
             ]
             db.session.bulk_save_objects(projects)
             db.session.commit()
+            projects_version.bump()
+    start_webhook_applier()
     app.run(port=5001)
 
 @app.cli.command("init-db")
@@ -2083,4 +2395,12 @@ def init_db_command():
         ]
         db.session.bulk_save_objects(projects)
         db.session.commit()
+        projects_version.bump()
     print("Database initialized.")
+
+@app.cli.command("requeue-stripe-events")
+@click.argument("event_ids", nargs=-1)
+def requeue_stripe_events_command(event_ids):
+    """Puts failed Stripe webhook events (all, or the given ids) back in the queue."""
+    count = stripe_events.requeue_failed(event_ids or None)
+    print(f"Requeued {count} failed Stripe events.")
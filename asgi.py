@@ -0,0 +1,21 @@
+"""
+ASGI entry point for the Flask app.
+
+Run with an ASGI server, e.g.:
+    gunicorn -k uvicorn.workers.UvicornWorker asgi:asgi_app
+    uvicorn asgi:asgi_app
+
+Flask itself is a WSGI app, so each request is handed to a thread from a pool of
+ASGI_WSGI_THREADS threads. Assistant endpoints only wait on that thread: their LLM calls
+go through google_ai.acall(), which multiplexes every in-flight call of the process onto
+one shared event loop, so the pool size is what bounds concurrent LLM requests per worker.
+"""
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from app import app, start_webhook_applier
+
+start_webhook_applier()
+
+asgi_app = WSGIMiddleware(app, workers=int(os.environ.get("ASGI_WSGI_THREADS", "200")))
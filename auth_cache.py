@@ -0,0 +1,102 @@
+"""
+In-process cache of authenticated API keys.
+
+require_api_key looks the key up here before touching the database. Entries are
+lightweight AuthenticatedUser records instead of ORM instances, expire after a short
+TTL and are dropped explicitly whenever a user's subscription changes.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class AuthenticatedUser:
+    """Read-only snapshot of the User columns request handlers need."""
+    __slots__ = ("id", "username", "subscription_status", "subscription_plan", "stripe_customer_id")
+
+    def __init__(self, id, username, subscription_status, subscription_plan, stripe_customer_id):
+        self.id = id
+        self.username = username
+        self.subscription_status = subscription_status
+        self.subscription_plan = subscription_plan
+        self.stripe_customer_id = stripe_customer_id
+
+    @classmethod
+    def from_model(cls, user):
+        return cls(user.id, user.username, user.subscription_status, user.subscription_plan, user.stripe_customer_id)
+
+    def __repr__(self):
+        return f'<AuthenticatedUser {self.username}>'
+
+
+class AuthCache:
+    def __init__(self, ttl=30, max_entries=10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        """AUTH_CACHE_TTL in seconds (0 disables caching) and AUTH_CACHE_MAX_ENTRIES."""
+        return cls(
+            ttl=float(os.environ.get("AUTH_CACHE_TTL", "30")),
+            max_entries=int(os.environ.get("AUTH_CACHE_MAX_ENTRIES", "10000")),
+        )
+
+    def get(self, api_key):
+        """Returns the cached AuthenticatedUser for api_key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(api_key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(api_key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._remove(api_key)
+            self.misses += 1
+            return None
+
+    def put(self, api_key, user):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._remove(api_key)
+            self._entries[api_key] = (self.clock() + self.ttl, user)
+            self._keys_by_user.setdefault(user.id, set()).add(api_key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        """Drops every cached key of a user, e.g. after their subscription changed."""
+        with self._lock:
+            for api_key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(api_key)
+
+    def _remove(self, api_key):
+        # Callers hold self._lock.
+        entry = self._entries.pop(api_key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user.get(entry[1].id)
+        if keys is not None:
+            keys.discard(api_key)
+            if not keys:
+                del self._keys_by_user[entry[1].id]
+
+    def clear(self):
+        """Drops every entry and resets the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,62 @@
+"""
+Process-wide asyncio loop running on a daemon thread.
+
+Async clients (LLM SDKs, httpx) keep connection pools that are bound to the event loop
+that opened them, while Flask runs every async view on a short-lived loop of its own.
+Work that should reuse such clients across requests is scheduled on this loop instead.
+"""
+import asyncio
+import os
+import threading
+
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+def get_event_loop():
+    """Returns the shared event loop, starting it on first use."""
+    global _loop, _loop_pid
+    if _loop is not None and _loop_pid == os.getpid():
+        return _loop
+    with _loop_lock:
+        # Re-create the loop after a fork: the thread running the parent's loop is not inherited.
+        if _loop is None or _loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="background-loop", daemon=True).start()
+            _loop, _loop_pid = loop, os.getpid()
+    return _loop
+
+async def run_on_loop(coro):
+    """Runs a coroutine on the shared loop and awaits its result from any other loop."""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, get_event_loop()))
+
+def run_sync(coro):
+    """Runs a coroutine on the shared loop and blocks the calling thread until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+def iterate(make_async_iterator):
+    """
+    Synchronous generator over an async iterator that runs on the shared loop.
+
+    make_async_iterator is called on the loop, so it may create loop-bound clients. Items
+    are pulled one at a time as the caller asks for them; closing the generator closes
+    the async iterator.
+    """
+    async def start():
+        return make_async_iterator()
+
+    async def next_item():
+        return await anext(iterator)
+
+    async def close():
+        await iterator.aclose()
+
+    iterator = run_sync(start())
+    try:
+        while True:
+            try:
+                yield run_sync(next_item())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_sync(close())
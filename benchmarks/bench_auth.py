@@ -0,0 +1,59 @@
+"""
+Per-request cost of API-key authentication with and without the in-process auth cache.
+
+"uncached" clears api_key_cache before every call, which is the old behaviour of one
+SQLite query plus ORM hydration per request; "cached" serves repeat keys from memory.
+Both the bare lookup and a full request to /api/v1/me_api are timed.
+
+Usage: python benchmarks/bench_auth.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def per_call_us(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    from app import app, db, User, api_key_cache, authenticate_api_key
+
+    with app.app_context():
+        db.create_all()
+        if not User.query.filter_by(username='loadtest').first():
+            db.session.add(User(username='loadtest', api_key='loadtest-key'))
+            db.session.commit()
+
+        def uncached_lookup():
+            api_key_cache.clear()
+            authenticate_api_key('loadtest-key')
+
+        def cached_lookup():
+            authenticate_api_key('loadtest-key')
+
+        print(f"lookup   uncached {per_call_us(uncached_lookup, iterations):8.1f} us   "
+              f"cached {per_call_us(cached_lookup, iterations):8.1f} us")
+
+    headers = {'X-API-Key': 'loadtest-key'}
+    with app.test_client() as client:
+        def uncached_request():
+            api_key_cache.clear()
+            client.get('/api/v1/me_api', headers=headers)
+
+        def cached_request():
+            client.get('/api/v1/me_api', headers=headers)
+
+        print(f"request  uncached {per_call_us(uncached_request, iterations):8.1f} us   "
+              f"cached {per_call_us(cached_request, iterations):8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
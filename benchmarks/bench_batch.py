@@ -0,0 +1,51 @@
+"""
+Wall time for N prompts sent one request each vs. one /api/v1/batch request.
+
+Models are pointed at benchmarks/fake_llm_server.py with a fixed latency per completion.
+The response cache is disabled so every prompt reaches the fake provider.
+
+Usage: python benchmarks/bench_batch.py [prompts] [latency_seconds] [concurrency]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+
+from fake_llm_server import start_server
+from load_test import point_models_at
+
+
+def main():
+    prompts = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    from app import app, db, User
+
+    server = start_server(latency=latency)
+    point_models_at(server)
+    with app.app_context():
+        db.create_all()
+        if not User.query.filter_by(username='loadtest').first():
+            db.session.add(User(username='loadtest', api_key='loadtest-key'))
+            db.session.commit()
+
+    headers = {'X-API-Key': 'loadtest-key'}
+    with app.test_client() as client:
+        started = time.perf_counter()
+        for i in range(prompts):
+            client.post('/api/v1/legal/assistance', json={'prompt': f'question {i}'}, headers=headers)
+        print(f"{prompts} requests      {time.perf_counter() - started:6.2f} s")
+
+        items = [{'service': 'provide_legal_assistance', 'prompt': f'question {i}'} for i in range(prompts)]
+        started = time.perf_counter()
+        response = client.post('/api/v1/batch', json={'items': items, 'concurrency': concurrency}, headers=headers)
+        lines = response.data.decode().splitlines()
+        print(f"1 batch (c={concurrency:<3})  {time.perf_counter() - started:6.2f} s   {len(lines)} results")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+A burst of identical and distinct prompts against a fake provider, with and without the
+concurrency governor.
+
+`burst` concurrent calls of generate_social_media_post are issued at once: half for the
+same campaign description, half for distinct ones. "ungoverned" disables singleflight
+and the provider cap; "governed" coalesces the identical calls and caps the provider at
+LLM_CONCURRENCY_VERTEX (the `cap` argument). The response cache is off in both runs.
+The table shows upstream requests, peak concurrent upstream requests and wall time.
+
+Usage: python benchmarks/bench_coalescing.py [burst] [latency_seconds] [cap]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_openai import ChatOpenAI
+
+from fake_llm_server import base_url, start_server
+
+
+def main():
+    burst = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    cap = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    import google_ai
+    from background_loop import run_sync
+    from governor import ProviderLimits, Singleflight
+    from response_cache import ResponseCache
+
+    google_ai.response_cache = ResponseCache(max_entries=0)
+    prompts = ["Summer sale: 30% off all sneakers"] * (burst // 2) + [f"Product launch #{i}" for i in range(burst - burst // 2)]
+
+    async def run_burst():
+        return await asyncio.gather(*[google_ai.arun_service("generate_social_media_post", p) for p in prompts])
+
+    class NoCoalescing(Singleflight):
+        async def ado(self, key, make_coro):
+            return await make_coro()
+
+    for label, flight, limits in (
+        ("ungoverned", NoCoalescing(), ProviderLimits({})),
+        (f"governed c={cap}", Singleflight(), ProviderLimits({"vertex": cap})),
+    ):
+        server = start_server(latency=latency)
+        google_ai.model_registry = google_ai.ModelRegistry({
+            "vertex": lambda model_name: ChatOpenAI(model=model_name, base_url=base_url(server), api_key="fake",
+                                                    max_retries=0, timeout=120),
+        })
+        google_ai.singleflight, google_ai.provider_limits = flight, limits
+        started = time.perf_counter()
+        answers = run_sync(run_burst())
+        elapsed = time.perf_counter() - started
+        handler = server.RequestHandlerClass
+        errors = sum(answer.startswith("Error") for answer in answers)
+        print(f"{label:<18} upstream requests {handler.requests:4d}   peak concurrent {handler.peak_in_flight:4d}   "
+              f"{elapsed:6.2f} s   errors {errors}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Latency of provide_conflict_debug_assistance when one panel member hangs.
+
+Three providers are pointed at a fast fake LLM server and Claude at one that answers
+after `slow_latency` seconds. With a quorum of 4 the endpoint waits for the per-model
+deadline; with a quorum of 3 the synthesis starts as soon as the fast members answered.
+
+Usage: python benchmarks/bench_conflict_debug.py [fast_latency] [slow_latency] [deadline]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_openai import ChatOpenAI
+
+from fake_llm_server import base_url, start_server
+
+
+def main():
+    fast_latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    slow_latency = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+    deadline = float(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    import google_ai
+
+    fast, slow = start_server(latency=fast_latency), start_server(latency=slow_latency)
+
+    def factory(server):
+        return lambda model_name: ChatOpenAI(model=model_name, base_url=base_url(server), api_key="fake", max_retries=0)
+
+    google_ai.model_registry = google_ai.ModelRegistry({
+        "vertex": factory(fast), "openai": factory(fast), "nvidia": factory(fast), "anthropic": factory(slow),
+    })
+    google_ai.CONFLICT_DEBUG_DEADLINE = deadline
+
+    for quorum in (4, 3):
+        google_ai.CONFLICT_DEBUG_QUORUM = quorum
+        started = time.perf_counter()
+        answer = google_ai.provide_conflict_debug_assistance("merge conflict in requirements.txt")
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"quorum {quorum}: {elapsed:7.0f} ms   {answer.splitlines()[-1]}")
+    fast.shutdown()
+
+
+if __name__ == "__main__":
+    main()
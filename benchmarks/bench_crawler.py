@@ -0,0 +1,145 @@
+"""
+Link checking of a page with 10k links: old unbounded gather vs. the crawler engine.
+
+A local HTTP server serves "/" with `links` anchors pointing back at itself and answers
+every other path after `latency` seconds. The baseline mirrors the previous
+analyze_website (one coroutine per anchor in a single asyncio.gather, fresh client);
+the crawler run uses crawler.check_links with its concurrency and per-host limits.
+The stdlib server speaks HTTP/1.1 only, so keep-alive is exercised but HTTP/2 is not.
+
+The baseline runs in a child process that is killed after `baseline_cap` seconds.
+
+Usage: python benchmarks/bench_crawler.py [links] [latency_seconds] [concurrency] [baseline_cap_seconds]
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+import crawler
+
+
+class LinkPageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    page = b""
+    latency = 0.05
+    # multiprocessing.Value counters shared with the benchmark process.
+    in_flight = None
+    max_in_flight = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        with self.in_flight.get_lock():
+            self.in_flight.value += 1
+            self.max_in_flight.value = max(self.max_in_flight.value, self.in_flight.value)
+        time.sleep(self.latency)
+        with self.in_flight.get_lock():
+            self.in_flight.value -= 1
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(self.page)))
+        self.end_headers()
+        self.wfile.write(self.page)
+
+
+class LinkPageServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def serve(port, page, latency, in_flight, max_in_flight):
+    # Runs in its own process so the server threads do not compete with the client for the GIL.
+    handler = type("Handler", (LinkPageHandler,), {
+        "page": page, "latency": latency, "in_flight": in_flight, "max_in_flight": max_in_flight,
+    })
+    LinkPageServer(("127.0.0.1", port), handler).serve_forever()
+
+
+def free_port():
+    with LinkPageServer(("127.0.0.1", 0), BaseHTTPRequestHandler) as probe:
+        return probe.server_port
+
+
+async def baseline(links, results):
+
+    async def check(client, link_data):
+        try:
+            response = await client.head(link_data['url'], timeout=5)
+            results['broken' if response.status_code >= 400 else 'ok'].append(link_data)
+        except httpx.RequestError:
+            results['broken'].append(link_data)
+
+    async with httpx.AsyncClient() as client:
+        await asyncio.gather(*[check(client, link_data) for link_data in links])
+
+
+def run_baseline(links, max_in_flight):
+    results = {'ok': [], 'broken': [], 'slow': []}
+    started = time.perf_counter()
+    asyncio.run(baseline(links, results))
+    counts = {category: len(items) for category, items in results.items()}
+    print(f"{'baseline gather':<18} {time.perf_counter() - started:6.2f} s   "
+          f"peak server connections {max_in_flight.value:5d}   {counts}")
+
+
+async def engine(links, concurrency):
+    counts = {'ok': 0, 'broken': 0, 'slow': 0, 'unchecked': 0}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+        async for category, _ in crawler.check_links(client, links, concurrency=concurrency, per_host=concurrency):
+            counts[category] += 1
+    return counts
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    baseline_cap = float(sys.argv[4]) if len(sys.argv) > 4 else 120
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    page = ("<html><body>" + "".join(
+        f'<a href="/link/{i}">link {i}</a>' for i in range(count)
+    ) + "</body></html>").encode()
+    in_flight, max_in_flight = multiprocessing.Value("i", 0), multiprocessing.Value("i", 0)
+    server = multiprocessing.Process(target=serve, args=(port, page, latency, in_flight, max_in_flight), daemon=True)
+    server.start()
+    time.sleep(0.5)
+
+    links = crawler.extract_links(base_url + "/", page)
+    print(f"{len(links)} unique links, {latency * 1000:.0f} ms per check")
+    max_in_flight.value = 0
+    started = time.perf_counter()
+    counts = asyncio.run(engine(links, concurrency))
+    print(f"{f'crawler c={concurrency}':<18} {time.perf_counter() - started:6.2f} s   "
+          f"peak server connections {max_in_flight.value:5d}   {counts}")
+
+    # The unbounded gather can starve its own event loop, so it runs in a process that is
+    # killed once the cap expires instead of relying on asyncio timeouts.
+    max_in_flight.value = 0
+    worker = multiprocessing.Process(target=run_baseline, args=(links, max_in_flight))
+    worker.start()
+    worker.join(baseline_cap)
+    if worker.is_alive():
+        worker.terminate()
+        print(f"{'baseline gather':<18} did not finish within {baseline_cap:g} s   "
+              f"peak server connections {max_in_flight.value:5d}")
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
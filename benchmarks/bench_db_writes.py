@@ -0,0 +1,88 @@
+"""
+Concurrent writers against one SQLite file: each thread commits its own transactions
+(rollback journal, then WAL), against the same writes going through WriteQueue, which
+commits whatever queued up meanwhile in one transaction.
+
+Each write inserts one row, like a payment intent or a webhook status update. Errors
+("database is locked" after the busy timeout) are counted rather than raised.
+
+Usage: python benchmarks/bench_db_writes.py [writes_per_thread]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+
+import database
+from database import WriteQueue
+
+INSERT = text("INSERT INTO payments (user_id, amount, status) VALUES (:user_id, :amount, 'pending')")
+
+
+def make_store(path, wal):
+    os.environ["SQLITE_WAL"] = "1" if wal else "0"
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = database.engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+    db = SQLAlchemy(app)
+    with app.app_context():
+        database.configure_sqlite(db.engine)
+        db.session.execute(text(
+            "CREATE TABLE payments (id INTEGER PRIMARY KEY, user_id INTEGER, amount INTEGER, status TEXT)"))
+        db.session.commit()
+    return app, db
+
+
+def run(app, db, writes, threads, per_thread):
+    start = threading.Barrier(threads + 1)
+    errors = []
+
+    def work(user_id):
+        with app.app_context():
+            start.wait()
+            for amount in range(per_thread):
+                try:
+                    writes.run(lambda: db.session.execute(INSERT, {"user_id": user_id, "amount": amount}))
+                except Exception as e:
+                    errors.append(e)
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    start.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    return threads * per_thread / elapsed, len(errors)
+
+
+def main():
+    per_thread = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    scenarios = (
+        ("rollback journal, direct", False, False),
+        ("WAL, direct", True, False),
+        ("WAL, write queue", True, True),
+    )
+    for threads in (1, 8, 32):
+        for name, wal, queued in scenarios:
+            with tempfile.TemporaryDirectory() as tmp:
+                app, db = make_store(os.path.join(tmp, "bench.db"), wal)
+                writes = WriteQueue(app, db, enabled=queued)
+                rate, errors = run(app, db, writes, threads, per_thread)
+                batches = f"   {writes.writes / writes.batches:5.1f} writes/commit" if writes.batches else ""
+                print(f"{threads:2d} threads   {name:26s} {rate:8.0f} writes/s   {errors} errors{batches}")
+                with app.app_context():
+                    db.engine.dispose()
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Request latency while the primary provider hangs, without and with the failover router.
+
+Vertex is pointed at a fake LLM server that answers after `hang` seconds and Anthropic
+at a fast one. Each async persona call gets LLM_ATTEMPT_TIMEOUT = `timeout` seconds.
+"no failover" routes to Vertex only with a breaker that never opens, so every request
+burns the whole timeout. "router" fails over to Claude: the first `failures` requests
+still wait for the timeout, then the breaker opens and requests go straight to Claude.
+
+Usage: python benchmarks/bench_failover.py [requests] [timeout_seconds] [hang_seconds] [failures]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_openai import ChatOpenAI
+
+from fake_llm_server import base_url, start_server
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    timeout = float(sys.argv[2]) if len(sys.argv) > 2 else 2
+    hang = float(sys.argv[3]) if len(sys.argv) > 3 else 30
+    failures = int(sys.argv[4]) if len(sys.argv) > 4 else 3
+
+    import google_ai
+    from background_loop import run_sync
+    from response_cache import ResponseCache
+    from router import ModelRouter
+
+    hung, fast = start_server(latency=hang), start_server(latency=0.2)
+
+    def factory(server):
+        return lambda model_name: ChatOpenAI(model=model_name, base_url=base_url(server), api_key="fake", max_retries=0)
+
+    google_ai.model_registry = google_ai.ModelRegistry({"vertex": factory(hung), "anthropic": factory(fast)})
+    google_ai.response_cache = ResponseCache(max_entries=0)
+    google_ai.LLM_ATTEMPT_TIMEOUT = timeout
+    gemini = ("vertex", "gemini-1.5-flash")
+
+    for label, router in (
+        ("no failover", ModelRouter({}, failure_threshold=10 ** 9)),
+        ("router", ModelRouter({gemini: [("anthropic", "claude-3-5-sonnet-20240620")]}, failure_threshold=failures)),
+    ):
+        google_ai.model_router = router
+        latencies = []
+        for i in range(requests):
+            started = time.perf_counter()
+            run_sync(google_ai.arun_service("provide_legal_assistance", f"contract {i}"))
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        print(f"{label:<12} total {sum(latencies):6.1f} s   median {latencies[len(latencies) // 2] * 1000:6.0f} ms   "
+              f"max {latencies[-1] * 1000:6.0f} ms   vertex breaker {router.breaker('vertex').state}")
+    fast.shutdown()
+
+
+if __name__ == "__main__":
+    main()
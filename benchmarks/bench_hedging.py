@@ -0,0 +1,72 @@
+"""
+Tail latency of translate_text with and without hedging.
+
+The primary model answers in about 200 ms, except for `tail_share` of the calls that take
+`tail_seconds`; the secondary answers in about 300 ms. Calls are issued `concurrency`
+at a time through google_ai.arun_service with in-process fake models. The first `warmup`
+calls fill the latency histogram that sets the hedge threshold.
+
+Usage: python benchmarks/bench_hedging.py [calls] [tail_share] [tail_seconds] [concurrency]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.runnables import RunnableLambda
+
+
+def fake_model(latency):
+    async def respond(prompt_value):
+        await asyncio.sleep(latency())
+        return "translated"
+    return RunnableLambda(lambda prompt_value: "translated", afunc=respond)
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    tail_share = float(sys.argv[2]) if len(sys.argv) > 2 else 0.04
+    tail_seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 3
+    concurrency = int(sys.argv[4]) if len(sys.argv) > 4 else 20
+    warmup = 100
+
+    import google_ai
+    from background_loop import run_sync
+    from hedging import HedgePolicy
+    from response_cache import ResponseCache
+
+    google_ai.response_cache = ResponseCache(max_entries=0)
+    google_ai.model_registry = google_ai.ModelRegistry({
+        "vertex": lambda model_name: fake_model(
+            lambda: tail_seconds if random.random() < tail_share else random.uniform(0.15, 0.25)),
+        "openai": lambda model_name: fake_model(lambda: random.uniform(0.25, 0.35)),
+    })
+
+    async def run(count):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with semaphore:
+                started = time.perf_counter()
+                await google_ai.arun_service("translate_text", f"texto {i}", "English")
+                return time.perf_counter() - started
+
+        return sorted(await asyncio.gather(*[one(i) for i in range(count)]))
+
+    for label, enabled in (("no hedging", False), ("hedging", True)):
+        random.seed(7)
+        google_ai.hedge_policy = HedgePolicy(enabled=enabled)
+        run_sync(run(warmup))
+        before = google_ai.hedge_policy.stats().get("translate_text", {"hedged": 0})["hedged"]
+        latencies = run_sync(run(calls))
+        stats = google_ai.hedge_policy.stats().get("translate_text", {"hedged": 0, "threshold_ms": 0})
+        extra = stats["hedged"] - before
+        pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+        print(f"{label:<11} p50 {pct(0.5):6.0f} ms   p95 {pct(0.95):6.0f} ms   p99 {pct(0.99):6.0f} ms   "
+              f"threshold {stats['threshold_ms']:5d} ms   extra requests {extra:4d} ({extra / calls * 100:.1f}%)")
+
+if __name__ == "__main__":
+    main()
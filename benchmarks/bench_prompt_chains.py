@@ -0,0 +1,59 @@
+"""
+Microbenchmark for the per-request Python overhead of the google_ai persona services.
+
+Compares rebuilding `ChatPromptTemplate.from_messages(...) | model | StrOutputParser()`
+on every call (the old behaviour) with the cached chain lookup in google_ai.get_chain().
+No network calls are made: models come from LangChain's FakeListChatModel.
+
+Usage: python benchmarks/bench_prompt_chains.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+import google_ai
+
+SERVICE = "provide_legal_assistance"
+
+
+def rebuild_chain(model):
+    persona = google_ai.PERSONAS[SERVICE]
+    prompt_template = ChatPromptTemplate.from_messages([
+        ("system", persona["system"]),
+        ("user", persona["user"])
+    ])
+    return prompt_template | model | StrOutputParser()
+
+
+def measure(label, fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_call_us = (time.perf_counter() - started) / iterations * 1e6
+    print(f"{label:<32} {per_call_us:10.2f} us/call")
+    return per_call_us
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    google_ai.model_registry = google_ai.ModelRegistry({
+        "vertex": lambda model_name: FakeListChatModel(responses=["ok"]),
+    })
+    model = google_ai.get_model()
+    google_ai.get_chain(SERVICE)
+
+    print(f"{iterations} iterations, service={SERVICE}")
+    legacy = measure("rebuild chain per request", lambda: rebuild_chain(model), iterations)
+    cached = measure("cached get_chain() lookup", lambda: google_ai.get_chain(SERVICE), iterations)
+    print(f"speedup: {legacy / cached:.0f}x")
+    measure("cached chain + fake invoke", lambda: google_ai.run_service(SERVICE, "contract law"), iterations // 10)
+
+
+if __name__ == "__main__":
+    main()
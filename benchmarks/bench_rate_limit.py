@@ -0,0 +1,41 @@
+"""
+Per-request cost of the rate limiter for a growing number of tracked users.
+
+Each backend is filled with `users` buckets first, then random users are checked
+`iterations` times; the per-check cost should not grow with the number of users.
+
+Usage: python benchmarks/bench_rate_limit.py [iterations]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limit import MemoryBackend, RateLimiter, SQLiteBackend
+
+
+def per_check_us(limiter, users, iterations):
+    for user_id in range(users):
+        limiter.check(user_id, 'free')
+    keys = [random.randrange(users) for _ in range(iterations)]
+    started = time.perf_counter()
+    for user_id in keys:
+        limiter.check(user_id, 'free')
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as directory:
+        for users in (10, 1000, 100000):
+            memory = per_check_us(RateLimiter(backend=MemoryBackend()), users, iterations)
+            sqlite = per_check_us(RateLimiter(backend=SQLiteBackend(os.path.join(directory, f"{users}.db"))),
+                                  users, iterations)
+            print(f"{users:>7} users   memory {memory:7.2f} µs/check   sqlite {sqlite:7.2f} µs/check")
+
+
+if __name__ == "__main__":
+    main()
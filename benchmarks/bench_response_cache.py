@@ -0,0 +1,45 @@
+"""
+Latency of a persona service call with a cold and a warm response cache.
+
+Models are pointed at benchmarks/fake_llm_server.py; the cold run pays the fake provider
+latency, the warm runs (exact repeat and, with the semantic tier, a reworded repeat) do not.
+
+Usage: python benchmarks/bench_response_cache.py [latency_seconds] [semantic_threshold]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_llm_server import start_server
+from load_test import point_models_at
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.9
+
+    import google_ai
+    from response_cache import ResponseCache
+
+    server = start_server(latency=latency)
+    point_models_at(server)
+    google_ai.response_cache = ResponseCache(semantic_threshold=threshold)
+
+    service = google_ai.provide_legal_assistance
+    print(f"cold            {timed(service, 'How do I review a supplier contract?'):8.2f} ms")
+    print(f"exact repeat    {timed(service, 'How do I review a  supplier contract?'):8.2f} ms")
+    print(f"reworded repeat {timed(service, 'how do I review a supplier contract'):8.2f} ms")
+    print(google_ai.response_cache.stats())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
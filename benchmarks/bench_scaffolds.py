@@ -0,0 +1,51 @@
+"""
+Per-request cost of the develop scaffolds: rendering the templates on every call (as the
+endpoints used to, with every _() lookup) against joining the parts precompiled for the
+request's locale. Zip bundles are timed too.
+
+Usage: python benchmarks/bench_scaffolds.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, app_scaffold, backend_scaffold, game_scaffold
+
+PROMPTS = {
+    "game": (game_scaffold, "name: Space Quest\ndescription: Dodge the rocks"),
+    "app": (app_scaffold, "name: Groceries\ndescription: What to buy"),
+    "backend": (backend_scaffold, "route: /ping\nmessage: pong"),
+}
+
+
+def rendered(project, values):
+    """The message as it was built before: render the templates, then format."""
+    intro, files = project.render(**values)
+    blocks = [intro] + [f"**{name}:**\n```\n{content.strip()}\n```" for name, content in files.items()]
+    return "\n".join(blocks)
+
+
+def per_call_us(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    for locale in ("en", "es"):
+        with app.test_request_context(headers={"Accept-Language": locale}):
+            for name, (project, prompt) in PROMPTS.items():
+                values = project.values(prompt)
+                before = per_call_us(lambda: rendered(project, values), iterations)
+                after = per_call_us(lambda: project.message(**project.values(prompt)), iterations)
+                bundle = per_call_us(lambda: project.bundle(**values), iterations // 10)
+                print(f"{locale} {name:8s} rendered {before:7.1f} µs   precompiled {after:6.1f} µs   "
+                      f"zip {bundle:6.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
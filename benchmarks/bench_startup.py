@@ -0,0 +1,55 @@
+"""
+Cold-start cost of the app measured with `python -X importtime`.
+
+Runs `import app` in fresh interpreters and reports the median cumulative import time,
+the slowest direct imports of app, and the provider SDK imports that are now deferred
+until the first LLM client is built. tests/test_startup.py guards the same numbers.
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def importtime(code):
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((name.rstrip(), int(cumulative)))
+    return modules
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    app_times = []
+    for _ in range(runs):
+        modules = importtime('import app')
+        app_times.append(dict((name.strip(), us) for name, us in modules)['app'])
+    print(f"import app: median {statistics.median(app_times) / 1000:.0f} ms over {runs} runs")
+
+    print("slowest direct imports of app:")
+    # importtime indents each nesting level by two spaces after a single leading space.
+    direct = [(name.strip(), us) for name, us in modules if len(name) - len(name.lstrip()) == 3]
+    for name, us in sorted(direct, key=lambda item: -item[1])[:8]:
+        print(f"  {name:<28} {us / 1000:7.0f} ms")
+
+    deferred = dict((name.strip(), us) for name, us in importtime(
+        "import app\n"
+        "import langchain_google_vertexai, langchain_openai, langchain_anthropic, langchain_nvidia_ai_endpoints\n"
+    ))
+    print("deferred until the first client of each provider is built:")
+    for name in ('langchain_google_vertexai', 'langchain_openai', 'langchain_anthropic', 'langchain_nvidia_ai_endpoints'):
+        print(f"  {name:<28} {deferred[name] / 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Time-to-first-byte of an assistant endpoint with and without ?stream=1.
+
+Models are pointed at benchmarks/fake_llm_server.py, which waits `latency` seconds
+before the first token and then emits one word every `token_interval` seconds.
+
+Usage: python benchmarks/bench_streaming_ttfb.py [latency_seconds] [token_interval_seconds]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_llm_server import start_server
+from load_test import point_models_at
+
+
+def first_byte_and_total(client, path, headers):
+    started = time.perf_counter()
+    response = client.post(path, json={'prompt': 'contract review'}, headers=headers, buffered=False)
+    chunks = response.iter_encoded()
+    next(chunks)
+    first = time.perf_counter() - started
+    for _ in chunks:
+        pass
+    return first, time.perf_counter() - started
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    token_interval = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+
+    from app import app, db, User
+
+    server = start_server(latency=latency, token_interval=token_interval)
+    point_models_at(server)
+    with app.app_context():
+        db.create_all()
+        if not User.query.filter_by(username='loadtest').first():
+            db.session.add(User(username='loadtest', api_key='loadtest-key'))
+            db.session.commit()
+
+    headers = {'X-API-Key': 'loadtest-key'}
+    with app.test_client() as client:
+        for label, path in (("json", '/api/v1/legal/assistance'), ("stream", '/api/v1/legal/assistance?stream=1')):
+            first, total = first_byte_and_total(client, path, headers)
+            print(f"{label:<7} first byte {first * 1000:7.0f} ms   complete {total * 1000:7.0f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Replays a burst of Stripe webhook events (every event delivered twice, as Stripe does
+when acknowledgements are slow) against a throwaway SQLite database.
+
+"inline" applies and commits each delivery inside the request, as the webhook used to.
+"recorded" only records the event, answers, and leaves the work to the batched applier,
+whose drain time is reported separately. Deliveries come from several threads, like
+concurrent webhook requests.
+
+Usage: python benchmarks/bench_webhook_replay.py [events] [threads]
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TMP = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP.name, 'webhooks.db')}"
+
+from app import app, apply_stripe_event, db, db_writes, Payment, stripe_events, User
+
+
+def make_events(count, payments):
+    kinds = ("payment_intent.succeeded", "payment_intent.payment_failed")
+    return [{
+        "id": f"evt_{i}",
+        "created": i,
+        "type": kinds[i % 2],
+        "data": {"object": {"id": f"pi_{i}", "metadata": {"payment_id": str(payments[i % len(payments)])}}},
+    } for i in range(count)]
+
+
+def reset(payments=1000):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username="bench", api_key="bench")
+        db.session.add(user)
+        db.session.commit()
+        db.session.add_all(Payment(user_id=user.id, amount=100, currency="usd") for _ in range(payments))
+        db.session.commit()
+        return [payment.id for payment in Payment.query.all()]
+
+
+def deliver(deliveries, threads, handle):
+    start = threading.Barrier(threads + 1)
+
+    def work(part):
+        with app.app_context():
+            start.wait()
+            for event in part:
+                handle(event)
+
+    workers = [threading.Thread(target=work, args=(deliveries[i::threads],)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    start.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+
+def inline(event):
+    db_writes.run(lambda: apply_stripe_event(json.loads(json.dumps(event))))
+
+
+def recorded(event):
+    stripe_events.record(event["id"], event["type"], json.dumps(event), event["created"])
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    stripe_events.ensure_started = lambda: None  # drained explicitly below
+
+    events = make_events(count, reset())
+    deliveries = [event for event in events for _ in range(2)]
+    elapsed = deliver(deliveries, threads, inline)
+    print(f"inline     {len(deliveries)} deliveries in {elapsed:6.2f} s   {len(deliveries) / elapsed:7.0f}/s   "
+          f"{count} events applied twice")
+
+    events = make_events(count, reset())
+    deliveries = [event for event in events for _ in range(2)]
+    elapsed = deliver(deliveries, threads, recorded)
+    with app.app_context():
+        started = time.perf_counter()
+        applied = stripe_events.drain()
+        drained = time.perf_counter() - started
+        stats = stripe_events.stats()
+    print(f"recorded   {len(deliveries)} deliveries in {elapsed:6.2f} s   {len(deliveries) / elapsed:7.0f}/s   "
+          f"{stats['duplicates']} duplicates acknowledged without a write")
+    print(f"applier    {applied} events in {drained:6.2f} s   {applied / drained:7.0f}/s   "
+          f"{stats['batches']} transactions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Parsing and rendering website specs with thousands of sections: the original
+generate_website loop (split per line, a dict per section, += on the page, one _() per
+image) against website_spec's single-pass parser and join-based emitter, as
+generate_website now uses them. Times cover parse and <main> rendering.
+
+Usage: python benchmarks/bench_website_spec.py [sections ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_babel import _
+
+from app import app, website_scaffold
+import website_spec
+
+
+def original(prompt):
+    structure = {'sections': []}
+    current_section = None
+    for i, line in enumerate(prompt.splitlines()):
+        if not line.strip():
+            continue
+        indentation = len(line) - len(line.lstrip(' '))
+        try:
+            key, value = line.strip().split(':', 1)
+            key = key.strip().lower()
+            value = value.strip()
+        except ValueError:
+            return None
+        if indentation == 0:
+            if key == 'section':
+                current_section = {'title': value, 'content': {}}
+                structure['sections'].append(current_section)
+            else:
+                structure[key] = value
+                current_section = None
+        elif indentation > 0 and current_section:
+            current_section['content'][key] = value
+        else:
+            return None
+    main_content = ""
+    for section in structure['sections']:
+        main_content += "    <section>\n"
+        main_content += f"      <h2>{section.get('title', '')}</h2>\n"
+        if 'text' in section['content']:
+            main_content += f"      <p>{section['content']['text']}</p>\n"
+        if 'images' in section['content']:
+            num_images = int(section['content']['images'])
+            for i in range(num_images):
+                alt_text = _("placeholder image %(number)s", number=i+1)
+                main_content += f"      <img src='https://via.placeholder.com/150' alt='{alt_text}'>\n"
+        main_content += "    </section>\n"
+    return main_content
+
+
+def current(prompt):
+    site, errors = website_spec.parse(prompt)
+    return website_spec.emit_main(site, website_scaffold.constants()['images'])
+
+
+def best_ms(fn, prompt, repeat=5):
+    times = []
+    for attempt in range(repeat):
+        started = time.perf_counter()
+        fn(prompt)
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000]
+    with app.test_request_context(headers={'Accept-Language': 'es'}):
+        for count in counts:
+            prompt = "title: Bench\n" + "\n".join(
+                f"section: Section {i}\n  text: Paragraph {i}\n  images: {i % 4}" for i in range(count))
+            assert original(prompt) == current(prompt)
+            before, after = best_ms(original, prompt), best_ms(current, prompt)
+            print(f"{count:6d} sections   original {before:8.2f} ms   single pass {after:8.2f} ms   "
+                  f"{before / after:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Local fake LLM server speaking the OpenAI chat-completions protocol.
+
+Every completion sleeps for a fixed latency before answering, which makes it possible to
+measure how many LLM calls a worker keeps in flight without touching a real provider.
+Streaming requests ("stream": true) are answered with SSE chunks, one word every
+token_interval seconds; non-streaming requests wait for the same generation time.
+
+Usage: python benchmarks/fake_llm_server.py [port] [latency_seconds]
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = "This is a canned answer from the fake LLM server."
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.5
+    token_interval = 0.0
+    # Per-server counters; start_server() gives every server its own handler class.
+    requests = 0
+    in_flight = 0
+    peak_in_flight = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests += 1
+            cls.in_flight += 1
+            cls.peak_in_flight = max(cls.peak_in_flight, cls.in_flight)
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(self.latency)
+            if body.get("stream"):
+                self._stream(body)
+            else:
+                self._complete(body)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _complete(self, body):
+        time.sleep(self.token_interval * len(REPLY.split(" ")))
+        payload = json.dumps({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": REPLY},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, body):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        words = REPLY.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else " " + word},
+                    "finish_reason": None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.token_interval)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start_server(port=0, latency=0.5, token_interval=0.0):
+    """Starts the fake server on a background thread and returns it; server.server_port holds the port."""
+    handler = type("Handler", (FakeLLMHandler,), {
+        "latency": latency, "token_interval": token_interval, "lock": threading.Lock(),
+    })
+    server = FakeLLMServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_port}/v1"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8808
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    server = FakeLLMServer(("127.0.0.1", port), type("Handler", (FakeLLMHandler,), {"latency": latency}))
+    print(f"Fake LLM server listening on {base_url(server)} (latency {latency}s)")
+    server.serve_forever()
@@ -0,0 +1,87 @@
+"""
+Load test for the async LLM execution path against a local fake LLM server.
+
+Every model client is pointed at benchmarks/fake_llm_server.py, which answers each
+completion after a fixed latency. If N concurrent calls finish in roughly one latency
+period, all N were in flight at the same time.
+
+Modes:
+    service  N concurrent google_ai.acall() calls from one event loop
+    asgi     N concurrent POST /api/v1/legal/assistance requests against asgi:asgi_app
+
+Usage: python benchmarks/load_test.py [service|asgi] [concurrency] [latency_seconds]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+import google_ai
+from fake_llm_server import base_url, start_server
+
+
+def point_models_at(server):
+    def factory(model_name):
+        return ChatOpenAI(model=model_name, base_url=base_url(server), api_key="fake", max_retries=0, timeout=60)
+    google_ai.model_registry = google_ai.ModelRegistry({
+        provider: factory for provider in ("vertex", "openai", "anthropic", "nvidia")
+    })
+
+
+async def run_service(concurrency):
+    calls = [
+        google_ai.acall(google_ai.provide_legal_assistance, f"question {i}")
+        for i in range(concurrency)
+    ]
+    return await asyncio.gather(*calls)
+
+
+async def run_asgi(concurrency):
+    from app import app, db, User
+    from asgi import asgi_app
+
+    with app.app_context():
+        db.create_all()
+        if not User.query.filter_by(username='loadtest').first():
+            db.session.add(User(username='loadtest', api_key='loadtest-key'))
+            db.session.commit()
+
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+        requests = [
+            client.post('/api/v1/legal/assistance', json={'prompt': f"question {i}"},
+                        headers={'X-API-Key': 'loadtest-key'})
+            for i in range(concurrency)
+        ]
+        responses = await asyncio.gather(*requests)
+    return [response.json().get('message') for response in responses]
+
+
+def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else "service"
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.5
+
+    server = start_server(latency=latency)
+    point_models_at(server)
+
+    runner = run_service if mode == "service" else run_asgi
+    started = time.perf_counter()
+    results = asyncio.run(runner(concurrency))
+    elapsed = time.perf_counter() - started
+
+    failures = [result for result in results if not result or "Error" in result]
+    print(f"mode={mode} concurrency={concurrency} upstream_latency={latency}s")
+    print(f"wall time: {elapsed:.2f}s  (serial would take {concurrency * latency:.1f}s)")
+    print(f"effective in-flight calls: {concurrency * latency / elapsed:.0f}")
+    print(f"failures: {len(failures)}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
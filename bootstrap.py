@@ -0,0 +1,30 @@
+"""
+Lazy, once-only initialization of provider SDKs.
+
+Heavy SDKs (Vertex AI, LangChain providers, LlamaIndex, Stripe, Meta) are imported and
+configured on first use instead of at import time, so a cold worker can serve pages
+that never touch them without paying for their imports.
+"""
+import functools
+import threading
+
+
+def once(fn):
+    """
+    Decorator for initializers: the first successful call runs fn, later calls return its
+    result without running it again. A call that raises is retried next time.
+    """
+    lock = threading.Lock()
+    state = {}
+
+    @functools.wraps(fn)
+    def wrapper():
+        if "result" in state:
+            return state["result"]
+        with lock:
+            if "result" not in state:
+                state["result"] = fn()
+        return state["result"]
+
+    wrapper.done = lambda: "result" in state
+    return wrapper
@@ -0,0 +1,171 @@
+"""
+Link-checking engine behind analyze_website.
+
+All checks share one HTTP/2 keep-alive httpx client living on the background loop.
+A fixed pool of workers pulls links from the (deduplicated) page, so at most
+CRAWLER_CONCURRENCY requests are in flight overall and CRAWLER_PER_HOST_LIMIT per host,
+and everything still unchecked when CRAWLER_DEADLINE expires is reported as "unchecked".
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import httpx
+from bs4 import BeautifulSoup
+
+from background_loop import iterate
+
+HEADERS = {'User-Agent': 'AI-Agent-Checker/1.0'}
+CONCURRENCY = int(os.environ.get("CRAWLER_CONCURRENCY", "50"))
+PER_HOST_LIMIT = int(os.environ.get("CRAWLER_PER_HOST_LIMIT", "10"))
+DEADLINE = float(os.environ.get("CRAWLER_DEADLINE", "60"))
+LINK_TIMEOUT = float(os.environ.get("CRAWLER_LINK_TIMEOUT", "5"))
+PAGE_TIMEOUT = 10
+# How long past the deadline check_links waits for its workers to report what is left.
+DEADLINE_GRACE = 0.5
+SLOW_THRESHOLD_MS = 1000
+# Servers that answer HEAD with one of these are asked again with GET.
+HEAD_FALLBACK_STATUSES = {403, 405, 501}
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Returns the shared AsyncClient. Must be called from the background loop it is bound to."""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = httpx.AsyncClient(
+                http2=True,
+                headers=HEADERS,
+                limits=httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY),
+            )
+            _client_pid = os.getpid()
+        return _client
+
+def extract_links(base_url, content):
+    """Returns the unique http(s) links of a page as {'url', 'text'} dicts, in page order."""
+    soup = BeautifulSoup(content, 'lxml')
+    links = {}
+    for a_tag in soup.find_all('a', href=True):
+        full_url = urldefrag(urljoin(base_url, a_tag.get('href'))).url
+        if full_url not in links and urlsplit(full_url).scheme in ['http', 'https']:
+            links[full_url] = {'url': full_url, 'text': a_tag.get_text(strip=True)}
+    return list(links.values())
+
+async def check_link(client, link_data, timeout=LINK_TIMEOUT):
+    """Checks one link and returns (category, result) with category 'ok', 'broken' or 'slow'."""
+    full_url = link_data['url']
+    anchor_text = link_data['text']
+    try:
+        start_time = time.perf_counter()
+        response = await client.head(full_url, timeout=timeout)
+        status_code = response.status_code
+        if status_code in HEAD_FALLBACK_STATUSES:
+            # Only the status line is needed, so the body is never read.
+            async with client.stream('GET', full_url, timeout=timeout) as response:
+                status_code = response.status_code
+        response_time = round((time.perf_counter() - start_time) * 1000)
+    except Exception as e:
+        # Not only httpx errors: a malformed host name, for one, raises from idna.
+        return 'broken', {'url': full_url, 'text': anchor_text, 'status': 'Error', 'error': str(e)}
+
+    link_result = {'url': full_url, 'text': anchor_text, 'status': status_code, 'time_ms': response_time}
+    if status_code >= 400:
+        return 'broken', link_result
+    if response_time > SLOW_THRESHOLD_MS:
+        return 'slow', link_result
+    return 'ok', link_result
+
+async def check_links(client, links, concurrency=CONCURRENCY, per_host=PER_HOST_LIMIT, deadline=DEADLINE,
+                      timeout=LINK_TIMEOUT):
+    """
+    Async generator yielding (category, result) for every link as soon as it is checked.
+
+    Links that could not be checked before the deadline are yielded as ('unchecked', link);
+    the generator itself never runs past the deadline.
+    Results are handed over through a queue of size `concurrency`, so memory stays bounded
+    by the concurrency window when the consumer is slower than the checks.
+    """
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + deadline
+    results = asyncio.Queue(maxsize=concurrency)
+    host_slots = defaultdict(lambda: asyncio.Semaphore(per_host))
+    remaining_links = iter(links)
+
+    async def guarded_check(link_data, remaining):
+        async with host_slots[urlsplit(link_data['url']).netloc]:
+            return await check_link(client, link_data, timeout=min(timeout, remaining))
+
+    async def worker():
+        cancelled = False
+        try:
+            for link_data in remaining_links:
+                remaining = stop_at - loop.time()
+                if remaining <= 0:
+                    await results.put(('unchecked', link_data))
+                    continue
+                try:
+                    item = await asyncio.wait_for(guarded_check(link_data, remaining), remaining)
+                except asyncio.TimeoutError:
+                    item = ('unchecked', link_data)
+                await results.put(item)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # The consumer waits for one sentinel per worker, so a worker that fails still posts
+            # its own; a cancelled one has no consumer left.
+            if not cancelled:
+                await results.put(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(links)))]
+    finished = 0
+    reported = set()
+    try:
+        while finished < len(workers):
+            try:
+                # Workers flush what is left as unchecked once the deadline passes; the short
+                # grace period gives them time to do so.
+                item = await asyncio.wait_for(results.get(), max(stop_at - loop.time(), 0) + DEADLINE_GRACE)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                finished += 1
+            else:
+                reported.add(item[1]['url'])
+                yield item
+        for link_data in links:
+            if link_data['url'] not in reported:
+                yield 'unchecked', link_data
+    finally:
+        for task in workers:
+            task.cancel()
+
+async def fetch_links(url):
+    """Fetches a page with the shared client and returns its unique links; raises httpx.HTTPError."""
+    client = get_client()
+    response = await client.get(url, timeout=PAGE_TIMEOUT)
+    response.raise_for_status()
+    return extract_links(url, response.content)
+
+async def crawl(url, **options):
+    """Checks every link of a page and returns them grouped by category."""
+    links = await fetch_links(url)
+    results = {'ok': [], 'broken': [], 'slow': [], 'unchecked': []}
+    async for category, result in check_links(get_client(), links, **options):
+        results[category].append(result)
+    return results
+
+def iter_check_links(links, **options):
+    """
+    Synchronous view of check_links() running on the background loop, for streaming responses.
+
+    Each result is pulled only when the consumer asks for it, so a slow client holds at most
+    one concurrency window of results in memory. Closing the generator cancels the crawl.
+    """
+    return iterate(lambda: check_links(get_client(), links, **options))
@@ -0,0 +1,207 @@
+"""
+Database engine configuration.
+
+DATABASE_URL selects the database (SQLite in the instance folder by default). Server
+databases such as Postgres get a connection pool sized by DB_POOL_SIZE and
+DB_MAX_OVERFLOW, with pre-ping so that connections dropped by the server or a proxy
+are replaced instead of failing a request, and DB_POOL_RECYCLE to retire them before
+server-side idle timeouts.
+
+SQLite allows one writer at a time per file. In its high-concurrency mode (the default,
+SQLITE_WAL=1) every connection uses WAL journaling, so readers never wait for the writer,
+with synchronous=NORMAL and a busy timeout. Writes submitted to WriteQueue run on a
+single writer thread per process, which commits whatever queued up meanwhile in one
+transaction instead of having request threads take turns on the file lock.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from flask import has_app_context
+
+DEFAULT_DATABASE_URL = "sqlite:///project.db"
+
+
+def database_uri():
+    uri = os.environ.get("DATABASE_URL") or DEFAULT_DATABASE_URL
+    # Heroku-style URLs use a scheme SQLAlchemy no longer accepts.
+    if uri.startswith("postgres://"):
+        uri = "postgresql://" + uri[len("postgres://"):]
+    return uri
+
+
+def is_sqlite(uri):
+    return uri.startswith("sqlite")
+
+
+def engine_options(uri):
+    """create_engine() options for uri (SQLALCHEMY_ENGINE_OPTIONS)."""
+    if is_sqlite(uri):
+        return {"connect_args": {"timeout": float(os.environ.get("SQLITE_BUSY_TIMEOUT", "5000")) / 1000}}
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+    }
+
+
+def configure_sqlite(engine):
+    """Sets the high-concurrency pragmas on every new connection of a SQLite engine (unless SQLITE_WAL=0)."""
+    if engine.dialect.name != "sqlite" or os.environ.get("SQLITE_WAL", "1") == "0":
+        return
+    from sqlalchemy import event
+
+    busy_timeout = int(os.environ.get("SQLITE_BUSY_TIMEOUT", "5000"))
+    in_memory = engine.url.database in (None, "", ":memory:")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={busy_timeout}")
+        cursor.close()
+
+
+class WriteQueue:
+    """
+    Runs write transactions for a Flask-SQLAlchemy db.
+
+    run(fn) calls fn() with db.session and commits. With the queue enabled (SQLite), fn
+    runs on the writer thread: jobs that queued up while the previous commit was in
+    progress are committed together, and if one of them raises, the batch is rolled back
+    and each job is retried alone so that only the failing one reports an error. fn
+    may therefore run more than once and must only touch the database (whose changes
+    are rolled back between attempts); it should return plain values rather than ORM
+    objects, which belong to the writer's session.
+
+    A caller waits at most timeout seconds for its job to start: a job still queued by
+    then is cancelled and run() raises TimeoutError.
+    """
+
+    def __init__(self, app, db, enabled=True, max_batch=64, timeout=30.0):
+        self.app = app
+        self.db = db
+        self.enabled = enabled
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.writes = 0
+
+    @classmethod
+    def from_env(cls, app, db):
+        """
+        Enabled for SQLite unless SQLITE_WRITE_QUEUE=0; SQLITE_WRITE_BATCH caps the jobs per
+        transaction and SQLITE_WRITE_TIMEOUT is the wait for a job to start, in seconds.
+        """
+        enabled = is_sqlite(app.config["SQLALCHEMY_DATABASE_URI"]) and os.environ.get("SQLITE_WRITE_QUEUE", "1") != "0"
+        return cls(app, db, enabled, int(os.environ.get("SQLITE_WRITE_BATCH", "64")),
+                   float(os.environ.get("SQLITE_WRITE_TIMEOUT", "30")))
+
+    def run(self, fn):
+        """Runs fn() in a committed transaction and returns its result, or raises its error."""
+        if not self.enabled:
+            try:
+                result = fn()
+                self.db.session.commit()
+                return result
+            except BaseException:
+                self.db.session.rollback()
+                raise
+        future = Future()
+        self._ensure_started()
+        self._queue.put((fn, future))
+        try:
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeout:
+                if future.cancel():
+                    raise TimeoutError(f"write not started within {self.timeout} seconds") from None
+            # Already running: the writer resolves it whatever happens.
+            return future.result()
+        finally:
+            # Objects the caller already loaded may predate the write.
+            if has_app_context():
+                self.db.session.expire_all()
+
+    def _ensure_started(self):
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            # A forked worker does not inherit the parent's writer thread.
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                jobs = [self._queue.get()]
+                while len(jobs) < self.max_batch:
+                    try:
+                        jobs.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    self._write(jobs)
+                except BaseException as e:
+                    # Raised by a job (e.g. SystemExit). Its batch has been failed; the writer
+                    # keeps serving the queue rather than leave later callers waiting.
+                    print(f"Database writer: {type(e).__name__} in a write job: {e}")
+
+    def _write(self, jobs):
+        # Jobs whose caller gave up waiting are dropped here, before they run.
+        jobs = [(fn, future) for fn, future in jobs if future.running() or future.set_running_or_notify_cancel()]
+        if not jobs:
+            return
+        try:
+            results = self._transaction([fn for fn, _ in jobs])
+        except Exception as e:
+            if len(jobs) == 1:
+                jobs[0][1].set_exception(e)
+                return
+            for job in jobs:
+                self._write([job])
+            return
+        else:
+            for (_, future), result in zip(jobs, results):
+                future.set_result(result)
+        finally:
+            # A BaseException from a job skips the handlers above; no caller may be left
+            # waiting on a job of its batch.
+            for _, future in jobs:
+                if not future.done():
+                    future.set_exception(RuntimeError("the database write was aborted"))
+
+    def _transaction(self, fns):
+        from sqlalchemy import text
+        session = self.db.session
+        try:
+            if self.db.engine.dialect.name == "sqlite":
+                # Take the write lock up front: a deferred transaction that reads first and
+                # then writes fails at once if another process committed in between.
+                session.execute(text("BEGIN IMMEDIATE"))
+            results = [fn() for fn in fns]
+            session.commit()
+        except BaseException:
+            session.rollback()
+            raise
+        finally:
+            self.db.session.remove()
+        self.batches += 1
+        self.writes += len(fns)
+        return results
+
+    def stats(self):
+        return {"enabled": self.enabled, "queued": self._queue.qsize(), "batches": self.batches, "writes": self.writes}
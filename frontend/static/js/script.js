@@ -189,11 +189,20 @@ document.addEventListener('DOMContentLoaded', () => {
 
     async function fetchProjects() {
         try {
-            const response = await fetch('/api/v1/portfolio/projects');
-            if (!response.ok) {
-                throw new Error('Failed to fetch projects');
+            // Asking for a cursor opts into pages, which are linked by the Link header; the
+            // browser revalidates each page with its ETag, so unchanged pages come back as 304s
+            // without a database query.
+            const projects = [];
+            let url = '/api/v1/portfolio/projects?cursor=0';
+            while (url) {
+                const response = await fetch(url, { cache: 'no-cache' });
+                if (!response.ok) {
+                    throw new Error('Failed to fetch projects');
+                }
+                projects.push(...await response.json());
+                const next = /<([^>]+)>;\s*rel="next"/.exec(response.headers.get('Link') || '');
+                url = next ? next[1] : null;
             }
-            const projects = await response.json();
             renderProjects(projects);
         } catch (error) {
             console.error('Error fetching projects:', error);
@@ -1,18 +1,25 @@
 import os
 import re
-import vertexai
-from vertexai.generative_models import GenerativeModel
-from langchain_google_vertexai import ChatVertexAI
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_nvidia_ai_endpoints import ChatNVIDIA
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from llama_index.llms.nvidia import NVIDIA as LlamaIndexNVIDIA
-from llama_index.core import Settings as LlamaIndexSettings
-
+import asyncio
+import functools
+import threading
+import time
+import metrics
+from background_loop import iterate, run_on_loop, run_sync
+from bootstrap import once
+from governor import ProviderLimits, Singleflight
+from router import ModelRouter
+from hedging import HedgePolicy
+from http_pool import pools as http_pool
+from response_cache import ResponseCache
+from tracing import tracer
+
+# Provider SDKs are imported inside the functions that need them (see bootstrap.py),
+# so importing this module does not load Vertex AI, LangChain or LlamaIndex.
+
+@once
 def init_vertexai():
-    """Initializes the Vertex AI SDK."""
+    """Initializes the Vertex AI SDK. Runs once, before the first Vertex AI client is built."""
     project_id = os.environ.get("GOOGLE_CLOUD_PROJECT")
     location = os.environ.get("GOOGLE_CLOUD_LOCATION")
 
@@ -20,29 +27,193 @@ def init_vertexai():
         print("Google Cloud project ID and location not found in environment variables. Skipping Vertex AI initialization.")
         return
 
+    import vertexai
     vertexai.init(project=project_id, location=location)
     print("Vertex AI SDK initialized successfully.")
 
-def get_model(model_name="gemini-1.5-flash"):
+class ModelRegistry:
+    """
+    Process-wide cache of LangChain chat clients keyed by (provider, model_name).
+
+    Each client is built once per worker and then reused, so its auth session and
+    HTTP connection pool survive across requests. Call invalidate() after rotating
+    provider credentials to force the affected clients to be rebuilt.
+    """
+
+    def __init__(self, factories):
+        self._factories = factories
+        self._clients = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.build_seconds = 0.0
+
+    def get(self, provider, model_name):
+        key = (provider, model_name)
+        client = self._clients.get(key)
+        if client is not None:
+            # Counters are best-effort on the lock-free path; they are for monitoring only.
+            self.hits += 1
+            return client
+        with self._lock:
+            # Another thread may have built the client while we waited for the lock.
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+            started = time.perf_counter()
+            client = self._factories[provider](model_name)
+            _track_tokens(provider, client)
+            self.build_seconds += time.perf_counter() - started
+            self.misses += 1
+            self._clients[key] = client
+            return client
+
+    def invalidate(self, provider=None, model_name=None):
+        """Drops cached clients matching provider/model_name (all of them when both are None)."""
+        with self._lock:
+            for key in list(self._clients):
+                if provider not in (None, key[0]):
+                    continue
+                if model_name not in (None, key[1]):
+                    continue
+                del self._clients[key]
+
+    def stats(self):
+        return {
+            "clients": len(self._clients),
+            "hits": self.hits,
+            "misses": self.misses,
+            "build_seconds": round(self.build_seconds, 6),
+        }
+
+@functools.cache
+def _token_counter(provider):
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class TokenCounter(BaseCallbackHandler):
+        # Counting is cheap, so async calls run it inline instead of in an executor.
+        run_inline = True
+
+        def on_llm_end(self, response, **kwargs):
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if usage:
+                        _record_tokens(provider, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+    return TokenCounter()
+
+def _record_tokens(provider, tokens_in, tokens_out):
+    metrics.llm_tokens.inc((provider, "in"), tokens_in or 0)
+    metrics.llm_tokens.inc((provider, "out"), tokens_out or 0)
+
+def _track_tokens(provider, client):
+    """Counts the tokens of every call made with a LangChain chat client, via its callbacks."""
+    from langchain_core.language_models import BaseChatModel
+    if not isinstance(client, BaseChatModel):
+        return
+    if client.callbacks is None or isinstance(client.callbacks, list):
+        client.callbacks = [*(client.callbacks or []), _token_counter(provider)]
+    else:
+        client.callbacks.add_handler(_token_counter(provider))
+
+def _record_completion_tokens(provider, response):
+    # LlamaIndex keeps the provider's OpenAI-style payload, with its usage, in response.raw.
+    raw = getattr(response, "raw", None)
+    usage = raw.get("usage") if isinstance(raw, dict) else getattr(raw, "usage", None)
+    if usage is None:
+        return
+    field = usage.get if isinstance(usage, dict) else functools.partial(getattr, usage)
+    _record_tokens(provider, field("prompt_tokens", 0), field("completion_tokens", 0))
+
+def _vertex_chat(model_name):
+    # Vertex AI talks gRPC over its own HTTP/2 channel, which the registry already reuses,
+    # so it does not go through http_pool.
+    init_vertexai()
+    from langchain_google_vertexai import ChatVertexAI
     return ChatVertexAI(model_name=model_name)
 
+def _openai_clients(provider):
+    import openai
+    return {
+        "http_client": http_pool.client(provider, openai.DefaultHttpxClient),
+        "http_async_client": http_pool.client(provider, openai.DefaultAsyncHttpxClient),
+    }
+
+def _openai_chat(model_name):
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model_name=model_name, **_openai_clients("openai"))
+
+# ChatAnthropic takes no http_client: it builds its SDK clients lazily in these cached
+# properties, which _anthropic_chat fills in up front. They are not public API, so
+# requirements.txt pins langchain-anthropic and tests/test_http_pool.py checks them.
+ANTHROPIC_CLIENT_PROPERTIES = ("_client_params", "_client", "_async_client")
+
+def _anthropic_chat(model_name):
+    import anthropic
+    from langchain_anthropic import ChatAnthropic
+    chat = ChatAnthropic(model_name=model_name)
+    if not all(isinstance(getattr(ChatAnthropic, name, None), functools.cached_property)
+               for name in ANTHROPIC_CLIENT_PROPERTIES):
+        print("Warning: this langchain-anthropic version builds its clients differently; "
+              "Anthropic calls will not use the shared HTTP pool")
+        return chat
+    chat.__dict__["_client"] = anthropic.Client(
+        **chat._client_params, http_client=http_pool.client("anthropic", anthropic.DefaultHttpxClient))
+    chat.__dict__["_async_client"] = anthropic.AsyncClient(
+        **chat._client_params, http_client=http_pool.client("anthropic", anthropic.DefaultAsyncHttpxClient))
+    return chat
+
+NVIDIA_BASE_URL = os.environ.get("NVIDIA_BASE_URL", "https://integrate.api.nvidia.com/v1")
+
+def _nvidia_chat(model_name):
+    # NVIDIA's hosted endpoints speak the OpenAI API. ChatNVIDIA opens a new requests/aiohttp
+    # session per call, so the OpenAI client is used to share the pooled httpx clients.
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model_name=model_name, base_url=NVIDIA_BASE_URL,
+                      api_key=os.environ.get("NVIDIA_API_KEY"), **_openai_clients("nvidia"))
+
+def _llamaindex_nvidia(model_name):
+    from llama_index.llms.nvidia import NVIDIA as LlamaIndexNVIDIA
+    clients = _openai_clients("nvidia")
+    return LlamaIndexNVIDIA(model=model_name, api_key=os.environ.get("NVIDIA_API_KEY"),
+                            http_client=clients["http_client"], async_http_client=clients["http_async_client"])
+
+model_registry = ModelRegistry({
+    "vertex": _vertex_chat,
+    "openai": _openai_chat,
+    "anthropic": _anthropic_chat,
+    "nvidia": _nvidia_chat,
+    "llamaindex-nvidia": _llamaindex_nvidia,
+})
+
+def get_model(model_name="gemini-1.5-flash"):
+    return model_registry.get("vertex", model_name)
+
 def get_openai_model(model_name="gpt-4o"):
-    return ChatOpenAI(model_name=model_name)
+    return model_registry.get("openai", model_name)
 
 def get_claude_model(model_name="claude-3-5-sonnet-20240620"):
-    return ChatAnthropic(model_name=model_name)
+    return model_registry.get("anthropic", model_name)
 
 def get_nvidia_model(model_name="nvidia/llama-3.1-405b-instruct"):
-    return ChatNVIDIA(model_name=model_name)
-
-def generate_website(prompt: str) -> tuple[str, str]:
-    """
-    Generates HTML and CSS code from a natural language prompt using LangChain and Vertex AI.
-    """
-    model = get_model()
-
-    system_prompt = "You are a skilled web developer. Your task is to generate the HTML and CSS for a single-page website based on the user prompt."
-    user_prompt_template = """
+    return model_registry.get("nvidia", model_name)
+
+# --- Persona table ---
+# Maps each service to its system prompt and user template. Optional keys:
+#   "inputs": positional arguments of the service function (defaults to ("prompt",))
+#   "model": (provider, model_name) looked up in model_registry (defaults to Vertex Gemini)
+#   "error_prefix": prefix of the message returned when the call fails (defaults to "Error")
+#   "cache": False keeps the service out of response_cache
+#   "hedge": (provider, model_name) raced against the primary when it is slower than its
+#            p95, for async calls with LLM_HEDGING=1 (see hedging.py)
+DEFAULT_PERSONA_MODEL = ("vertex", "gemini-1.5-flash")
+
+PERSONAS = {
+    "generate_website": {
+        "system": "You are a skilled web developer. Your task is to generate the HTML and CSS for a single-page website based on the user prompt.",
+        "user": """
     User Prompt:
     ---
     {prompt}
@@ -61,185 +232,774 @@ def generate_website(prompt: str) -> tuple[str, str]:
         ...
     }}
     [/CSS]
-    """
+    """,
+    },
+    "debug_code": {
+        "system": "You are an expert code reviewer.",
+        "user": """
+    Your task is to analyze the following {language} code and identify any potential bugs, errors, or style issues.
 
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("user", user_prompt_template)
-    ])
+    Code:
+    ---
+    {code}
+    ---
 
-    chain = prompt_template | model | StrOutputParser()
+    Please list the issues you find, one per line. If you find no issues, return an empty response.
+    """,
+        "inputs": ("code", "language"),
+        # Whitespace is significant in code, so normalized cache keys could mix up answers.
+        "cache": False,
+    },
+    "generate_social_media_post": {
+        "system": "You are a creative marketing assistant.",
+        "user": "Your task is to write an engaging social media post based on the following description: {description}. The post should be short, catchy, and include relevant hashtags.",
+        "inputs": ("description",),
+    },
+    "generate_promotion_from_content": {
+        "system": "You are an expert marketing strategist.",
+        "user": "Your task is to create a compelling promotion campaign for the product at the URL: {url}. Based on this content: {content}, generate a short, catchy, and engaging promotional text for social media with hashtags.",
+        "inputs": ("url", "content"),
+    },
+    "generate_business_strategy": {
+        "system": "You are an expert business strategist.",
+        "user": "Develop a comprehensive business strategy with actionable steps based on: {prompt}",
+    },
+    "provide_ussd_blockchain_assistance": {
+        "system": (
+            "You are an Elite AI USSD Specialist and USSD Blockchain Creator. "
+            "Your expertise covers the design and implementation of USSD (Unstructured Supplementary Service Data) "
+            "applications, integration with telecommunication networks, and the creation of USSD-based "
+            "blockchain interfaces. Provide high-level technical guidance on building secure, efficient, "
+            "and scalable USSD gateways, smart contract interaction via USSD, and blockchain-based "
+            "financial services for feature phones in emerging markets."
+        ),
+        "user": "{prompt}",
+        "error_prefix": "USSD Blockchain AI Error",
+    },
+    "provide_domain_codex_assistance": {
+        "system": (
+            "You are an Elite Domain Codex Designer and Infrastructure Architect. "
+            "Your expertise covers custom domain design, DHCP address configuration, "
+            "and USSP (U-space Service Provider) infrastructure using Codex-level insights. "
+            "Provide high-level technical guidance, strategic design plans, and secure "
+            "implementation steps for advanced AI projects requiring specialized network "
+            "architectures and domain naming conventions. Our primary domain is yendoukoa.ai."
+        ),
+        "user": "{prompt}",
+        "error_prefix": "Domain Codex AI Error",
+    },
+    "provide_claude_intelligence": {
+        "system": "You are an Elite Intelligence Agent powered by Anthropic Claude. Provide deep reasoning, strategic analysis, and nuanced insights for the user's query.",
+        "user": "{prompt}",
+        "model": ("anthropic", "claude-3-5-sonnet-20240620"),
+        "error_prefix": "Claude Intelligence Error",
+    },
+    "provide_claude_coding_assistance": {
+        "system": "You are an Elite Software Engineer and Architect powered by Anthropic Claude. Provide high-quality code generation, robust debugging, and expert architectural advice.",
+        "user": "{prompt}",
+        "model": ("anthropic", "claude-3-5-sonnet-20240620"),
+        "error_prefix": "Claude Coding Error",
+    },
+    "provide_llama_guard_assistance": {
+        "system": "You are an AI Safety Specialist using Llama Guard. Analyze the following prompt for potential safety violations, hate speech, or harmful content. Provide a safety assessment.",
+        "user": "{prompt}",
+        "model": ("nvidia", "meta/llama-guard-3-8b"),
+        "error_prefix": "Llama Guard Error",
+        "hedge": ("vertex", "gemini-1.5-flash"),
+    },
+    "provide_nemotron_reasoning": {
+        "system": "You are an Elite Reasoning Agent powered by NVIDIA Nemotron. Provide a logical, step-by-step analysis and solution for the user's complex query.",
+        "user": "{prompt}",
+        "model": ("nvidia", "nvidia/nemotron-4-340b-instruct"),
+        "error_prefix": "Nemotron Reasoning Error",
+    },
+    "provide_mixtral_multilingual_assistance": {
+        "system": "You are a Multilingual AI Specialist powered by Mixtral. Assist the user with their request in their preferred language with high accuracy and cultural context.",
+        "user": "{prompt}",
+        "model": ("nvidia", "mistralai/mixtral-8x7b-instruct-v0.1"),
+        "error_prefix": "Mixtral Multilingual Error",
+    },
+    "provide_monetization_advice": {
+        "system": "You are an expert Monetization Strategist. Your goal is to help projects generate revenue through various models like subscriptions, ads, and premium features.",
+        "user": "Provide a detailed monetization strategy for: {prompt}",
+    },
+    "provide_partnership_advice": {
+        "system": "You are an expert Partnership and Business Development Specialist. Your goal is to identify and nurture strategic alliances that drive mutual growth.",
+        "user": "Provide a partnership and alliance strategy for: {prompt}",
+    },
+    "provide_fundraising_advice": {
+        "system": "You are an expert Fundraising Strategist and Venture Capital Consultant. Your goal is to help startups and projects secure funding through various stages and sources.",
+        "user": "Provide a comprehensive fundraising plan and strategy for: {prompt}",
+    },
+    "provide_it_support": {
+        "system": "You are a knowledgeable IT support specialist.",
+        "user": "Provide a clear, step-by-step solution to this technical issue: {prompt}",
+    },
+    "analyze_data": {
+        "system": "You are a skilled data scientist.",
+        "user": "Analyze the following data and provide insights, trends, and conclusions: {prompt}",
+    },
+    "provide_financial_advice": {
+        "system": "You are an expert financial advisor.",
+        "user": "Provide comprehensive financial advice with actionable steps based on: {prompt}",
+    },
+    "generate_blockchain_code": {
+        "system": "You are an expert blockchain developer.",
+        "user": "Generate well-structured blockchain code with comments based on: {prompt}",
+    },
+    "generate_blogger_bots_page": {
+        "system": "You are an expert blogger and bot developer.",
+        "user": "Generate an engaging blogger page with functional bots based on: {prompt}",
+    },
+    "generate_messenger_code": {
+        "system": "You are an expert Messenger developer and manager.",
+        "user": "Generate code for a Messenger bot or integration following best practices based on: {prompt}",
+    },
+    "learn_language": {
+        "system": "You are a friendly and patient language tutor.",
+        "user": "Help the user learn a new language based on their request: {prompt}",
+    },
+    "provide_telecommunication_support": {
+        "system": "You are a knowledgeable telecommunication support specialist.",
+        "user": "Provide a clear, step-by-step solution to this telecommunication issue: {prompt}",
+    },
+    "generate_telecommunication_assistant_response": {
+        "system": "You are a helpful telecommunication assistant.",
+        "user": "Provide a clear and concise response to this query: {prompt}",
+    },
+    "provide_science_education": {
+        "system": "You are a knowledgeable and patient sciences educator.",
+        "user": "Provide clear explanations or solve exercises for this request: {prompt}",
+    },
+    "provide_transaction_assistance": {
+        "system": "You are a helpful assistant for mobile operators, banks, and transactions.",
+        "user": "Provide assistance on fraud prevention and transaction facilities for: {prompt}",
+    },
+    "play_music_instrumental": {
+        "system": "You are a virtuoso music instrumentalist.",
+        "user": "Provide musical suggestions, help with learning, tabs, or compose short pieces for: {prompt}",
+    },
+    "provide_geometry_assistance": {
+        "system": "You are an expert mathematician specializing in geometry.",
+        "user": "Provide assistance with geometry problems, theorems, and concepts for: {prompt}",
+    },
+    "provide_cartography_assistance": {
+        "system": "You are an expert cartographer and GIS specialist.",
+        "user": "Provide assistance with map making, geographical data analysis, and coordinate systems for: {prompt}",
+    },
+    "provide_document_assistance": {
+        "system": "You are an expert document specialist.",
+        "user": "Assist with writing, scanning, and building documents based on: {prompt}",
+    },
+    "provide_business_plan_assistance": {
+        "system": "You are an expert business consultant and strategist.",
+        "user": "Help create, perfect, and develop a comprehensive business plan based on: {prompt}",
+    },
+    "provide_investigation_assistance": {
+        "system": "You are an expert investigator specializing in cybersecurity and global security.",
+        "user": "Provide deep insights and investigative strategies for: {prompt}",
+    },
+    "provide_military_assistance": {
+        "system": "You are an expert Military Strategist and Defense Analyst. Your role is to provide strategic guidance, tactical analysis, and operational planning assistance for armed forces. Focus on modern warfare, defense technology, and national security optimization.",
+        "user": "Provide comprehensive military assistance and strategic guidance for: {prompt}",
+    },
+    "provide_gendarmerie_assistance": {
+        "system": "You are an expert Gendarmerie Specialist and Paramilitary Advisor. Your role is to assist with hybrid civilian-military security missions, rural policing strategies, public order maintenance, and specialized law enforcement operations.",
+        "user": "Provide specialized gendarmerie assistance and operational guidance for: {prompt}",
+    },
+    "provide_police_assistance": {
+        "system": "You are an expert Police Service and Law Enforcement Specialist. Your goal is to help optimize police performance, community policing strategies, crime prevention techniques, and urban security management.",
+        "user": "Provide professional police service assistance and performance optimization for: {prompt}",
+    },
+    "provide_security_optimization_assistance": {
+        "system": "You are an expert Security Performance and Optimization Specialist. Your role is to analyze and improve the efficiency of security services, integrating advanced AI analytics, resource management, and strategic planning to enhance public safety.",
+        "user": "Analyze and provide an optimization plan for the following security service request: {prompt}",
+    },
+    "provide_podcast_assistance": {
+        "system": "You are an expert podcast producer, creator, and designer.",
+        "user": "Provide assistance with creating, perfecting, and designing high-quality podcasts for: {prompt}",
+    },
+    "provide_supply_chain_assistance": {
+        "system": "You are an expert supply chain consultant.",
+        "user": "Provide assistance with optimizing and managing supply chain operations for: {prompt}",
+    },
+    "provide_logistics_assistance": {
+        "system": "You are an expert logistics and transportation specialist.",
+        "user": "Provide assistance with managing the movement of goods and materials for: {prompt}",
+    },
+    "provide_data_engineering_assistance": {
+        "system": "You are an expert data engineer and architect.",
+        "user": "Provide assistance with designing, building, and maintaining data pipelines and architectures for: {prompt}",
+    },
+    "provide_incoterms_assistance": {
+        "system": "You are an expert in Incoterms and international trade.",
+        "user": "Provide assistance and clarification on the use and interpretation of Incoterms for: {prompt}",
+    },
+    "provide_ecommerce_assistance": {
+        "system": "You are an expert e-commerce assistant and website manager.",
+        "user": "Provide assistance with managing e-commerce platforms and websites for: {prompt}",
+    },
+    "provide_government_assistance": {
+        "system": "You are an expert government public administrator assistant. Your goal is to help citizens and officials navigate public services, understand bureaucratic processes, and facilitate document acquisition efficiently and transparently.",
+        "user": "Provide comprehensive assistance with government services, administrative procedures, and document providing for: {prompt}",
+    },
+    "provide_togo_public_service_assistance": {
+        "system": (
+            "You are an Elite AI Specialist for Togolese Public Services and National Security. "
+            "Your expertise covers Togo's administrative procedures (Service Public Togo), "
+            "digital transformation initiatives (CINA - Cellule de Coordination du Millénium), "
+            "and national security protocols. You provide guidance on government documentation, "
+            "public administration efficiency, and advanced security tools for the Togolese government. "
+            "Ensure all advice aligns with Togolese law and official digital government standards. "
+            "Focus on transparency, efficiency, and powerful security control."
+        ),
+        "user": "{prompt}",
+        "error_prefix": "Togo Public Service AI Error",
+    },
+    "provide_public_policy_assistance": {
+        "system": "You are an expert Public Policy Advisor and Analyst. Your role is to provide data-driven insights, policy evaluation, and strategic recommendations for government entities and public organizations.",
+        "user": "Analyze and provide strategic advice on the following public policy issue: {prompt}",
+    },
+    "provide_citizen_engagement_assistance": {
+        "system": "You are an expert in Citizen Engagement and Participatory Democracy. Your goal is to help governments foster better communication with citizens, design public consultation processes, and enhance civic participation.",
+        "user": "Provide a strategy or plan to improve citizen engagement for: {prompt}",
+    },
+    "provide_smart_city_assistance": {
+        "system": "You are an expert Smart City Strategist and Urban Technologist. Your role is to provide guidance on integrating AI, IoT, and data analytics into urban infrastructure to improve the quality of life for citizens.",
+        "user": "Provide a technical and strategic plan for smart city integration regarding: {prompt}",
+    },
+    "provide_bias_detection_assistance": {
+        "system": "You are an expert AI Bias Detection and Ethical Governance Specialist. Your role is to analyze government services, policies, and algorithms for potential biases (racial, gender, socioeconomic, etc.) and provide actionable recommendations to ensure fairness, transparency, and equity in public service delivery.",
+        "user": "Analyze the following for potential bias and provide ethical guidance: {prompt}",
+    },
+    "provide_biotech_assistance": {
+        "system": "You are an expert biotech development specialist and researcher.",
+        "user": "Provide assistance with biotechnology projects, research, and development for: {prompt}",
+    },
+    "provide_legal_assistance": {
+        "system": "You are an expert legal consultant, human rights advocate, and legal educator.",
+        "user": "Provide assistance to lawyers, courts, parliaments, and legal students for: {prompt}",
+    },
+    "provide_fintech_assistance": {
+        "system": "You are an expert fintech consultant and data engineer.",
+        "user": "Provide high-level assistance and guidance for banks, fintechs, and VC firms for: {prompt}",
+    },
+    "provide_music_production_assistance": {
+        "system": "You are an expert music producer and talent manager.",
+        "user": "Provide assistance with music beats, songs, rhythms, and singer promotion for: {prompt}",
+    },
+    "translate_text": {
+        "system": "You are a professional translation service.",
+        "user": "Translate the following text accurately into {target_language}. Provide ONLY the translation. Text: {text}",
+        "inputs": ("text", "target_language"),
+        "hedge": ("openai", "gpt-4o-mini"),
+    },
+    "provide_aerospace_automotive_assistance": {
+        "system": "You are an expert specialist in the automotive, aeronautics, and astronomy sectors.",
+        "user": "Provide high-level assistance, technical guidance, and strategic advice for: {prompt}",
+    },
+    "provide_data_science_stewardship_assistance": {
+        "system": "You are an expert Data Scientist, Data Steward, and Data Protection Officer Assistant.",
+        "user": "Provide high-level assistance, technical guidance, and strategic advice for: {prompt}",
+    },
+    "provide_logo_thumbnail_assistance": {
+        "system": "You are an expert graphic designer and branding specialist.",
+        "user": "Provide assistance with creating and designing logos and thumbnails for: {prompt}",
+    },
+    "provide_fake_content_verification_assistance": {
+        "system": "You are an expert in digital forensics, AI content detection, and fact-checking.",
+        "user": "Analyze the following content and provide a detailed assessment of its authenticity: {prompt}",
+    },
+    "provide_automatic_learning_assistance": {
+        "system": "You are an expert in Automatic Learning, Machine Learning, and AI development.",
+        "user": "Provide high-level technical guidance, strategy, and problem-solving assistance for: {prompt}",
+    },
+    "provide_ia_data_engineering_assistance": {
+        "system": "You are an expert AI Data Engineer and Architect.",
+        "user": "Provide assistance with designing, building, and maintaining data pipelines and architectures for AI for: {prompt}",
+    },
+    "provide_data_lab_center_assistance": {
+        "system": "You are an expert Data Lab and Data Center Specialist.",
+        "user": "Provide assistance with designing, building, and managing data laboratories and data center infrastructure for: {prompt}",
+    },
+    "provide_computer_vision_assistance": {
+        "system": "You are an expert Computer Vision Specialist.",
+        "user": "Provide high-level technical guidance, strategy, and problem-solving assistance in computer vision for: {prompt}",
+    },
+    "provide_ia_researcher_assistance": {
+        "system": "You are an expert AI Researcher.",
+        "user": "Provide high-level scientific and technical guidance on artificial intelligence research and development for: {prompt}",
+    },
+    "provide_esports_assistance": {
+        "system": "You are an expert eSports Development and Assistance Specialist.",
+        "user": "Provide high-level technical guidance, strategic advice, and problem-solving assistance in eSports for: {prompt}",
+    },
+    "provide_dermatology_assistance": {
+        "system": "You are an expert AI Dermatology Specialist and Assistant. DISCLAIMER: You are an AI, not a doctor.",
+        "user": "Provide professional, accurate, and detailed information related to dermatology for: {prompt}",
+    },
+    "provide_microsoft_ignite_assistance": {
+        "system": "You are an expert in Microsoft Ignite tools, specifically Azure AI Foundry and Agentic AI.",
+        "user": "Provide high-level technical guidance and strategic advice regarding Microsoft Ignite tools for: {prompt}",
+    },
+    "provide_diagnostic_assistance": {
+        "system": "You are an expert AI Diagnostic Specialist. DISCLAIMER: You are an AI, not a doctor.",
+        "user": "Provide professional, accurate, and detailed information related to medical diagnostics for: {prompt}",
+    },
+    "provide_eshop_assistance": {
+        "system": "You are an expert E-shop and E-commerce Creation Specialist.",
+        "user": "Provide high-level technical guidance and strategic advice for building and managing online stores for: {prompt}",
+    },
+    "provide_it_operations_assistance": {
+        "system": "You are an expert IT Operations Specialist and System Administrator.",
+        "user": "Provide high-level technical guidance and problem-solving assistance in IT operations for: {prompt}",
+    },
+    "provide_maintenance_assistance": {
+        "system": "You are an expert Software, Computer, and Phones Maintenance Specialist.",
+        "user": "Provide high-level technical guidance and troubleshooting steps for: {prompt}",
+    },
+    "provide_google_sites_assistance": {
+        "system": "You are an expert Google Sites and DNS Specialist. Our primary domain is yendoukoa.ai.",
+        "user": "Provide high-level technical guidance for Google Sites, DNS, and custom subdomains (especially for yendoukoa.ai) for: {prompt}",
+    },
+    "provide_marketing_bot_assistance": {
+        "system": "You are an expert Digital Marketing and Bot Management Specialist.",
+        "user": "Provide high-level strategic guidance and technical assistance for marketing bots and campaigns for: {prompt}",
+    },
+    "provide_digital_repair_assistance": {
+        "system": "You are an expert Digital Repair and Troubleshooting Specialist.",
+        "user": "Provide high-level technical guidance and troubleshooting steps for digital assets for: {prompt}",
+    },
+    "provide_investment_trading_assistance": {
+        "system": "You are an expert Investment Optimization and Trading Specialist.",
+        "user": "Provide high-level strategic guidance, market analysis insights, and investment optimization advice for: {prompt}",
+    },
+    "provide_autogpt_assistance": {
+        "system": "You are an autonomous AI agent (AutoGPT) specialized in multi-step task planning and execution. Your goal is to break down complex requests into actionable steps and provide a comprehensive strategy to achieve the user's goal.",
+        "user": "Develop an autonomous execution plan for: {prompt}",
+    },
+    "generic_ai_service": {
+        "system": "{system_message}",
+        "user": "{prompt}",
+        "inputs": ("system_message", "prompt"),
+    },
+    "provide_malware_defense_assistance": {
+        "system": (
+            "You are an Elite Malware Defense Specialist and Cybersecurity Architect. "
+            "Your expertise covers all types of malware, including viruses, trojans, ransomware, "
+            "spyware, adware, and rootkits. Provide high-level technical guidance on "
+            "detection, prevention, removal strategies, and system hardening. "
+            "Advise on advanced threat intelligence, behavioral analysis, and "
+            "incident response protocols to protect against sophisticated cyber attacks."
+        ),
+        "user": "{prompt}",
+        "error_prefix": "Malware Defense AI Error",
+    },
+    "provide_feature_engineering_assistance": {
+        "system": "You are an expert in Automated Feature Engineering and Data Preparation.",
+        "user": "Provide high-level technical guidance and strategy for automated feature engineering based on: {prompt}",
+    },
+    "provide_hyperparameter_tuning_assistance": {
+        "system": "You are an expert in Hyperparameter Optimization and Model Tuning.",
+        "user": "Provide high-level technical guidance and strategy for hyperparameter tuning based on: {prompt}",
+    },
+    "provide_model_selection_assistance": {
+        "system": "You are an expert in AutoML Model Selection and Evaluation.",
+        "user": "Provide high-level technical guidance and strategy for selecting and evaluating ML models based on: {prompt}",
+    },
+    "provide_mlops_assistance": {
+        "system": "You are an expert in MLOps and Automated ML Pipelines.",
+        "user": "Provide high-level technical guidance and strategy for automating ML pipelines and deployment based on: {prompt}",
+    },
+    "provide_cloud_infrastructure_assistance": {
+        "system": "You are an expert Cloud Infrastructure Architect specializing in secure IP addresses, DNS configuration, and cloud server creation (AWS, GCP, Azure). Our primary domain is yendoukoa.ai.",
+        "user": "Provide high-level technical guidance and secure implementation steps (including DNS setup for yendoukoa.ai) for: {prompt}",
+    },
+    "provide_iaas_assistance": {
+        "system": "You are an expert IaaS (Infrastructure as a Service) Specialist. Your goal is to provide guidance on virtualized computing resources over the internet, including virtual machines, storage, and networking.",
+        "user": "Provide high-level technical guidance and strategic advice for IaaS based on: {prompt}",
+    },
+    "provide_paas_assistance": {
+        "system": "You are an expert PaaS (Platform as a Service) Specialist. Your goal is to provide guidance on platforms that allow customers to develop, run, and manage applications without the complexity of building and maintaining infrastructure.",
+        "user": "Provide high-level technical guidance and strategic advice for PaaS based on: {prompt}",
+    },
+    "provide_saas_assistance": {
+        "system": "You are an expert SaaS (Software as a Service) Specialist. Your goal is to provide guidance on software distribution models where applications are hosted by a provider and made available to customers over a network, typically the internet.",
+        "user": "Provide high-level technical guidance and strategic advice for SaaS based on: {prompt}",
+    },
+    "provide_itaas_assistance": {
+        "system": "You are an expert ITaaS (IT as a Service) Specialist. Your goal is to provide guidance on an operational model where the IT department or a provider delivers IT services to a business as a subscription-based service.",
+        "user": "Provide high-level technical guidance and strategic advice for ITaaS based on: {prompt}",
+    },
+}
+
+_chains = {}
+_chains_lock = threading.Lock()
+
+def get_chain(service, model=None):
+    """
+    Returns the compiled prompt | model | parser chain for a persona, on the persona's
+    own model or on model, a (provider, model_name) tuple of its fallback route.
 
-    try:
-        text_response = chain.invoke({"prompt": prompt})
+    Chains are compiled once at first use. A chain is rebuilt only when the
+    registry hands out a different client, e.g. after model_registry.invalidate().
+    """
+    persona = PERSONAS[service]
+    model_key = model or persona.get("model", DEFAULT_PERSONA_MODEL)
+    client = model_registry.get(*model_key)
+    cached = _chains.get((service, model_key))
+    if cached is not None and cached[0] is client:
+        return cached[1]
+    with _chains_lock:
+        cached = _chains.get((service, model_key))
+        if cached is not None and cached[0] is client:
+            return cached[1]
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_core.output_parsers import StrOutputParser
+        prompt_template = ChatPromptTemplate.from_messages([
+            ("system", persona["system"]),
+            ("user", persona["user"])
+        ])
+        chain = prompt_template | client | StrOutputParser()
+        _chains[(service, model_key)] = (client, chain)
+        return chain
+
+def service_inputs(service, args):
+    """Maps the positional arguments of a service function onto its template variables."""
+    return dict(zip(PERSONAS[service].get("inputs", ("prompt",)), args))
+
+response_cache = ResponseCache.from_env()
+
+def _cache_lookup(service, inputs):
+    """Returns (cache_key_model, cached_text); cache_key_model is None when the service is not cached."""
+    persona = PERSONAS[service]
+    if not response_cache.enabled or not persona.get("cache", True):
+        return None, None
+    model = persona.get("model", DEFAULT_PERSONA_MODEL)
+    return model, response_cache.get(service, model, inputs)
+
+# Identical in-flight calls share one provider request, and every provider has a cap on
+# concurrent calls (LLM_CONCURRENCY_* in .env.example); see governor.py.
+singleflight = Singleflight()
+provider_limits = ProviderLimits.from_env()
+# Calls fail over along LLM_FALLBACKS and skip providers whose circuit breaker is open; see router.py.
+model_router = ModelRouter.from_env()
+# An async attempt that takes longer counts as a provider failure and fails over.
+LLM_ATTEMPT_TIMEOUT = float(os.environ.get("LLM_ATTEMPT_TIMEOUT", "60"))
+hedge_policy = HedgePolicy.from_env()
+
+def _persona_model(service):
+    return PERSONAS[service].get("model", DEFAULT_PERSONA_MODEL)
+
+def _call_key(service, inputs):
+    return (service, _persona_model(service), tuple(sorted(inputs.items())))
+
+def invoke_service(service, inputs):
+    """Runs a persona chain through response_cache and returns the raw model text."""
+    with tracer.span("service", service=service) as span:
+        model, cached = _cache_lookup(service, inputs)
+        span.set(cache="hit" if cached is not None else "miss")
+        if cached is not None:
+            return cached
+
+        def attempt(provider, model_name):
+            with tracer.span("prompt.build"):
+                chain = get_chain(service, (provider, model_name))
+            with provider_limits.limit(provider):
+                return chain.invoke(inputs)
+
+        def call():
+            text = model_router.call(_persona_model(service), attempt)
+            if model is not None:
+                response_cache.put(service, model, inputs, text)
+            return text
+
+        return singleflight.do(_call_key(service, inputs), call)
+
+async def ainvoke_service(service, inputs):
+    """Async variant of invoke_service()."""
+    with tracer.span("service", service=service) as span:
+        model, cached = _cache_lookup(service, inputs)
+        span.set(cache="hit" if cached is not None else "miss")
+        if cached is not None:
+            return cached
+
+        async def attempt(provider, model_name):
+            with tracer.span("prompt.build"):
+                chain = get_chain(service, (provider, model_name))
+            async with provider_limits.alimit(provider):
+                return await asyncio.wait_for(chain.ainvoke(inputs), LLM_ATTEMPT_TIMEOUT)
+
+        async def call():
+            hedge = PERSONAS[service].get("hedge")
+            if hedge is not None and hedge_policy.enabled:
+                text = await hedge_policy.call(
+                    service,
+                    lambda: model_router.acall(_persona_model(service), attempt),
+                    lambda: model_router.acall(hedge, attempt, fallbacks=False),
+                )
+            else:
+                text = await model_router.acall(_persona_model(service), attempt)
+            if model is not None:
+                response_cache.put(service, model, inputs, text)
+            return text
+
+        return await singleflight.ado(_call_key(service, inputs), call)
+
+def run_service(service, *args):
+    """Invokes a persona chain and returns the stripped text, or an error message on failure."""
+    try:
+        return invoke_service(service, service_inputs(service, args)).strip()
+    except Exception as e:
+        print(f"Error running {service}: {e}")
+        return f"{PERSONAS[service].get('error_prefix', 'Error')}: {e}"
+
+async def arun_service(service, *args):
+    """Async variant of run_service() built on chain.ainvoke()."""
+    try:
+        return (await ainvoke_service(service, service_inputs(service, args))).strip()
+    except Exception as e:
+        print(f"Error running {service}: {e}")
+        return f"{PERSONAS[service].get('error_prefix', 'Error')}: {e}"
+
+def stream_service(service, *args):
+    """
+    Yields text chunks from chain.stream() as the provider produces them.
 
-        html_match = re.search(r'\[HTML\](.*?)\[/HTML\]', text_response, re.DOTALL)
-        css_match = re.search(r'\[CSS\](.*?)\[/CSS\]', text_response, re.DOTALL)
+    A cached answer is yielded as a single chunk; a fully streamed answer is cached.
+    The call fails over to the next model of its route only before the first chunk.
+    """
+    inputs = service_inputs(service, args)
+    try:
+        model, cached = _cache_lookup(service, inputs)
+        if cached is not None:
+            if cached.strip():
+                yield cached.strip()
+            return
+        errors = []
+        for provider, model_name in model_router.candidates(_persona_model(service)):
+            started = model_router.clock()
+            # Not made current: the generator is suspended at every yield.
+            span = tracer.start_span("llm.stream", provider=provider, model=model_name)
+            chunks = []
+            try:
+                with provider_limits.limit(provider):
+                    for chunk in _strip_leading(get_chain(service, (provider, model_name)).stream(inputs)):
+                        chunks.append(chunk)
+                        yield chunk
+            except Exception as e:
+                span.end(e)
+                model_router.record(provider, False, model_router.clock() - started, e)
+                if chunks:
+                    raise
+                errors.append(e)
+                continue
+            except BaseException as e:
+                span.end(e)
+                model_router.release(provider)
+                raise
+            span.set(chunks=len(chunks))
+            span.end()
+            model_router.record(provider, True, model_router.clock() - started)
+            break
+        else:
+            raise errors[0]
+        if model is not None:
+            response_cache.put(service, model, inputs, "".join(chunks))
+    except Exception as e:
+        print(f"Error streaming {service}: {e}")
+        yield f"{PERSONAS[service].get('error_prefix', 'Error')}: {e}"
+
+def _strip_leading(chunks):
+    # Mirrors the .strip() of the non-streaming path for the start of the answer.
+    started = False
+    for chunk in chunks:
+        if not started:
+            chunk = chunk.lstrip()
+            started = bool(chunk)
+        if chunk:
+            yield chunk
+
+def stream(service_fn, *args):
+    """
+    Yields the answer of a google_ai service chunk by chunk.
 
-        html_code = html_match.group(1).strip() if html_match else "<!-- Error: Could not generate HTML. -->"
-        css_code = css_match.group(1).strip() if css_match else "/* Error: Could not generate CSS. */"
+    Persona services stream tokens straight from the provider; any other service
+    (e.g. one returning structured data) yields its complete result once.
+    """
+    service = STREAMING_SERVICES.get(service_fn)
+    if service is None:
+        yield service_fn(*args)
+        return
+    yield from stream_service(service, *args)
 
-        return html_code, css_code
+# --- Batch execution ---
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "32"))
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "1000"))
 
-    except Exception as e:
-        print(f"Error generating website with LangChain: {e}")
-        return f"<!-- Error: {e} -->", f"/* Error: {e} */"
+def batch_inputs(item):
+    """
+    Maps a batch item {"service", "prompt", ...} onto the template variables of a text service.
 
-def debug_code(code: str, language: str) -> list[str]:
+    "prompt" fills the first input of the service; any further inputs (e.g. target_language)
+    are taken from the item by name. Raises ValueError when the item does not fit.
     """
-    Analyzes code and finds potential issues using LangChain and Vertex AI.
+    service = item.get("service") if isinstance(item, dict) else None
+    if service not in STREAMING_SERVICES.values():
+        raise ValueError(f"Unknown service: {service}")
+    names = PERSONAS[service].get("inputs", ("prompt",))
+    fields = ("prompt",) + tuple(names[1:])
+    missing = [field for field in fields if not item.get(field)]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)}")
+    return service, dict(zip(names, (item[field] for field in fields)))
+
+async def abatch_services(items, concurrency=BATCH_CONCURRENCY):
+    """
+    Runs a list of batch items through Runnable.abatch_as_completed with at most `concurrency`
+    calls in flight, and yields {"index", "service", "status", "message" | "error"} dicts in
+    completion order. Invalid items are reported first, without calling any model.
     """
-    model = get_model()
+    from langchain_core.runnables import RunnableLambda
 
-    system_prompt = "You are an expert code reviewer."
-    user_prompt_template = """
-    Your task is to analyze the following {language} code and identify any potential bugs, errors, or style issues.
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, *batch_inputs(item)))
+        except ValueError as e:
+            service = item.get("service") if isinstance(item, dict) else None
+            yield {"index": index, "service": service, "status": "error", "error": str(e)}
 
-    Code:
-    ---
-    {code}
-    ---
+    async def run(entry):
+        _, service, inputs = entry
+        return (await ainvoke_service(service, inputs)).strip()
 
-    Please list the issues you find, one per line. If you find no issues, return an empty response.
+    results = RunnableLambda(run).abatch_as_completed(
+        valid, config={"max_concurrency": concurrency}, return_exceptions=True
+    )
+    async for position, output in results:
+        index, service, _ = valid[position]
+        if isinstance(output, Exception):
+            print(f"Error running {service} in batch: {output}")
+            error = f"{PERSONAS[service].get('error_prefix', 'Error')}: {output}"
+            yield {"index": index, "service": service, "status": "error", "error": error}
+        else:
+            yield {"index": index, "service": service, "status": "success", "message": output}
+
+def batch_services(items, concurrency=BATCH_CONCURRENCY):
+    """Synchronous generator over abatch_services(), which runs on the shared LLM loop."""
+    return iterate(lambda: abatch_services(items, concurrency))
+
+# --- Async execution ---
+# Native async service calls run on the shared loop from background_loop, so the
+# loop-bound connection pools of the async LLM clients survive across requests.
+async def acall(service_fn, *args):
     """
+    Awaits a google_ai service from any event loop.
 
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("user", user_prompt_template)
-    ])
+    Services with a native async variant (see ASYNC_VARIANTS) are scheduled on the shared
+    LLM loop, so one process can keep many provider calls in flight. Anything else runs
+    on a worker thread.
+    """
+    async_fn = ASYNC_VARIANTS.get(service_fn)
+    if async_fn is None:
+        return await asyncio.to_thread(service_fn, *args)
+    return await run_on_loop(async_fn(*args))
+
+def generate_website(prompt: str) -> tuple[str, str]:
+    """
+    Generates HTML and CSS code from a natural language prompt using LangChain and Vertex AI.
+    """
+    try:
+        text_response = invoke_service("generate_website", {"prompt": prompt})
+        return _parse_website(text_response)
+    except Exception as e:
+        print(f"Error generating website with LangChain: {e}")
+        return f"<!-- Error: {e} -->", f"/* Error: {e} */"
+
+async def agenerate_website(prompt: str) -> tuple[str, str]:
+    """Async variant of generate_website()."""
+    try:
+        text_response = await ainvoke_service("generate_website", {"prompt": prompt})
+        return _parse_website(text_response)
+    except Exception as e:
+        print(f"Error generating website with LangChain: {e}")
+        return f"<!-- Error: {e} -->", f"/* Error: {e} */"
+
+def _parse_website(text_response):
+    html_match = re.search(r'\[HTML\](.*?)\[/HTML\]', text_response, re.DOTALL)
+    css_match = re.search(r'\[CSS\](.*?)\[/CSS\]', text_response, re.DOTALL)
 
-    chain = prompt_template | model | StrOutputParser()
+    html_code = html_match.group(1).strip() if html_match else "<!-- Error: Could not generate HTML. -->"
+    css_code = css_match.group(1).strip() if css_match else "/* Error: Could not generate CSS. */"
 
+    return html_code, css_code
+
+def debug_code(code: str, language: str) -> list[str]:
+    """
+    Analyzes code and finds potential issues using LangChain and Vertex AI.
+    """
     try:
-        response_text = chain.invoke({"language": language, "code": code})
-        errors = response_text.strip().split('\n')
-        return [error for error in errors if error]
+        response_text = invoke_service("debug_code", {"language": language, "code": code})
+        return _parse_issues(response_text)
+    except Exception as e:
+        print(f"Error debugging code with LangChain: {e}")
+        return [f"Error: {e}"]
 
+async def adebug_code(code: str, language: str) -> list[str]:
+    """Async variant of debug_code()."""
+    try:
+        response_text = await ainvoke_service("debug_code", {"language": language, "code": code})
+        return _parse_issues(response_text)
     except Exception as e:
         print(f"Error debugging code with LangChain: {e}")
         return [f"Error: {e}"]
 
+def _parse_issues(response_text):
+    errors = response_text.strip().split('\n')
+    return [error for error in errors if error]
+
 def generate_social_media_post(description: str) -> str:
     """
     Generates a social media post using LangChain.
     """
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a creative marketing assistant."),
-        ("user", "Your task is to write an engaging social media post based on the following description: {description}. The post should be short, catchy, and include relevant hashtags.")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"description": description}).strip()
-    except Exception as e:
-        print(f"Error generating social media post: {e}")
-        return f"Error: {e}"
+    return run_service("generate_social_media_post", description)
 
 def generate_promotion_from_content(url: str, content: str) -> str:
     """
     Generates a promotion campaign using LangChain.
     """
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert marketing strategist."),
-        ("user", "Your task is to create a compelling promotion campaign for the product at the URL: {url}. Based on this content: {content}, generate a short, catchy, and engaging promotional text for social media with hashtags.")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"url": url, "content": content}).strip()
-    except Exception as e:
-        print(f"Error generating promotion: {e}")
-        return f"Error: {e}"
+    return run_service("generate_promotion_from_content", url, content)
 
 def generate_business_strategy(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert business strategist."),
-        ("user", "Develop a comprehensive business strategy with actionable steps based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("generate_business_strategy", prompt)
 
 def provide_ussd_blockchain_assistance(prompt: str) -> str:
     """
     Expert AI Model for USSD Specialist and USSD Blockchain Creator.
     """
-    model = get_model()
-    system_prompt = (
-        "You are an Elite AI USSD Specialist and USSD Blockchain Creator. "
-        "Your expertise covers the design and implementation of USSD (Unstructured Supplementary Service Data) "
-        "applications, integration with telecommunication networks, and the creation of USSD-based "
-        "blockchain interfaces. Provide high-level technical guidance on building secure, efficient, "
-        "and scalable USSD gateways, smart contract interaction via USSD, and blockchain-based "
-        "financial services for feature phones in emerging markets."
-    )
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("user", "{prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"USSD Blockchain AI Error: {e}"
+    return run_service("provide_ussd_blockchain_assistance", prompt)
 
 def provide_domain_codex_assistance(prompt: str) -> str:
     """
     Expert AI Model for Domain Codex Design, DHCP configuration, and USSP infrastructure.
     """
-    model = get_model()
-    system_prompt = (
-        "You are an Elite Domain Codex Designer and Infrastructure Architect. "
-        "Your expertise covers custom domain design, DHCP address configuration, "
-        "and USSP (U-space Service Provider) infrastructure using Codex-level insights. "
-        "Provide high-level technical guidance, strategic design plans, and secure "
-        "implementation steps for advanced AI projects requiring specialized network "
-        "architectures and domain naming conventions. Our primary domain is yendoukoa.ai."
-    )
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("user", "{prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Domain Codex AI Error: {e}"
+    return run_service("provide_domain_codex_assistance", prompt)
 
 def provide_claude_intelligence(prompt: str) -> str:
     """
     Uses Anthropic Claude for deep reasoning, strategic analysis, and nuanced understanding.
     """
-    try:
-        model = get_claude_model()
-        system_prompt = "You are an Elite Intelligence Agent powered by Anthropic Claude. Provide deep reasoning, strategic analysis, and nuanced insights for the user's query."
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("user", "{prompt}")
-        ])
-        chain = prompt_template | model | StrOutputParser()
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Claude Intelligence Error: {e}"
+    return run_service("provide_claude_intelligence", prompt)
 
 def provide_claude_coding_assistance(prompt: str) -> str:
     """
     Uses Anthropic Claude for elite code generation, debugging, and architectural advice.
     """
-    try:
-        model = get_claude_model()
-        system_prompt = "You are an Elite Software Engineer and Architect powered by Anthropic Claude. Provide high-quality code generation, robust debugging, and expert architectural advice."
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("user", "{prompt}")
-        ])
-        chain = prompt_template | model | StrOutputParser()
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Claude Coding Error: {e}"
+    return run_service("provide_claude_coding_assistance", prompt)
+
+LLAMA_INTELLIGENCE_MODEL = ("llamaindex-nvidia", "meta/llama-3.1-405b-instruct")
 
 def provide_llama_intelligence(prompt: str) -> str:
     """
@@ -248,15 +1008,36 @@ def provide_llama_intelligence(prompt: str) -> str:
     """
     try:
         # Configure LlamaIndex to use NVIDIA Llama 3.1 405B
-        nvidia_api_key = os.environ.get("NVIDIA_API_KEY")
-        if not nvidia_api_key:
+        if not os.environ.get("NVIDIA_API_KEY"):
             return "Error: NVIDIA_API_KEY not found in environment."
 
-        llm = LlamaIndexNVIDIA(model="meta/llama-3.1-405b-instruct", api_key=nvidia_api_key)
+        def attempt(provider, model_name):
+            llm = model_registry.get(provider, model_name)
+            # We can use the LLM directly for completion or in a more complex RAG setup
+            # For this integration, we show the power of Llama 3.1 405B
+            with provider_limits.limit(provider):
+                response = llm.complete(f"As an Elite Llama Intelligence Agent, provide deep reasoning and strategic insights for: {prompt}")
+            _record_completion_tokens(provider, response)
+            return response
+
+        response = model_router.call(LLAMA_INTELLIGENCE_MODEL, attempt, fallbacks=False)
+        return str(response).strip()
+    except Exception as e:
+        return f"Llama Intelligence Error: {e}"
 
-        # We can use the LLM directly for completion or in a more complex RAG setup
-        # For this integration, we show the power of Llama 3.1 405B
-        response = llm.complete(f"As an Elite Llama Intelligence Agent, provide deep reasoning and strategic insights for: {prompt}")
+async def aprovide_llama_intelligence(prompt: str) -> str:
+    """Async variant of provide_llama_intelligence()."""
+    try:
+        if not os.environ.get("NVIDIA_API_KEY"):
+            return "Error: NVIDIA_API_KEY not found in environment."
+        async def attempt(provider, model_name):
+            llm = model_registry.get(provider, model_name)
+            async with provider_limits.alimit(provider):
+                response = await llm.acomplete(f"As an Elite Llama Intelligence Agent, provide deep reasoning and strategic insights for: {prompt}")
+            _record_completion_tokens(provider, response)
+            return response
+
+        response = await model_router.acall(LLAMA_INTELLIGENCE_MODEL, attempt, fallbacks=False)
         return str(response).strip()
     except Exception as e:
         return f"Llama Intelligence Error: {e}"
@@ -265,1008 +1046,395 @@ def provide_llama_guard_assistance(prompt: str) -> str:
     """
     Uses Llama Guard for AI safety and content moderation.
     """
-    try:
-        # Using Llama Guard 3 via NVIDIA
-        model = get_nvidia_model(model_name="meta/llama-guard-3-8b")
-
-        system_prompt = "You are an AI Safety Specialist using Llama Guard. Analyze the following prompt for potential safety violations, hate speech, or harmful content. Provide a safety assessment."
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("user", "{prompt}")
-        ])
-
-        chain = prompt_template | model | StrOutputParser()
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Llama Guard Error: {e}"
+    return run_service("provide_llama_guard_assistance", prompt)
 
 def provide_nemotron_reasoning(prompt: str) -> str:
     """
     Uses NVIDIA Nemotron for advanced reasoning and complex problem solving.
     """
-    try:
-        model = get_nvidia_model(model_name="nvidia/nemotron-4-340b-instruct")
-        system_prompt = "You are an Elite Reasoning Agent powered by NVIDIA Nemotron. Provide a logical, step-by-step analysis and solution for the user's complex query."
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("user", "{prompt}")
-        ])
-        chain = prompt_template | model | StrOutputParser()
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Nemotron Reasoning Error: {e}"
+    return run_service("provide_nemotron_reasoning", prompt)
 
 def provide_mixtral_multilingual_assistance(prompt: str) -> str:
     """
     Uses Mixtral 8x7B for high-quality multilingual assistance.
     """
-    try:
-        model = get_nvidia_model(model_name="mistralai/mixtral-8x7b-instruct-v0.1")
-        system_prompt = "You are a Multilingual AI Specialist powered by Mixtral. Assist the user with their request in their preferred language with high accuracy and cultural context."
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("user", "{prompt}")
-        ])
-        chain = prompt_template | model | StrOutputParser()
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Mixtral Multilingual Error: {e}"
+    return run_service("provide_mixtral_multilingual_assistance", prompt)
 
 def provide_monetization_advice(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Monetization Strategist. Your goal is to help projects generate revenue through various models like subscriptions, ads, and premium features."),
-        ("user", "Provide a detailed monetization strategy for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_monetization_advice", prompt)
 
 def provide_partnership_advice(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Partnership and Business Development Specialist. Your goal is to identify and nurture strategic alliances that drive mutual growth."),
-        ("user", "Provide a partnership and alliance strategy for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_partnership_advice", prompt)
 
 def provide_fundraising_advice(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Fundraising Strategist and Venture Capital Consultant. Your goal is to help startups and projects secure funding through various stages and sources."),
-        ("user", "Provide a comprehensive fundraising plan and strategy for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_fundraising_advice", prompt)
 
 def provide_it_support(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a knowledgeable IT support specialist."),
-        ("user", "Provide a clear, step-by-step solution to this technical issue: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_it_support", prompt)
 
 def analyze_data(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a skilled data scientist."),
-        ("user", "Analyze the following data and provide insights, trends, and conclusions: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("analyze_data", prompt)
 
 def provide_financial_advice(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert financial advisor."),
-        ("user", "Provide comprehensive financial advice with actionable steps based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_financial_advice", prompt)
 
 def generate_blockchain_code(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert blockchain developer."),
-        ("user", "Generate well-structured blockchain code with comments based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("generate_blockchain_code", prompt)
 
 def generate_blogger_bots_page(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert blogger and bot developer."),
-        ("user", "Generate an engaging blogger page with functional bots based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("generate_blogger_bots_page", prompt)
 
 def generate_messenger_code(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Messenger developer and manager."),
-        ("user", "Generate code for a Messenger bot or integration following best practices based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("generate_messenger_code", prompt)
 
 def learn_language(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a friendly and patient language tutor."),
-        ("user", "Help the user learn a new language based on their request: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("learn_language", prompt)
 
 def provide_telecommunication_support(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a knowledgeable telecommunication support specialist."),
-        ("user", "Provide a clear, step-by-step solution to this telecommunication issue: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_telecommunication_support", prompt)
 
 def generate_telecommunication_assistant_response(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a helpful telecommunication assistant."),
-        ("user", "Provide a clear and concise response to this query: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("generate_telecommunication_assistant_response", prompt)
 
 def provide_science_education(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a knowledgeable and patient sciences educator."),
-        ("user", "Provide clear explanations or solve exercises for this request: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_science_education", prompt)
 
 def provide_transaction_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a helpful assistant for mobile operators, banks, and transactions."),
-        ("user", "Provide assistance on fraud prevention and transaction facilities for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_transaction_assistance", prompt)
 
 def play_music_instrumental(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a virtuoso music instrumentalist."),
-        ("user", "Provide musical suggestions, help with learning, tabs, or compose short pieces for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("play_music_instrumental", prompt)
 
 def provide_geometry_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert mathematician specializing in geometry."),
-        ("user", "Provide assistance with geometry problems, theorems, and concepts for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_geometry_assistance", prompt)
 
 def provide_cartography_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert cartographer and GIS specialist."),
-        ("user", "Provide assistance with map making, geographical data analysis, and coordinate systems for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_cartography_assistance", prompt)
 
 def provide_document_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert document specialist."),
-        ("user", "Assist with writing, scanning, and building documents based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_document_assistance", prompt)
 
 def provide_business_plan_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert business consultant and strategist."),
-        ("user", "Help create, perfect, and develop a comprehensive business plan based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_business_plan_assistance", prompt)
 
 def provide_investigation_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert investigator specializing in cybersecurity and global security."),
-        ("user", "Provide deep insights and investigative strategies for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_investigation_assistance", prompt)
 
 def provide_military_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Military Strategist and Defense Analyst. Your role is to provide strategic guidance, tactical analysis, and operational planning assistance for armed forces. Focus on modern warfare, defense technology, and national security optimization."),
-        ("user", "Provide comprehensive military assistance and strategic guidance for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_military_assistance", prompt)
 
 def provide_gendarmerie_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Gendarmerie Specialist and Paramilitary Advisor. Your role is to assist with hybrid civilian-military security missions, rural policing strategies, public order maintenance, and specialized law enforcement operations."),
-        ("user", "Provide specialized gendarmerie assistance and operational guidance for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_gendarmerie_assistance", prompt)
 
 def provide_police_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Police Service and Law Enforcement Specialist. Your goal is to help optimize police performance, community policing strategies, crime prevention techniques, and urban security management."),
-        ("user", "Provide professional police service assistance and performance optimization for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_police_assistance", prompt)
 
 def provide_security_optimization_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Security Performance and Optimization Specialist. Your role is to analyze and improve the efficiency of security services, integrating advanced AI analytics, resource management, and strategic planning to enhance public safety."),
-        ("user", "Analyze and provide an optimization plan for the following security service request: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_security_optimization_assistance", prompt)
 
 def provide_podcast_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert podcast producer, creator, and designer."),
-        ("user", "Provide assistance with creating, perfecting, and designing high-quality podcasts for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_podcast_assistance", prompt)
 
 def provide_supply_chain_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert supply chain consultant."),
-        ("user", "Provide assistance with optimizing and managing supply chain operations for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_supply_chain_assistance", prompt)
 
 def provide_logistics_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert logistics and transportation specialist."),
-        ("user", "Provide assistance with managing the movement of goods and materials for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_logistics_assistance", prompt)
 
 def provide_data_engineering_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert data engineer and architect."),
-        ("user", "Provide assistance with designing, building, and maintaining data pipelines and architectures for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_data_engineering_assistance", prompt)
 
 def provide_incoterms_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert in Incoterms and international trade."),
-        ("user", "Provide assistance and clarification on the use and interpretation of Incoterms for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_incoterms_assistance", prompt)
 
 def provide_ecommerce_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert e-commerce assistant and website manager."),
-        ("user", "Provide assistance with managing e-commerce platforms and websites for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_ecommerce_assistance", prompt)
 
 def provide_government_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert government public administrator assistant. Your goal is to help citizens and officials navigate public services, understand bureaucratic processes, and facilitate document acquisition efficiently and transparently."),
-        ("user", "Provide comprehensive assistance with government services, administrative procedures, and document providing for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_government_assistance", prompt)
 
 def provide_togo_public_service_assistance(prompt: str) -> str:
     """
     Expert AI Model for Togo's public services, government administration, and national security.
     """
-    model = get_model()
-    system_prompt = (
-        "You are an Elite AI Specialist for Togolese Public Services and National Security. "
-        "Your expertise covers Togo's administrative procedures (Service Public Togo), "
-        "digital transformation initiatives (CINA - Cellule de Coordination du Millénium), "
-        "and national security protocols. You provide guidance on government documentation, "
-        "public administration efficiency, and advanced security tools for the Togolese government. "
-        "Ensure all advice aligns with Togolese law and official digital government standards. "
-        "Focus on transparency, efficiency, and powerful security control."
-    )
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("user", "{prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Togo Public Service AI Error: {e}"
+    return run_service("provide_togo_public_service_assistance", prompt)
 
 def provide_public_policy_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Public Policy Advisor and Analyst. Your role is to provide data-driven insights, policy evaluation, and strategic recommendations for government entities and public organizations."),
-        ("user", "Analyze and provide strategic advice on the following public policy issue: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_public_policy_assistance", prompt)
 
 def provide_citizen_engagement_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert in Citizen Engagement and Participatory Democracy. Your goal is to help governments foster better communication with citizens, design public consultation processes, and enhance civic participation."),
-        ("user", "Provide a strategy or plan to improve citizen engagement for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_citizen_engagement_assistance", prompt)
 
 def provide_smart_city_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Smart City Strategist and Urban Technologist. Your role is to provide guidance on integrating AI, IoT, and data analytics into urban infrastructure to improve the quality of life for citizens."),
-        ("user", "Provide a technical and strategic plan for smart city integration regarding: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_smart_city_assistance", prompt)
 
 def provide_bias_detection_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert AI Bias Detection and Ethical Governance Specialist. Your role is to analyze government services, policies, and algorithms for potential biases (racial, gender, socioeconomic, etc.) and provide actionable recommendations to ensure fairness, transparency, and equity in public service delivery."),
-        ("user", "Analyze the following for potential bias and provide ethical guidance: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_bias_detection_assistance", prompt)
 
 def provide_biotech_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert biotech development specialist and researcher."),
-        ("user", "Provide assistance with biotechnology projects, research, and development for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_biotech_assistance", prompt)
 
 def provide_legal_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert legal consultant, human rights advocate, and legal educator."),
-        ("user", "Provide assistance to lawyers, courts, parliaments, and legal students for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_legal_assistance", prompt)
 
 def provide_fintech_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert fintech consultant and data engineer."),
-        ("user", "Provide high-level assistance and guidance for banks, fintechs, and VC firms for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_fintech_assistance", prompt)
 
 def provide_music_production_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert music producer and talent manager."),
-        ("user", "Provide assistance with music beats, songs, rhythms, and singer promotion for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_music_production_assistance", prompt)
 
 def translate_text(text: str, target_language: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a professional translation service."),
-        ("user", "Translate the following text accurately into {target_language}. Provide ONLY the translation. Text: {text}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"text": text, "target_language": target_language}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("translate_text", text, target_language)
 
 def provide_aerospace_automotive_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert specialist in the automotive, aeronautics, and astronomy sectors."),
-        ("user", "Provide high-level assistance, technical guidance, and strategic advice for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_aerospace_automotive_assistance", prompt)
 
 def provide_data_science_stewardship_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Data Scientist, Data Steward, and Data Protection Officer Assistant."),
-        ("user", "Provide high-level assistance, technical guidance, and strategic advice for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_data_science_stewardship_assistance", prompt)
 
 def provide_logo_thumbnail_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert graphic designer and branding specialist."),
-        ("user", "Provide assistance with creating and designing logos and thumbnails for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_logo_thumbnail_assistance", prompt)
 
 def provide_fake_content_verification_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert in digital forensics, AI content detection, and fact-checking."),
-        ("user", "Analyze the following content and provide a detailed assessment of its authenticity: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_fake_content_verification_assistance", prompt)
 
 def provide_automatic_learning_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert in Automatic Learning, Machine Learning, and AI development."),
-        ("user", "Provide high-level technical guidance, strategy, and problem-solving assistance for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_automatic_learning_assistance", prompt)
 
 def provide_ia_data_engineering_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert AI Data Engineer and Architect."),
-        ("user", "Provide assistance with designing, building, and maintaining data pipelines and architectures for AI for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_ia_data_engineering_assistance", prompt)
 
 def provide_data_lab_center_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Data Lab and Data Center Specialist."),
-        ("user", "Provide assistance with designing, building, and managing data laboratories and data center infrastructure for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_data_lab_center_assistance", prompt)
 
 def provide_computer_vision_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Computer Vision Specialist."),
-        ("user", "Provide high-level technical guidance, strategy, and problem-solving assistance in computer vision for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_computer_vision_assistance", prompt)
 
 def provide_ia_researcher_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert AI Researcher."),
-        ("user", "Provide high-level scientific and technical guidance on artificial intelligence research and development for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_ia_researcher_assistance", prompt)
 
 def provide_esports_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert eSports Development and Assistance Specialist."),
-        ("user", "Provide high-level technical guidance, strategic advice, and problem-solving assistance in eSports for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_esports_assistance", prompt)
 
 def provide_dermatology_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert AI Dermatology Specialist and Assistant. DISCLAIMER: You are an AI, not a doctor."),
-        ("user", "Provide professional, accurate, and detailed information related to dermatology for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_dermatology_assistance", prompt)
 
 def provide_microsoft_ignite_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert in Microsoft Ignite tools, specifically Azure AI Foundry and Agentic AI."),
-        ("user", "Provide high-level technical guidance and strategic advice regarding Microsoft Ignite tools for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_microsoft_ignite_assistance", prompt)
 
 def provide_diagnostic_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert AI Diagnostic Specialist. DISCLAIMER: You are an AI, not a doctor."),
-        ("user", "Provide professional, accurate, and detailed information related to medical diagnostics for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_diagnostic_assistance", prompt)
 
 def provide_eshop_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert E-shop and E-commerce Creation Specialist."),
-        ("user", "Provide high-level technical guidance and strategic advice for building and managing online stores for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_eshop_assistance", prompt)
 
 def provide_it_operations_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert IT Operations Specialist and System Administrator."),
-        ("user", "Provide high-level technical guidance and problem-solving assistance in IT operations for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_it_operations_assistance", prompt)
 
 def provide_maintenance_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Software, Computer, and Phones Maintenance Specialist."),
-        ("user", "Provide high-level technical guidance and troubleshooting steps for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_maintenance_assistance", prompt)
 
 def provide_google_sites_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Google Sites and DNS Specialist. Our primary domain is yendoukoa.ai."),
-        ("user", "Provide high-level technical guidance for Google Sites, DNS, and custom subdomains (especially for yendoukoa.ai) for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_google_sites_assistance", prompt)
 
 def provide_marketing_bot_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Digital Marketing and Bot Management Specialist."),
-        ("user", "Provide high-level strategic guidance and technical assistance for marketing bots and campaigns for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_marketing_bot_assistance", prompt)
 
 def provide_digital_repair_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Digital Repair and Troubleshooting Specialist."),
-        ("user", "Provide high-level technical guidance and troubleshooting steps for digital assets for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_digital_repair_assistance", prompt)
 
 def provide_investment_trading_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Investment Optimization and Trading Specialist."),
-        ("user", "Provide high-level strategic guidance, market analysis insights, and investment optimization advice for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_investment_trading_assistance", prompt)
 
 def provide_autogpt_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an autonomous AI agent (AutoGPT) specialized in multi-step task planning and execution. Your goal is to break down complex requests into actionable steps and provide a comprehensive strategy to achieve the user's goal."),
-        ("user", "Develop an autonomous execution plan for: {prompt}")
+    return run_service("provide_autogpt_assistance", prompt)
+
+# --- Multi-model conflict debugging ---
+# The panel is queried concurrently on the shared LLM loop. Every member has its own
+# deadline and the synthesis starts as soon as CONFLICT_DEBUG_QUORUM members have answered,
+# so a slow or hung provider no longer decides how long the endpoint takes.
+CONFLICT_DEBUG_PANEL = {
+    "Gemini": ("vertex", "gemini-1.5-flash"),
+    "OpenAI": ("openai", "gpt-4o"),
+    "Claude": ("anthropic", "claude-3-5-sonnet-20240620"),
+    "NVIDIA": ("nvidia", "nvidia/llama-3.1-405b-instruct"),
+}
+CONFLICT_DEBUG_ORCHESTRATOR = DEFAULT_PERSONA_MODEL
+CONFLICT_DEBUG_DEADLINE = float(os.environ.get("CONFLICT_DEBUG_DEADLINE", "20"))
+CONFLICT_DEBUG_QUORUM = int(os.environ.get("CONFLICT_DEBUG_QUORUM", "3"))
+
+@once
+def conflict_insight_chain_parts():
+    """Returns the (prompt_template, output_parser) shared by every panel member."""
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+    prompt_template = ChatPromptTemplate.from_messages([
+        ("system", "You are a professional debugger using the {name} model. Provide a concise technical insight for the following issue."),
+        ("user", "{prompt}")
     ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
-
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+    return prompt_template, StrOutputParser()
 
-def provide_conflict_debug_assistance(prompt: str) -> str:
+async def fan_out(calls, deadline, quorum):
     """
-    Empowers the AI to debug code and resolve conflicts by leveraging multiple models (Gemini, ChatGPT, Claude, NVIDIA).
+    Runs {name: coroutine_function} concurrently until `quorum` of them have succeeded
+    or all of them have finished.
+
+    Each call is cancelled after `deadline` seconds, and calls still running once the
+    quorum is reached are cancelled as well. Returns, in the order of `calls`,
+    {name: {"status": "ok" | "error" | "timeout" | "skipped", "result" | "error", "latency_ms"}}.
     """
-    models = {
-        "Gemini": get_model(),
-        "OpenAI": get_openai_model(),
-        "Claude": get_claude_model(),
-        "NVIDIA": get_nvidia_model()
-    }
+    started = time.perf_counter()
+    outcomes = {}
+
+    def elapsed_ms():
+        return round((time.perf_counter() - started) * 1000, 1)
 
-    def get_insight(name, model, prompt):
+    async def run(name, call):
         try:
-            system_prompt = f"You are a professional debugger using the {name} model. Provide a concise technical insight for the following issue."
-            prompt_template = ChatPromptTemplate.from_messages([
-                ("system", system_prompt),
-                ("user", "{prompt}")
-            ])
-            chain = prompt_template | model | StrOutputParser()
-            return name, chain.invoke({"prompt": prompt}).strip()
+            outcome = {"status": "ok", "result": await asyncio.wait_for(call(), deadline)}
+        except asyncio.TimeoutError:
+            outcome = {"status": "timeout", "error": f"no answer within {deadline:g}s"}
         except Exception as e:
-            return name, f"Error retrieving insight: {e}"
+            outcome = {"status": "error", "error": str(e)}
+        outcome["latency_ms"] = elapsed_ms()
+        outcomes[name] = outcome
+
+    tasks = {asyncio.ensure_future(run(name, call)): name for name, call in calls.items()}
+    pending = set(tasks)
+    answered = 0
+    while pending and answered < quorum:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        answered += sum(outcomes[tasks[task]]["status"] == "ok" for task in done)
+    for task in pending:
+        task.cancel()
+        outcomes[tasks[task]] = {"status": "skipped", "error": "quorum reached", "latency_ms": elapsed_ms()}
+    return {name: outcomes[name] for name in calls}
+
+async def _conflict_insight(name, prompt):
+    prompt_template, parser = conflict_insight_chain_parts()
+
+    async def attempt(provider, model_name):
+        chain = prompt_template | model_registry.get(provider, model_name) | parser
+        async with provider_limits.alimit(provider):
+            return (await chain.ainvoke({"name": name, "prompt": prompt})).strip()
+
+    # Every panel member is a different provider on purpose, so members do not fail over.
+    return await model_router.acall(CONFLICT_DEBUG_PANEL[name], attempt, fallbacks=False)
+
+def _latency_summary(outcomes):
+    parts = []
+    for name, outcome in outcomes.items():
+        if outcome["status"] == "ok":
+            parts.append(f"{name} {outcome['latency_ms']:.0f} ms")
+        else:
+            parts.append(f"{name} {outcome['status']} ({outcome['latency_ms']:.0f} ms)")
+    return "Model latency: " + ", ".join(parts)
+
+async def aprovide_conflict_debug_assistance(prompt: str) -> str:
+    """
+    Empowers the AI to debug code and resolve conflicts by leveraging multiple models (Gemini, ChatGPT, Claude, NVIDIA).
 
-    insights = {}
-    with ThreadPoolExecutor(max_workers=len(models)) as executor:
-        futures = [executor.submit(get_insight, name, model, prompt) for name, model in models.items()]
-        for future in futures:
-            name, insight = future.result()
-            insights[name] = insight
+    The answer ends with the latency of every panel member.
+    """
+    with tracer.span("conflict_debug.panel", members=len(CONFLICT_DEBUG_PANEL)):
+        outcomes = await fan_out(
+            {name: functools.partial(_conflict_insight, name, prompt) for name in CONFLICT_DEBUG_PANEL},
+            deadline=CONFLICT_DEBUG_DEADLINE,
+            quorum=CONFLICT_DEBUG_QUORUM,
+        )
+    insights = {name: outcome.get("result", outcome.get("error")) for name, outcome in outcomes.items()}
+    answered = {name: outcome["result"] for name, outcome in outcomes.items() if outcome["status"] == "ok"}
+    if not answered:
+        return f"Error in multi-model synthesis: no model answered. Raw insights: {insights}\n\n{_latency_summary(outcomes)}"
 
     # Use Gemini as the final orchestrator to synthesize all insights
     try:
-        orchestrator = get_model()
+        build = tracer.start_span("prompt.build")
+        model_insights = "\n".join(f"        - {name}: {insight}" for name, insight in answered.items())
         synthesis_prompt = f"""You are an Elite Multi-Model AI Orchestrator.
         You have gathered insights from several top AI models regarding a code bug or conflict.
 
         User Problem: {prompt}
 
         Model Insights:
-        - Gemini: {insights.get('Gemini')}
-        - OpenAI: {insights.get('OpenAI')}
-        - Claude: {insights.get('Claude')}
-        - NVIDIA: {insights.get('NVIDIA')}
+{model_insights}
 
         Based on these insights, provide a definitive, comprehensive solution that:
         1. Identifies the most likely root cause.
         2. Proposes a robust, step-by-step fix.
         3. Explains best practices to avoid such conflicts in the future.
         """
+        build.end()
+
+        async def synthesize(provider, model_name):
+            async with provider_limits.alimit(provider):
+                return await asyncio.wait_for(
+                    model_registry.get(provider, model_name).ainvoke(synthesis_prompt), CONFLICT_DEBUG_DEADLINE)
 
-        return orchestrator.invoke(synthesis_prompt).content.strip()
+        with tracer.span("conflict_debug.synthesis"):
+            synthesis = await model_router.acall(CONFLICT_DEBUG_ORCHESTRATOR, synthesize)
+        return f"{synthesis.content.strip()}\n\n{_latency_summary(outcomes)}"
     except Exception as e:
-        return f"Error in multi-model synthesis: {e}. Raw insights: {insights}"
+        return f"Error in multi-model synthesis: {e!r}. Raw insights: {insights}\n\n{_latency_summary(outcomes)}"
+
+def provide_conflict_debug_assistance(prompt: str) -> str:
+    """Synchronous entry point; runs the fan-out on the shared LLM loop."""
+    return run_sync(aprovide_conflict_debug_assistance(prompt))
 
 def generic_ai_service(system_message: str, user_prompt: str) -> str:
     """
     A generic AI service using LangChain to allow flexible role creation.
     """
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_message),
-        ("user", "{prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": user_prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("generic_ai_service", system_message, user_prompt)
 
 def provide_malware_defense_assistance(prompt: str) -> str:
     """
     Expert AI Model for Malware Defense and Cybersecurity.
     """
-    model = get_model()
-    system_prompt = (
-        "You are an Elite Malware Defense Specialist and Cybersecurity Architect. "
-        "Your expertise covers all types of malware, including viruses, trojans, ransomware, "
-        "spyware, adware, and rootkits. Provide high-level technical guidance on "
-        "detection, prevention, removal strategies, and system hardening. "
-        "Advise on advanced threat intelligence, behavioral analysis, and "
-        "incident response protocols to protect against sophisticated cyber attacks."
-    )
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("user", "{prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Malware Defense AI Error: {e}"
+    return run_service("provide_malware_defense_assistance", prompt)
 
 def provide_feature_engineering_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert in Automated Feature Engineering and Data Preparation."),
-        ("user", "Provide high-level technical guidance and strategy for automated feature engineering based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_feature_engineering_assistance", prompt)
 
 def provide_hyperparameter_tuning_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert in Hyperparameter Optimization and Model Tuning."),
-        ("user", "Provide high-level technical guidance and strategy for hyperparameter tuning based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_hyperparameter_tuning_assistance", prompt)
 
 def provide_model_selection_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert in AutoML Model Selection and Evaluation."),
-        ("user", "Provide high-level technical guidance and strategy for selecting and evaluating ML models based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_model_selection_assistance", prompt)
 
 def provide_mlops_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert in MLOps and Automated ML Pipelines."),
-        ("user", "Provide high-level technical guidance and strategy for automating ML pipelines and deployment based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_mlops_assistance", prompt)
 
 def provide_cloud_infrastructure_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert Cloud Infrastructure Architect specializing in secure IP addresses, DNS configuration, and cloud server creation (AWS, GCP, Azure). Our primary domain is yendoukoa.ai."),
-        ("user", "Provide high-level technical guidance and secure implementation steps (including DNS setup for yendoukoa.ai) for: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_cloud_infrastructure_assistance", prompt)
 
 def provide_iaas_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert IaaS (Infrastructure as a Service) Specialist. Your goal is to provide guidance on virtualized computing resources over the internet, including virtual machines, storage, and networking."),
-        ("user", "Provide high-level technical guidance and strategic advice for IaaS based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_iaas_assistance", prompt)
 
 def provide_paas_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert PaaS (Platform as a Service) Specialist. Your goal is to provide guidance on platforms that allow customers to develop, run, and manage applications without the complexity of building and maintaining infrastructure."),
-        ("user", "Provide high-level technical guidance and strategic advice for PaaS based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_paas_assistance", prompt)
 
 def provide_saas_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert SaaS (Software as a Service) Specialist. Your goal is to provide guidance on software distribution models where applications are hosted by a provider and made available to customers over a network, typically the internet."),
-        ("user", "Provide high-level technical guidance and strategic advice for SaaS based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_saas_assistance", prompt)
 
 def provide_itaas_assistance(prompt: str) -> str:
-    model = get_model()
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert ITaaS (IT as a Service) Specialist. Your goal is to provide guidance on an operational model where the IT department or a provider delivers IT services to a business as a subscription-based service."),
-        ("user", "Provide high-level technical guidance and strategic advice for ITaaS based on: {prompt}")
-    ])
-    chain = prompt_template | model | StrOutputParser()
-    try:
-        return chain.invoke({"prompt": prompt}).strip()
-    except Exception as e:
-        return f"Error: {e}"
+    return run_service("provide_itaas_assistance", prompt)
+
+# Persona services whose text answer can be streamed, keyed by service function, used by stream().
+STREAMING_SERVICES = {
+    globals()[service]: service
+    for service in PERSONAS
+    if service not in ("generate_website", "debug_code")
+}
+
+# Native async variants keyed by the synchronous service function, used by acall().
+ASYNC_VARIANTS = {
+    globals()[service]: functools.partial(arun_service, service)
+    for service in PERSONAS
+}
+ASYNC_VARIANTS.update({
+    generate_website: agenerate_website,
+    debug_code: adebug_code,
+    provide_llama_intelligence: aprovide_llama_intelligence,
+    provide_conflict_debug_assistance: aprovide_conflict_debug_assistance,
+})
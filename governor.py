@@ -0,0 +1,201 @@
+"""
+Concurrency governor for outbound LLM calls.
+
+Two layers sit in front of the provider calls made by google_ai:
+
+* Singleflight: identical calls (same service, model and inputs) that are in flight at
+  the same time share one provider request, and every caller gets its result.
+* Provider limits: at most LLM_CONCURRENCY_<PROVIDER> calls run against a provider at
+  once. Further calls queue in-process in arrival order instead of piling onto the
+  provider and coming back as 429s. Sync threads and async tasks share the same slots.
+"""
+import asyncio
+import contextlib
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+# Registry providers that talk to the same upstream share its limit.
+PROVIDER_GROUPS = {"llamaindex-nvidia": "nvidia"}
+DEFAULT_LIMITS = {"vertex": 32, "openai": 32, "anthropic": 16, "nvidia": 16}
+
+
+class Singleflight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Returns fn(), or the result of the identical call already in flight under key."""
+        with self._lock:
+            self.calls += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    async def ado(self, key, make_coro):
+        """
+        Async variant of do(). The call runs as its own task, so a caller that is cancelled
+        (e.g. by a timeout) does not cancel it for the callers still waiting.
+        """
+        loop = asyncio.get_running_loop()
+        full_key = (loop, key)
+        with self._lock:
+            self.calls += 1
+            task = self._calls.get(full_key)
+            if task is None:
+                task = self._calls[full_key] = loop.create_task(make_coro())
+                task.add_done_callback(lambda done: self._finish(full_key, done))
+            else:
+                self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if task is not None and not task.cancelled():
+            # Marks the exception as retrieved when every caller gave up waiting.
+            task.exception()
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+class _Slots:
+    """A FIFO counting semaphore that both threads and coroutines can wait on."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.queued = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, waiter):
+        # Callers hold self._lock.
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+        self.queued += 1
+        self._waiters.append(waiter)
+        return False
+
+    def acquire(self):
+        event = threading.Event()
+        with self._lock:
+            if self._try_acquire(event):
+                return
+        event.wait()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        with self._lock:
+            if self._try_acquire(waiter):
+                return
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was already handed over; pass it on instead of leaking it.
+            if waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self.in_flight -= 1
+                return
+            # The slot goes straight to the next waiter, so in_flight does not change.
+            waiter = self._waiters.popleft()
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            loop, future = waiter
+            loop.call_soon_threadsafe(self._wake, future)
+
+    def _wake(self, future):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                "peak_in_flight": self.peak_in_flight,
+                "queued": self.queued,
+            }
+
+
+class ProviderLimits:
+    def __init__(self, limits=DEFAULT_LIMITS):
+        """limits maps a provider to its maximum concurrent calls; 0 or a missing entry means unlimited."""
+        self._slots = {provider: _Slots(limit) for provider, limit in limits.items() if limit > 0}
+
+    @classmethod
+    def from_env(cls):
+        """LLM_CONCURRENCY_VERTEX, LLM_CONCURRENCY_OPENAI, LLM_CONCURRENCY_ANTHROPIC and LLM_CONCURRENCY_NVIDIA."""
+        return cls({
+            provider: int(os.environ.get(f"LLM_CONCURRENCY_{provider.upper()}", limit))
+            for provider, limit in DEFAULT_LIMITS.items()
+        })
+
+    def _get(self, provider):
+        return self._slots.get(PROVIDER_GROUPS.get(provider, provider))
+
+    @contextlib.contextmanager
+    def limit(self, provider):
+        """Holds one of the provider's call slots, waiting for one if all are taken."""
+        slots = self._get(provider)
+        if slots is None:
+            yield
+            return
+        slots.acquire()
+        try:
+            yield
+        finally:
+            slots.release()
+
+    @contextlib.asynccontextmanager
+    async def alimit(self, provider):
+        """Async variant of limit()."""
+        slots = self._get(provider)
+        if slots is None:
+            yield
+            return
+        await slots.aacquire()
+        try:
+            yield
+        finally:
+            slots.release()
+
+    def stats(self):
+        return {provider: slots.stats() for provider, slots in self._slots.items()}
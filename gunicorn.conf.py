@@ -0,0 +1,11 @@
+"""
+gunicorn settings, read from the working directory by `gunicorn app:app` (see Procfile).
+
+Background threads that must run in every worker are started here, once the worker has
+loaded the app: threads started in the master would not survive the fork.
+"""
+
+
+def post_worker_init(worker):
+    from app import start_webhook_applier
+    start_webhook_applier()
@@ -0,0 +1,136 @@
+"""
+Hedged requests for latency-sensitive services.
+
+A hedged call starts on the primary model. If it has not answered within the
+service's recent p95 latency, the same request is also sent to a secondary model. The
+first answer wins and the other call is cancelled. Latencies are kept per service in a
+small log-bucket histogram that decays, so the threshold follows the provider's
+current behaviour. Every hedge is an extra provider request; stats() reports how many
+were sent and how often the hedge actually won.
+"""
+import asyncio
+import bisect
+import os
+import threading
+import time
+
+# Bucket upper bounds from 10 ms to about 4 minutes, 25% apart.
+BUCKETS = [0.01 * 1.25 ** i for i in range(46)]
+
+
+class LatencyHistogram:
+    def __init__(self, window=1000):
+        """Counts are halved every `window` samples so that old latencies fade out."""
+        self.window = window
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += 1
+        if self.total >= self.window:
+            self.counts = [count // 2 for count in self.counts]
+            self.total = sum(self.counts)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples, or None without samples."""
+        if not self.total:
+            return None
+        rank = fraction * self.total
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return BUCKETS[-1]
+
+
+class HedgePolicy:
+    def __init__(self, enabled=False, percentile=0.95, default_delay=2.0, min_samples=20, clock=time.monotonic):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.clock = clock
+        self._histograms = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """LLM_HEDGING=1 turns hedging on; LLM_HEDGE_PERCENTILE and LLM_HEDGE_DEFAULT_DELAY (seconds) tune it."""
+        return cls(
+            enabled=os.environ.get("LLM_HEDGING", "0") == "1",
+            percentile=float(os.environ.get("LLM_HEDGE_PERCENTILE", "0.95")),
+            default_delay=float(os.environ.get("LLM_HEDGE_DEFAULT_DELAY", "2")),
+        )
+
+    def _service(self, service):
+        # Callers hold self._lock.
+        if service not in self._histograms:
+            self._histograms[service] = LatencyHistogram()
+            self._stats[service] = {"calls": 0, "hedged": 0, "hedge_wins": 0}
+        return self._histograms[service], self._stats[service]
+
+    def delay(self, service):
+        """Seconds to wait for the primary before hedging: its recent p95, or the default until enough samples."""
+        with self._lock:
+            histogram, _ = self._service(service)
+            if histogram.total < self.min_samples:
+                return self.default_delay
+            return histogram.percentile(self.percentile)
+
+    def record_latency(self, service, seconds):
+        with self._lock:
+            self._service(service)[0].record(seconds)
+
+    async def call(self, service, primary, secondary):
+        """
+        Awaits primary(), hedged with secondary() once the service's delay has passed.
+        Returns the first successful result; if both fail, the primary's error is raised.
+        """
+        delay = self.delay(service)
+        started = self.clock()
+        first, second = asyncio.ensure_future(primary()), None
+        with self._lock:
+            self._service(service)[1]["calls"] += 1
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done:
+                result = first.result()
+                self.record_latency(service, self.clock() - started)
+                return result
+            with self._lock:
+                self._service(service)[1]["hedged"] += 1
+            second = asyncio.ensure_future(secondary())
+            pending = {first, second}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        continue
+                    # Either way the primary took at least this long.
+                    self.record_latency(service, self.clock() - started)
+                    if task is second:
+                        with self._lock:
+                            self._service(service)[1]["hedge_wins"] += 1
+                    return task.result()
+            return first.result()
+        finally:
+            for task in (first, second):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self):
+        """Per service: calls, hedges sent (the extra provider requests), hedges that won, and the current threshold."""
+        with self._lock:
+            services = list(self._stats)
+        result = {}
+        for service in services:
+            delay = self.delay(service)
+            with self._lock:
+                stats = dict(self._stats[service])
+            stats["extra_request_ratio"] = round(stats["hedged"] / stats["calls"], 4) if stats["calls"] else 0.0
+            stats["threshold_ms"] = round(delay * 1000)
+            result[service] = stats
+        return result
@@ -0,0 +1,218 @@
+"""
+Shared outbound HTTP layer for LLM providers.
+
+Every provider client built by google_ai's model registry gets its httpx client from
+here, so all models of a provider share one size-limited, keep-alive connection pool
+(HTTP/2 where the server negotiates it) instead of each SDK building its own with
+default settings. Pool usage per provider is available from stats().
+
+SDKs pin their own httpx flavour (the Anthropic SDK uses the httpx2 fork), so clients
+are built from the SDK's own client class and the transport comes from the matching package.
+Usage is counted by wrapping that transport through httpx's public transport API: a
+request is in flight, using or waiting for a pooled connection (or an HTTP/2 stream),
+from the moment it is sent until its response is closed. The pool limits it is compared
+against are the ones configured here.
+"""
+import functools
+import importlib
+import os
+import threading
+
+from tracing import tracer
+
+MAX_CONNECTIONS = int(os.environ.get("HTTP_POOL_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_POOL_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_POOL_KEEPALIVE_EXPIRY", "30"))
+HTTP2 = os.environ.get("HTTP_POOL_HTTP2", "1") != "0"
+
+
+def _httpx_module(client_cls):
+    """Returns the httpx package (httpx or httpx2) client_cls is built on."""
+    for cls in client_cls.__mro__:
+        root = cls.__module__.partition(".")[0]
+        if root in ("httpx", "httpx2"):
+            return importlib.import_module(root)
+    raise TypeError(f"{client_cls.__name__} is not an httpx client class")
+
+
+@functools.cache
+def _counting_transports(module):
+    """Sync and async transport wrappers for an httpx package that report each request to a _Usage."""
+
+    class Stream(module.SyncByteStream):
+        def __init__(self, stream, done):
+            self._stream, self._done = stream, done
+
+        def __iter__(self):
+            yield from self._stream
+
+        def close(self):
+            try:
+                self._stream.close()
+            finally:
+                self._done()
+
+    class AsyncStream(module.AsyncByteStream):
+        def __init__(self, stream, done):
+            self._stream, self._done = stream, done
+
+        async def __aiter__(self):
+            async for chunk in self._stream:
+                yield chunk
+
+        async def aclose(self):
+            try:
+                await self._stream.aclose()
+            finally:
+                self._done()
+
+    def wrap(response, stream_cls, done):
+        return module.Response(response.status_code, headers=response.headers, extensions=response.extensions,
+                               stream=stream_cls(response.stream, done))
+
+    class Transport(module.BaseTransport):
+        def __init__(self, transport, usage):
+            self._transport, self._usage = transport, usage
+
+        def handle_request(self, request):
+            done = self._usage.start()
+            try:
+                return wrap(self._transport.handle_request(request), Stream, done)
+            except BaseException:
+                done()
+                raise
+
+        def close(self):
+            self._transport.close()
+
+    class AsyncTransport(module.AsyncBaseTransport):
+        def __init__(self, transport, usage):
+            self._transport, self._usage = transport, usage
+
+        async def handle_async_request(self, request):
+            done = self._usage.start()
+            try:
+                return wrap(await self._transport.handle_async_request(request), AsyncStream, done)
+            except BaseException:
+                done()
+                raise
+
+        async def aclose(self):
+            await self._transport.aclose()
+
+    return Transport, AsyncTransport
+
+
+class _Usage:
+    """In-flight requests of one client, which use or wait for a connection of its pool."""
+
+    def __init__(self, max_connections):
+        self.max_connections = max_connections
+        self.active = 0
+        self.requests = 0
+        self.saturated = 0
+        self.peak_active = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Counts a request being sent and returns the callback that counts it as done (once)."""
+        with self._lock:
+            self.requests += 1
+            # Every connection is busy, so this request waits unless an HTTP/2 stream is free.
+            if self.active >= self.max_connections:
+                self.saturated += 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        finished = []
+
+        def done():
+            with self._lock:
+                if not finished:
+                    finished.append(True)
+                    self.active -= 1
+        return done
+
+
+def _start_span(provider, request):
+    # Only requests made on behalf of a traced call get a span; the span lasts until the
+    # response headers arrive.
+    if tracer.current() is not None:
+        request.extensions["trace_span"] = tracer.start_span(
+            "http.request", kind="client", provider=provider,
+            **{"http.method": request.method, "http.host": request.url.host})
+
+def _end_span(response):
+    span = response.request.extensions.get("trace_span")
+    if span is not None:
+        span.set(**{"http.status_code": response.status_code})
+        span.end()
+
+
+class HTTPPools:
+    def __init__(self, max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry=KEEPALIVE_EXPIRY, http2=HTTP2):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self._clients = {}
+        self._usage = {}
+        self._lock = threading.Lock()
+
+    def client(self, provider, client_cls):
+        """
+        Returns the shared client_cls instance for a provider, e.g.
+        client("openai", openai.DefaultAsyncHttpxClient). Async clients are bound to the
+        event loop that first uses them, which is the background loop for every caller here.
+        """
+        key = (provider, client_cls)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = self._build(provider, client_cls)
+            return self._clients[key]
+
+    def _build(self, provider, client_cls):
+        # Callers hold self._lock.
+        module = _httpx_module(client_cls)
+        limits = module.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        is_async = issubclass(client_cls, module.AsyncClient)
+        transport = (module.AsyncHTTPTransport if is_async else module.HTTPTransport)(http2=self.http2, limits=limits)
+        usage = _Usage(self.max_connections)
+        self._usage.setdefault(provider, []).append(usage)
+        counting = _counting_transports(module)[1 if is_async else 0](transport, usage)
+
+        async def astart(request):
+            _start_span(provider, request)
+
+        async def aend(response):
+            _end_span(response)
+
+        return client_cls(transport=counting, event_hooks={
+            "request": [astart if is_async else functools.partial(_start_span, provider)],
+            "response": [aend if is_async else _end_span],
+        })
+
+    def stats(self):
+        """Per provider: requests sent, how many found the pool saturated, and current connection usage."""
+        with self._lock:
+            result = {}
+            for provider, usages in self._usage.items():
+                active = sum(usage.active for usage in usages)
+                capacity = self.max_connections * len(usages)
+                result[provider] = {
+                    "requests": sum(usage.requests for usage in usages),
+                    "saturated": sum(usage.saturated for usage in usages),
+                    "active_requests": active,
+                    "peak_active_requests": max(usage.peak_active for usage in usages),
+                    "max_connections": capacity,
+                    # HTTP/2 multiplexes requests over fewer connections than are in use here.
+                    "utilization": round(min(active / capacity, 1.0), 4),
+                }
+            return result
+
+
+pools = HTTPPools()
@@ -0,0 +1,272 @@
+"""
+SQLite-backed job queue with an in-process worker pool.
+
+Long-running generations are submitted as jobs and polled for their result instead of
+holding a web worker for the whole call. Jobs live in a local SQLite file, so several
+gunicorn processes can share one queue without an external broker: every process runs
+its own worker threads, and a job is claimed by exactly one of them with a single
+UPDATE ... RETURNING statement. Higher priority jobs are claimed first, queued jobs can
+be cancelled, and finished jobs are evicted once their result TTL has passed.
+
+A claimed job holds a lease that its worker renews while the job runs. A job whose lease
+has run out belongs to a worker that died (or a process that crashed and came back with
+the same pid, as PID 1 does in a container) and is put back in the queue.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    service TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    claim_id TEXT,
+    lease_expires_at REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, created_at);
+CREATE INDEX IF NOT EXISTS jobs_expiry ON jobs (expires_at);
+"""
+# Columns added after the first release, for queue files created before them.
+MIGRATIONS = {"claim_id": "TEXT", "lease_expires_at": "REAL"}
+PURGE_INTERVAL = 60
+
+
+def _timestamp(value):
+    return datetime.fromtimestamp(value, timezone.utc).isoformat() if value is not None else None
+
+
+class JobQueue:
+    def __init__(self, path, handlers, workers=2, result_ttl=3600, poll_interval=1.0, lease=60.0,
+                 clock=time.time):
+        """
+        handlers maps a service name to a callable taking the job payload as keyword
+        arguments and returning a JSON-serializable result. A running job's lease lasts
+        lease seconds and is renewed every lease / 3 seconds.
+        """
+        self.path = path
+        self.handlers = handlers
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.clock = clock
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._started_pid = None
+        self._start_lock = threading.Lock()
+        self._last_purge = 0.0
+        self._last_requeue = 0.0
+
+    @classmethod
+    def from_env(cls, default_path, handlers):
+        """JOBS_DB_PATH, JOBS_WORKERS (per process), JOBS_RESULT_TTL, JOBS_POLL_INTERVAL and JOBS_LEASE in seconds."""
+        return cls(
+            os.environ.get("JOBS_DB_PATH", default_path),
+            handlers,
+            workers=int(os.environ.get("JOBS_WORKERS", "2")),
+            result_ttl=float(os.environ.get("JOBS_RESULT_TTL", "3600")),
+            poll_interval=float(os.environ.get("JOBS_POLL_INTERVAL", "1")),
+            lease=float(os.environ.get("JOBS_LEASE", "60")),
+        )
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads, so each thread opens its own.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in MIGRATIONS.items():
+                if column not in columns:
+                    try:
+                        conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+                    except sqlite3.OperationalError:
+                        pass  # added by another process meanwhile
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _to_dict(self, row):
+        return {
+            "id": row["id"],
+            "service": row["service"],
+            "status": row["status"],
+            "priority": row["priority"],
+            "created_at": _timestamp(row["created_at"]),
+            "started_at": _timestamp(row["started_at"]),
+            "finished_at": _timestamp(row["finished_at"]),
+            "result": json.loads(row["result"]) if row["result"] is not None else None,
+            "error": row["error"],
+        }
+
+    def submit(self, user_id, service, payload, priority=0):
+        """Queues a job and returns it; raises KeyError for an unknown service."""
+        if service not in self.handlers:
+            raise KeyError(service)
+        job_id = uuid.uuid4().hex
+        self._connection().execute(
+            "INSERT INTO jobs (id, user_id, service, payload, priority, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, user_id, service, json.dumps(payload), priority, self.clock()),
+        )
+        self.ensure_started()
+        self._wakeup.set()
+        return self.get(job_id, user_id)
+
+    def get(self, job_id, user_id):
+        """Returns the user's job, or None if it does not exist, belongs to someone else or has expired."""
+        row = self._connection().execute(
+            "SELECT * FROM jobs WHERE id = ? AND user_id = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (job_id, user_id, self.clock()),
+        ).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def cancel(self, job_id, user_id):
+        """
+        Cancels a queued job right away. A running job cannot be interrupted; it is marked
+        so that its result is discarded and it ends as cancelled. Returns the job or None.
+        """
+        now = self.clock()
+        conn = self._connection()
+        conn.execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ?, expires_at = ? "
+            "WHERE id = ? AND user_id = ? AND status = 'queued'",
+            (now, now + self.result_ttl, job_id, user_id),
+        )
+        conn.execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND user_id = ? AND status = 'running'",
+            (job_id, user_id),
+        )
+        return self.get(job_id, user_id)
+
+    def _claim(self):
+        # Every claim gets its own id, so a worker whose lease ran out cannot renew or
+        # finish the job once another worker has claimed it again.
+        now = self.clock()
+        return self._connection().execute(
+            "UPDATE jobs SET status = 'running', started_at = ?, claim_id = ?, lease_expires_at = ? WHERE id = ("
+            "  SELECT id FROM jobs WHERE status = 'queued' ORDER BY priority DESC, created_at LIMIT 1"
+            ") AND status = 'queued' RETURNING id, service, payload, claim_id",
+            (now, uuid.uuid4().hex, now + self.lease),
+        ).fetchone()
+
+    def renew(self, job_id, claim_id):
+        """Extends the lease of a claimed job. Returns False if the claim has been lost."""
+        return self._connection().execute(
+            "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND claim_id = ? AND status = 'running'",
+            (self.clock() + self.lease, job_id, claim_id),
+        ).rowcount == 1
+
+    def _heartbeat(self, job, finished):
+        while not finished.wait(self.lease / 3):
+            try:
+                if not self.renew(job["id"], job["claim_id"]):
+                    return
+            except sqlite3.Error as e:
+                print(f"Job queue error: {e}")
+
+    def work_once(self):
+        """Claims and runs the next queued job. Returns False when the queue is empty."""
+        job = self._claim()
+        if job is None:
+            return False
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, finished), name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        result, error = None, None
+        try:
+            result = json.dumps(self.handlers[job["service"]](**json.loads(job["payload"])))
+        except Exception as e:
+            print(f"Error running job {job['id']} ({job['service']}): {e}")
+            error = str(e)
+        finally:
+            finished.set()
+            heartbeat.join()
+        now = self.clock()
+        self._connection().execute(
+            "UPDATE jobs SET status = CASE WHEN cancel_requested THEN 'cancelled' WHEN ? IS NULL THEN 'succeeded' "
+            "ELSE 'failed' END, result = CASE WHEN cancel_requested THEN NULL ELSE ? END, error = ?, "
+            "finished_at = ?, expires_at = ?, lease_expires_at = NULL WHERE id = ? AND claim_id = ?",
+            (error, result, error, now, now + self.result_ttl, job["id"], job["claim_id"]),
+        )
+        return True
+
+    def purge_expired(self):
+        """Deletes finished jobs whose result TTL has passed and returns how many were removed."""
+        self._last_purge = self.clock()
+        return self._connection().execute(
+            "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (self.clock(),)
+        ).rowcount
+
+    def requeue_orphans(self):
+        """Puts running jobs whose lease has expired back in the queue and returns how many there were."""
+        self._last_requeue = self.clock()
+        # Jobs claimed before leases existed have none; their workers are long gone.
+        return self._connection().execute(
+            "UPDATE jobs SET status = 'queued', claim_id = NULL, started_at = NULL, lease_expires_at = NULL "
+            "WHERE status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at <= ?)",
+            (self.clock(),),
+        ).rowcount
+
+    def _run_worker(self):
+        while not self._stopping.is_set():
+            try:
+                if self.clock() - self._last_purge > PURGE_INTERVAL:
+                    self.purge_expired()
+                if self.clock() - self._last_requeue > self.lease:
+                    self.requeue_orphans()
+                if self.work_once():
+                    continue
+            except sqlite3.Error as e:
+                print(f"Job queue error: {e}")
+            # Jobs submitted by other processes are picked up on the next poll.
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def ensure_started(self):
+        """Starts the worker threads of this process on first use (again after a fork)."""
+        if self.workers <= 0 or self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self.requeue_orphans()
+            self._stopping.clear()
+            self._threads = [
+                threading.Thread(target=self._run_worker, name=f"job-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._started_pid = os.getpid()
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._started_pid = None
+
+    def stats(self):
+        rows = self._connection().execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")
+        return {row["status"]: row["count"] for row in rows}
@@ -78,6 +78,70 @@ export const aiService = {
   getClaudeCoding: (prompt: string) => apiClient.post('/anthropic/coding', { prompt }),
 };
 
+// Streams an assistant endpoint (e.g. '/legal/assistance') as server-sent events.
+// onToken receives each chunk as soon as it arrives; the promise resolves with the full message.
+export const streamAssistance = async (
+  path: string,
+  body: Record<string, unknown>,
+  onToken: (token: string) => void,
+  signal?: AbortSignal,
+): Promise<string> => {
+  const headers: Record<string, string> = {
+    'Content-Type': 'application/json',
+    Accept: 'text/event-stream',
+  };
+  const apiKey = apiClient.defaults.headers.common['X-API-Key'];
+  if (apiKey) {
+    headers['X-API-Key'] = String(apiKey);
+  }
+
+  const response = await fetch(`${API_BASE_URL}${path}?stream=1`, {
+    method: 'POST',
+    headers,
+    body: JSON.stringify(body),
+    signal,
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Streaming request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  let message = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) {
+      return message;
+    }
+    buffer += value;
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let eventType = 'message';
+      let data = '';
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event:')) {
+          eventType = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+          data += line.slice(5).trim();
+        }
+      }
+      if (eventType === 'done') {
+        await reader.cancel();
+        return message;
+      }
+      if (data) {
+        const { token } = JSON.parse(data) as { token: string };
+        message += token;
+        onToken(token);
+      }
+    }
+  }
+};
+
 export const userService = {
   register: (username: string) => apiClient.post('/register_public', { username }),
   login: (api_key: string) => apiClient.post('/login', { api_key }),
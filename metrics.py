@@ -0,0 +1,197 @@
+"""
+Prometheus metrics for the API and its LLM calls.
+
+Observations on the hot path take no lock: every thread counts into its own shard (a
+plain dict), and the shards are only merged when /metrics is scraped. Values other
+modules already keep, such as cache hit ratios, pool usage and breaker states, are read
+by collectors at scrape time, so they cost nothing between scrapes.
+
+The output is the Prometheus text exposition format (version 0.0.4).
+"""
+import bisect
+import math
+import threading
+
+# Seconds. Request and LLM latencies range from milliseconds to minutes.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Seconds. A single indexed lookup should land in the first few buckets.
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=""):
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, registry, name, help, labels=()):
+        self._registry = registry
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    def inc(self, labels=(), amount=1):
+        """labels is a tuple of values in the order of the metric's label names."""
+        shard = self._registry.shard()
+        key = (self, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def _merge(self, total, value):
+        return (total or 0) + value
+
+    def _render(self, labels, value):
+        yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, registry, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self._registry = registry
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, labels=()):
+        shard = self._registry.shard()
+        key = (self, labels)
+        cell = shard.get(key)
+        if cell is None:
+            # One count per bucket plus +Inf, then the sum.
+            cell = shard[key] = [0] * (len(self.buckets) + 2)
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def _merge(self, total, cell):
+        if total is None:
+            return list(cell)
+        return [a + b for a, b in zip(total, cell)]
+
+    def _render(self, labels, cell):
+        seen = 0
+        for bound, count in zip(self.buckets + (math.inf,), cell):
+            seen += count
+            le = 'le="' + _number(float(bound)) + '"'
+            yield f"{self.name}_bucket{_labels(self.labels, labels, le)} {seen}"
+        yield f"{self.name}_sum{_labels(self.labels, labels)} {_number(cell[-1])}"
+        yield f"{self.name}_count{_labels(self.labels, labels)} {seen}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        # (thread, shard) pairs; shards of finished threads are folded into _retired on scrape.
+        self._shards = []
+        self._retired = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def shard(self):
+        """The calling thread's own counters."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def counter(self, name, help, labels=()):
+        metric = Counter(self, name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(self, name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """
+        Registers fn, called on every scrape. It returns (name, type, help, samples) tuples,
+        samples being a list of ({label: value}, number) pairs. Usable as a decorator.
+        """
+        self._collectors.append(fn)
+        return fn
+
+    def _merged(self):
+        totals = {}
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    for key, value in shard.items():
+                        self._retired[key] = key[0]._merge(self._retired.get(key), value)
+            self._shards = live
+            shards = [self._retired] + [shard for _, shard in live]
+        for shard in shards:
+            # dict.copy() is atomic, so the owning thread may keep counting meanwhile.
+            for key, value in shard.copy().items():
+                totals[key] = key[0]._merge(totals.get(key), value)
+        return totals
+
+    def render(self):
+        totals = self._merged()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for (owner, labels), value in sorted(totals.items(), key=lambda item: item[0][1]):
+                if owner is metric:
+                    lines.extend(metric._render(labels, value))
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, type, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels.keys(), labels.values())} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        """Resets every counter and histogram (collectors keep reading their sources)."""
+        with self._lock:
+            self._retired.clear()
+            for _, shard in self._shards:
+                shard.clear()
+
+
+registry = Registry()
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "Time to handle a request, until the response headers are ready.",
+    ("method", "route", "status"))
+llm_request_seconds = registry.histogram(
+    "llm_request_duration_seconds", "Duration of LLM provider calls, failed attempts included.",
+    ("provider", "outcome"))
+llm_errors = registry.counter(
+    "llm_errors_total", "Failed LLM provider calls by exception type.", ("provider", "error"))
+llm_tokens = registry.counter(
+    "llm_tokens_total", "Tokens sent to (in) and generated by (out) LLM providers.", ("provider", "direction"))
+auth_db_seconds = registry.histogram(
+    "auth_db_query_duration_seconds", "Database lookups of API keys that missed the auth cache.",
+    buckets=DB_BUCKETS)
@@ -0,0 +1,138 @@
+"""
+Opt-in sampling profiler for production workers.
+
+With PROFILER=1 a daemon thread wakes PROFILER_HZ times a second, reads the Python stack
+of every other thread (sys._current_frames) and counts each stack in collapsed form,
+root first: "thread;module.function;...;leaf count". That is the input format of
+flamegraph.pl, speedscope and most other flame graph viewers. Threads parked in a
+lock, queue or socket wait are left out unless asked for, so the counts show where the
+workers spend their CPU time (HTML parsing, chain construction, template rendering...).
+
+At the default 19 Hz (prime, so it does not line up with periodic work) a sample costs
+well under a millisecond, so the profiler can stay on under real load.
+"""
+import os
+import re
+import sys
+import threading
+import time
+
+# Leaf frames of threads that are waiting rather than working, as (file name, function).
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+    ("socketserver.py", "serve_forever"),
+    ("base_events.py", "_run_once"),
+}
+TRUNCATED = "[truncated]"
+
+
+class SamplingProfiler:
+    def __init__(self, enabled=False, hz=19, max_stacks=10000, max_depth=128):
+        self.enabled = enabled
+        self.interval = 1.0 / hz
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self._stacks = {}
+        self._labels = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self.started_at = None
+
+    @classmethod
+    def from_env(cls):
+        """PROFILER=1 enables it (see ensure_started); PROFILER_HZ sets the sampling rate."""
+        return cls(enabled=os.environ.get("PROFILER", "0") == "1", hz=float(os.environ.get("PROFILER_HZ", "19")))
+
+    def ensure_started(self):
+        """Starts the sampling thread in this process if the profiler is enabled. Cheap to call per request."""
+        if not self.enabled or (self._pid == os.getpid() and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._pid = os.getpid()
+            self.started_at = time.time()
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(exclude=own)
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            label = self._labels[code] = f"{module}.{code.co_qualname}"
+        return label
+
+    def sample(self, exclude=None):
+        """Takes one sample of every thread but `exclude` (a thread ident)."""
+        started = time.perf_counter()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        collapsed = []
+        for ident, frame in sys._current_frames().items():
+            if ident == exclude:
+                continue
+            code = frame.f_code
+            idle = (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES
+            frames = []
+            while frame is not None and len(frames) < self.max_depth:
+                frames.append(self._label(frame.f_code))
+                frame = frame.f_back
+            # Numbered pool threads ("Thread-12 (process_request_thread)") are merged into one root.
+            frames.append(re.sub(r"\d+", "N", names.get(ident, "thread")))
+            collapsed.append((";".join(reversed(frames)), idle))
+        with self._lock:
+            for stack, idle in collapsed:
+                key = (stack, idle)
+                if key not in self._stacks and len(self._stacks) >= self.max_stacks:
+                    key = (TRUNCATED, idle)
+                self._stacks[key] = self._stacks.get(key, 0) + 1
+            self.samples += 1
+            self.sampling_seconds += time.perf_counter() - started
+
+    def collapsed(self, include_idle=False):
+        """The counted stacks in collapsed-stack format, heaviest first."""
+        totals = {}
+        with self._lock:
+            for (stack, idle), count in self._stacks.items():
+                if include_idle or not idle:
+                    totals[stack] = totals.get(stack, 0) + count
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(totals.items(), key=lambda item: -item[1]))
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+            self.sampling_seconds = 0.0
+            self.started_at = time.time() if self._thread is not None and self._thread.is_alive() else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "running": self._thread is not None and self._thread.is_alive() and self._pid == os.getpid(),
+                "samples": self.samples,
+                "stacks": len(self._stacks),
+                "seconds": round(time.time() - self.started_at, 3) if self.started_at else 0.0,
+                "sampling_ms_per_sample": round(self.sampling_seconds / self.samples * 1000, 3) if self.samples else 0.0,
+            }
+
+
+profiler = SamplingProfiler.from_env()
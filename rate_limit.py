@@ -0,0 +1,124 @@
+"""
+Token-bucket rate limiting per API user.
+
+Every authenticated request takes one token from the user's bucket, and requests that
+do the work of several (a batch) take one per item. Buckets hold up to the plan's
+per-minute limit and refill continuously at that rate, so a client can burst up to its
+limit and is then held to the steady rate. A check is a single dict update
+(memory backend) or a single upsert (SQLite backend), whatever the number of users.
+
+The memory backend is per process. With several gunicorn workers on one host, set
+RATE_LIMIT_BACKEND=sqlite so that all workers draw from the same buckets.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_LIMITS = {'free': 60, 'premium': 300, 'pro': 1200}
+
+
+class MemoryBackend:
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now, cost=1):
+        """Takes cost tokens if that many are available (none otherwise). Returns (allowed, tokens left)."""
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            return allowed, tokens
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBackend:
+    """Buckets in a SQLite file shared by every worker process on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, allowed INTEGER NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, capacity, rate, now, cost=1):
+        # Refill and take happen in one statement, so concurrent workers cannot both spend the last tokens.
+        tokens, allowed = self._connection().execute(
+            "INSERT INTO rate_limits (key, tokens, updated_at, allowed) "
+            "VALUES (:key, :capacity - :cost * (:capacity >= :cost), :now, :capacity >= :cost) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "allowed = MIN(:capacity, tokens + (:now - updated_at) * :rate) >= :cost, "
+            "tokens = MIN(:capacity, tokens + (:now - updated_at) * :rate) "
+            "  - :cost * (MIN(:capacity, tokens + (:now - updated_at) * :rate) >= :cost), "
+            "updated_at = :now "
+            "RETURNING tokens, allowed",
+            {"key": str(key), "capacity": capacity, "rate": rate, "now": now, "cost": cost},
+        ).fetchone()
+        return bool(allowed), tokens
+
+    def clear(self):
+        self._connection().execute("DELETE FROM rate_limits")
+
+
+class RateLimiter:
+    def __init__(self, limits=DEFAULT_LIMITS, backend=None, clock=time.time):
+        """limits maps a plan to its requests per minute; 0 means unlimited."""
+        self.limits = limits
+        self.backend = backend or MemoryBackend()
+        self.clock = clock
+
+    @classmethod
+    def from_env(cls, default_db_path):
+        """
+        RATE_LIMIT_FREE, RATE_LIMIT_PREMIUM and RATE_LIMIT_PRO in requests per minute,
+        RATE_LIMIT_BACKEND (memory or sqlite) and RATE_LIMIT_DB_PATH for the sqlite backend.
+        """
+        limits = {plan: int(os.environ.get(f"RATE_LIMIT_{plan.upper()}", limit)) for plan, limit in DEFAULT_LIMITS.items()}
+        backend = None
+        if os.environ.get("RATE_LIMIT_BACKEND", "memory") == "sqlite":
+            backend = SQLiteBackend(os.environ.get("RATE_LIMIT_DB_PATH", default_db_path))
+        return cls(limits, backend)
+
+    def limit(self, plan):
+        return self.limits.get(plan, self.limits['free'])
+
+    def check(self, key, plan, cost=1):
+        """
+        Spends cost requests from key's bucket, all or none. Returns (allowed, remaining,
+        retry_after) where retry_after is the number of whole seconds until enough tokens
+        are back, 0 when allowed, or None when cost is more than the plan's limit and can
+        never be allowed.
+        """
+        capacity = self.limit(plan)
+        if capacity <= 0:
+            return True, None, 0
+        rate = capacity / 60
+        allowed, tokens = self.backend.take(key, capacity, rate, self.clock(), cost)
+        if allowed:
+            return True, int(tokens), 0
+        if cost > capacity:
+            return False, int(tokens), None
+        return False, int(tokens), max(1, math.ceil((cost - tokens) / rate))
+
+    def clear(self):
+        self.backend.clear()
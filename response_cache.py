@@ -0,0 +1,186 @@
+"""
+Two-tier cache for LLM service responses.
+
+The exact tier is an LRU keyed by (service, model, normalized inputs) with a TTL; see
+normalize() for the differences it ignores.
+The optional semantic tier embeds single-prompt inputs locally and returns a cached
+answer for a near-duplicate prompt whose cosine similarity reaches a threshold.
+"""
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+EMBEDDING_DIMENSIONS = 256
+
+
+def normalize(text):
+    """
+    Collapses runs of spaces within lines and drops trailing spaces and outer blank lines,
+    so trivially different spellings of a prompt share an entry. Line breaks and
+    indentation are kept: prompts often contain code, where they change the meaning.
+    """
+    lines = []
+    for line in str(text).splitlines():
+        words = line.split()
+        indent = line[:len(line) - len(line.lstrip())]
+        lines.append(indent + " ".join(words) if words else "")
+    return "\n".join(lines).strip("\n")
+
+
+def hashed_ngram_embedding(text, dimensions=EMBEDDING_DIMENSIONS):
+    """
+    Cheap local embedding: character trigrams hashed into a fixed-size, L2-normalized vector.
+
+    Good enough to catch reworded or re-punctuated repeats of the same prompt without
+    an embedding model or a network call.
+    """
+    text = " ".join(str(text).split()).casefold()
+    vector = [0.0] * dimensions
+    padded = f"  {text}  "
+    for i in range(len(padded) - 2):
+        digest = hashlib.blake2b(padded[i:i + 3].encode(), digest_size=4).digest()
+        vector[int.from_bytes(digest, "little") % dimensions] += 1.0
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else vector
+
+
+class ResponseCache:
+    def __init__(self, max_entries=1024, ttl=600, semantic_threshold=None, semantic_max_entries=256,
+                 embed=hashed_ngram_embedding, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_entries = semantic_max_entries
+        self.embed = embed
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._semantic = {}
+        self._lock = threading.Lock()
+        self.hits = Counter()
+        self.semantic_hits = Counter()
+        self.misses = Counter()
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        LLM_CACHE_MAX_ENTRIES (0 disables caching), LLM_CACHE_TTL in seconds and
+        LLM_SEMANTIC_CACHE_THRESHOLD (cosine similarity, unset disables the semantic tier).
+        """
+        threshold = os.environ.get("LLM_SEMANTIC_CACHE_THRESHOLD")
+        return cls(
+            max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "1024")),
+            ttl=float(os.environ.get("LLM_CACHE_TTL", "600")),
+            semantic_threshold=float(threshold) if threshold else None,
+        )
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def _key(self, service, model, inputs):
+        return (service, model, tuple(sorted((name, normalize(value)) for name, value in inputs.items())))
+
+    def get(self, service, model, inputs):
+        """Returns the cached response for these inputs, or None on a miss."""
+        key = self._key(service, model, inputs)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits[service] += 1
+                return entry[1]
+            if entry is not None:
+                self._remove(key)
+        if self.semantic_threshold is not None and len(inputs) == 1:
+            value = self._semantic_get(service, model, next(iter(inputs.values())), now)
+            if value is not None:
+                return value
+        with self._lock:
+            self.misses[service] += 1
+        return None
+
+    def put(self, service, model, inputs, value):
+        if not self.enabled:
+            return
+        key = self._key(service, model, inputs)
+        vector = None
+        if self.semantic_threshold is not None and len(inputs) == 1:
+            vector = self.embed(next(iter(inputs.values())))
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            if vector is not None:
+                bucket = self._semantic.setdefault((service, model), OrderedDict())
+                bucket[key] = vector
+                while len(bucket) > self.semantic_max_entries:
+                    bucket.popitem(last=False)
+
+    def _semantic_get(self, service, model, text, now):
+        vector = self.embed(text)
+        with self._lock:
+            bucket = self._semantic.get((service, model))
+            if not bucket:
+                return None
+            best_key, best_score = None, self.semantic_threshold
+            for key, candidate in bucket.items():
+                score = sum(a * b for a, b in zip(vector, candidate))
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                return None
+            entry = self._entries.get(best_key)
+            if entry is None or entry[0] <= now:
+                self._remove(best_key)
+                return None
+            self._entries.move_to_end(best_key)
+            self.semantic_hits[service] += 1
+            return entry[1]
+
+    def _remove(self, key):
+        # Callers hold self._lock.
+        self._entries.pop(key, None)
+        bucket = self._semantic.get((key[0], key[1]))
+        if bucket is not None:
+            bucket.pop(key, None)
+
+    def clear(self):
+        """Drops every entry and resets the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._semantic.clear()
+            self.hits.clear()
+            self.semantic_hits.clear()
+            self.misses.clear()
+            self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            hits = sum(self.hits.values())
+            semantic_hits = sum(self.semantic_hits.values())
+            misses = sum(self.misses.values())
+            lookups = hits + semantic_hits + misses
+            return {
+                "entries": len(self._entries),
+                "hits": hits,
+                "semantic_hits": semantic_hits,
+                "misses": misses,
+                "evictions": self.evictions,
+                "hit_ratio": round((hits + semantic_hits) / lookups, 4) if lookups else 0.0,
+                "per_service": {
+                    service: {
+                        "hits": self.hits[service],
+                        "semantic_hits": self.semantic_hits[service],
+                        "misses": self.misses[service],
+                    }
+                    for service in set(self.hits) | set(self.semantic_hits) | set(self.misses)
+                },
+            }
@@ -0,0 +1,258 @@
+"""
+Provider health tracking and failover for LLM calls.
+
+Every provider (vertex, openai, anthropic, nvidia) has a circuit breaker:
+
+* closed: calls go through; LLM_BREAKER_FAILURES consecutive failures open it.
+* open: calls are refused immediately for LLM_BREAKER_RECOVERY seconds.
+* half-open: after that, one probe call is let through. Success closes the breaker
+  again, and failure re-opens it for another recovery period.
+
+A call for a model is routed along its fallback chain (LLM_FALLBACKS). Providers with an
+open breaker are skipped, and providers with a poor health score (a moving average of
+success rate and latency) are tried last. When nothing can be tried, the call fails
+right away instead of waiting on a provider that is known to be down.
+"""
+import os
+import threading
+import time
+
+import metrics
+from governor import PROVIDER_GROUPS
+from tracing import tracer
+
+DEFAULT_FALLBACKS = "vertex:gemini-1.5-flash>anthropic:claude-3-5-sonnet-20240620>nvidia:meta/llama-3.1-405b-instruct"
+# Weight of the latest call in the moving averages.
+EWMA_ALPHA = 0.2
+# Providers scoring below this are tried after the healthy ones.
+HEALTH_FLOOR = 0.25
+
+
+class ProviderUnavailable(Exception):
+    """Raised when every provider that could serve a call has an open circuit breaker."""
+
+
+def parse_fallbacks(spec):
+    """
+    Parses "provider:model>provider:model>...;..." into {first model: [fallback models]}.
+    Every model is a (provider, model_name) tuple.
+    """
+    chains = {}
+    for chain in filter(None, (part.strip() for part in spec.split(";"))):
+        models = [tuple(step.strip().split(":", 1)) for step in chain.split(">")]
+        chains[models[0]] = models[1:]
+    return chains
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, recovery_time=30, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.clock = clock
+        self.failures = 0
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == "open" and self.clock() - self._opened_at >= self.recovery_time:
+                return "half_open"
+            return self._state
+
+    def allow(self):
+        """Returns True if a call may go through now. In half-open state only one probe at a time is allowed."""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open" and self.clock() - self._opened_at < self.recovery_time:
+                return False
+            if self._probing:
+                return False
+            self._state = "half_open"
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._state == "half_open" or self.failures >= self.failure_threshold:
+                self._state = "open"
+                self._opened_at = self.clock()
+            self._probing = False
+
+    def release(self):
+        """Ends an allowed call without a verdict (e.g. it was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+
+class ProviderHealth:
+    def __init__(self, latency_target):
+        self.latency_target = latency_target
+        self.success_rate = 1.0
+        self.latency = None
+
+    def record(self, ok, latency=None):
+        self.success_rate += EWMA_ALPHA * ((1.0 if ok else 0.0) - self.success_rate)
+        if ok:
+            self.latency = latency if self.latency is None else self.latency + EWMA_ALPHA * (latency - self.latency)
+
+    @property
+    def score(self):
+        """1.0 for a provider that always answers within the latency target, towards 0 as it fails or slows down."""
+        if self.latency is None or self.latency <= self.latency_target:
+            return self.success_rate
+        return self.success_rate * self.latency_target / self.latency
+
+
+class ModelRouter:
+    def __init__(self, fallbacks=None, failure_threshold=5, recovery_time=30, latency_target=10,
+                 clock=time.monotonic):
+        self.fallbacks = fallbacks if fallbacks is not None else parse_fallbacks(DEFAULT_FALLBACKS)
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.latency_target = latency_target
+        self.clock = clock
+        self._breakers = {}
+        self._health = {}
+        self._lock = threading.Lock()
+        self.reroutes = 0
+
+    @classmethod
+    def from_env(cls):
+        """LLM_FALLBACKS, LLM_BREAKER_FAILURES, LLM_BREAKER_RECOVERY and LLM_LATENCY_TARGET (seconds)."""
+        return cls(
+            fallbacks=parse_fallbacks(os.environ.get("LLM_FALLBACKS", DEFAULT_FALLBACKS)),
+            failure_threshold=int(os.environ.get("LLM_BREAKER_FAILURES", "5")),
+            recovery_time=float(os.environ.get("LLM_BREAKER_RECOVERY", "30")),
+            latency_target=float(os.environ.get("LLM_LATENCY_TARGET", "10")),
+        )
+
+    def _group(self, provider):
+        return PROVIDER_GROUPS.get(provider, provider)
+
+    def breaker(self, provider):
+        group = self._group(provider)
+        with self._lock:
+            if group not in self._breakers:
+                self._breakers[group] = CircuitBreaker(self.failure_threshold, self.recovery_time, self.clock)
+                self._health[group] = ProviderHealth(self.latency_target)
+            return self._breakers[group]
+
+    def health(self, provider):
+        self.breaker(provider)
+        return self._health[self._group(provider)]
+
+    def plan(self, model, fallbacks=True):
+        """The models to try for model, in order: the model itself, then its fallbacks, unhealthy providers last."""
+        chain = [model]
+        if fallbacks:
+            chain += [fallback for fallback in self.fallbacks.get(model, []) if fallback != model]
+        return sorted(chain, key=lambda candidate: self.health(candidate[0]).score < HEALTH_FLOOR)
+
+    def record(self, provider, ok, latency=None, error=None):
+        """Reports an attempt's outcome to the provider's breaker, health score and metrics."""
+        breaker = self.breaker(provider)
+        if ok:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+            metrics.llm_errors.inc((provider, type(error).__name__ if error is not None else "unknown"))
+        if latency is not None:
+            metrics.llm_request_seconds.observe(latency, (provider, "ok" if ok else "error"))
+        with self._lock:
+            self._health[self._group(provider)].record(ok, latency)
+
+    def release(self, provider):
+        """Ends an attempt without a verdict, e.g. when the caller went away."""
+        self.breaker(provider).release()
+
+    def candidates(self, model, fallbacks=True):
+        """
+        Yields the (provider, model_name) pairs to try for model, each one only after its
+        breaker allowed the call; report every attempt with record() or release().
+        Raises ProviderUnavailable when the breakers let nothing through.
+        """
+        tried = False
+        for provider, model_name in self.plan(model, fallbacks):
+            if not self.breaker(provider).allow():
+                continue
+            if (provider, model_name) != model:
+                self.reroutes += 1
+            tried = True
+            yield provider, model_name
+        if not tried:
+            providers = ", ".join(provider for provider, _ in self.plan(model, fallbacks))
+            raise ProviderUnavailable(f"circuit open for {providers}")
+
+    def call(self, model, attempt, fallbacks=True):
+        """
+        Calls attempt(provider, model_name) along model's route and returns the first result.
+        If every attempt fails, the first error is raised again. With fallbacks=False only
+        model itself is tried, behind its breaker.
+        """
+        errors = []
+        for provider, model_name in self.candidates(model, fallbacks):
+            started = self.clock()
+            try:
+                with tracer.span("llm.call", provider=provider, model=model_name):
+                    result = attempt(provider, model_name)
+            except Exception as e:
+                self.record(provider, False, self.clock() - started, e)
+                errors.append(e)
+                continue
+            except BaseException:
+                self.release(provider)
+                raise
+            self.record(provider, True, self.clock() - started)
+            return result
+        raise errors[0]
+
+    async def acall(self, model, attempt, fallbacks=True):
+        """Async variant of call(); attempt returns a coroutine."""
+        errors = []
+        for provider, model_name in self.candidates(model, fallbacks):
+            started = self.clock()
+            try:
+                with tracer.span("llm.call", provider=provider, model=model_name):
+                    result = await attempt(provider, model_name)
+            except Exception as e:
+                self.record(provider, False, self.clock() - started, e)
+                errors.append(e)
+                continue
+            except BaseException:
+                self.release(provider)
+                raise
+            self.record(provider, True, self.clock() - started)
+            return result
+        raise errors[0]
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+            self._health.clear()
+            self.reroutes = 0
+
+    def stats(self):
+        with self._lock:
+            providers = list(self._breakers)
+        result = {}
+        for group in providers:
+            breaker, health = self._breakers[group], self._health[group]
+            result[group] = {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "success_rate": round(health.success_rate, 4),
+                "latency_ms": round(health.latency * 1000) if health.latency is not None else None,
+                "health": round(health.score, 4),
+            }
+        return {"providers": result, "reroutes": self.reroutes}
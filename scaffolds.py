@@ -0,0 +1,118 @@
+"""
+Precompiled project scaffolds for the develop endpoints.
+
+A scaffold is a function that renders a project (a short intro and a few files) from
+a handful of user-supplied fields. Most of its text is static or only depends on the
+locale, so instead of running it per request, Scaffold runs it once per locale with a
+marker in place of every field and splits the output into static parts around the
+markers. A request then only joins the cached parts with its own field values, which
+gives the same text as calling the function, without rebuilding the template or
+looking up translations.
+"""
+import io
+import re
+
+from flask import has_request_context
+from flask_babel import get_locale
+
+MARKER = re.compile(r"\x00(\w+)\x00")
+LANGUAGES = {".html": "html", ".css": "css", ".js": "javascript", ".py": "python"}
+# Fixed timestamps keep the bundle bytes identical for identical files.
+ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def _split(text):
+    """Static parts and field names, alternating: [static, field, static, ..., static]."""
+    return MARKER.split(text)
+
+
+def _join(parts, values):
+    return "".join(values[part] if i % 2 else part for i, part in enumerate(parts))
+
+
+def parse_fields(prompt, names):
+    """Values of "key: value" prompt lines whose key is one of names (the last one wins)."""
+    fields = {}
+    for line in prompt.splitlines():
+        if ':' in line:
+            key, value = line.split(':', 1)
+            key = key.strip().lower()
+            if key in names:
+                fields[key] = value.strip()
+    return fields
+
+
+class Scaffold:
+    def __init__(self, render, fields, defaults=None, constants=None):
+        """
+        render(**fields) returns (intro, {file name: content}) and may call _(). It only
+        ever sees markers, so it must insert every field as is. defaults and constants
+        are called once per locale: defaults() gives the values of fields missing from a
+        prompt, constants() anything else the caller wants translated once.
+        """
+        self.render = render
+        self.fields = tuple(fields)
+        self._defaults = defaults or dict
+        self._constants = constants or dict
+        self._compiled = {}
+
+    def _locale(self):
+        return str(get_locale()) if has_request_context() else ""
+
+    def compiled(self):
+        """The cached parts for the current locale, compiling them on first use."""
+        locale = self._locale()
+        compiled = self._compiled.get(locale)
+        if compiled is None:
+            intro, files = self.render(**{name: f"\x00{name}\x00" for name in self.fields})
+            compiled = self._compiled[locale] = {
+                "intro": _split(intro.strip()),
+                "files": {filename: _split(content.strip()) for filename, content in files.items()},
+                "defaults": self._defaults(),
+                "constants": self._constants(),
+            }
+        return compiled
+
+    def defaults(self):
+        return dict(self.compiled()["defaults"])
+
+    def constants(self):
+        return self.compiled()["constants"]
+
+    def values(self, prompt):
+        """Field values from "key: value" prompt lines, with the locale's defaults for the rest."""
+        return {**self.compiled()["defaults"], **parse_fields(prompt, self.fields)}
+
+    def files(self, **values):
+        return {filename: _join(parts, values) for filename, parts in self.compiled()["files"].items()}
+
+    def message(self, **values):
+        """The intro followed by every file in a fenced code block, as the chat UI shows it."""
+        compiled = self.compiled()
+        blocks = [_join(compiled["intro"], values)]
+        for filename, parts in compiled["files"].items():
+            language = LANGUAGES.get(filename[filename.rfind("."):], "")
+            blocks.append(f"**{filename}:**\n```{language}\n{_join(parts, values)}\n```")
+        return "\n".join(blocks)
+
+    def bundle(self, **values):
+        """The files as a zip archive, built in memory."""
+        import zipfile
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for filename, content in self.files(**values).items():
+                info = zipfile.ZipInfo(filename, ZIP_DATE)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                archive.writestr(info, content)
+        return buffer.getvalue()
+
+    def clear(self):
+        self._compiled.clear()
+
+
+def scaffold(*fields, defaults=None, constants=None):
+    """Decorator turning a render function into a Scaffold with the given field names."""
+    def decorate(render):
+        return Scaffold(render, fields, defaults, constants)
+    return decorate
@@ -1,10 +1,42 @@
+import os
+import tempfile
+
 import pytest
-from app import app, db, User
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# The app opens its databases and version files when it is imported, so point it at a
+# throwaway instance folder first: the suite must never touch the developer's data.
+_instance = tempfile.TemporaryDirectory(prefix='test-instance-')
+os.environ['INSTANCE_PATH'] = _instance.name
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_instance.name, 'project.db')
+os.environ['JOBS_DB_PATH'] = os.path.join(_instance.name, 'jobs.db')
+os.environ['RATE_LIMIT_DB_PATH'] = os.path.join(_instance.name, 'rate_limits.db')
+
+import google_ai
+import metrics
+from app import app, db, User, api_key_cache, rate_limiter, stripe_events
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    # Tests swap in fake models under the real model names and recreate the users table, so
+    # cached answers, API keys, rate-limit buckets, breaker states and metrics must not leak
+    # between them.
+    google_ai.response_cache.clear()
+    api_key_cache.clear()
+    rate_limiter.clear()
+    google_ai.model_router.reset()
+    metrics.registry.clear()
+    yield
+    google_ai.response_cache.clear()
+    api_key_cache.clear()
+    rate_limiter.clear()
+    google_ai.model_router.reset()
+    # The webhook applier thread must not apply events recorded by a later test.
+    stripe_events.stop()
 
 @pytest.fixture
 def client():
     app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
 
     with app.app_context():
         db.create_all()
@@ -23,3 +55,19 @@ def client():
 @pytest.fixture
 def auth_headers():
     return {'X-API-Key': 'testkey'}
+
+@pytest.fixture
+def fake_models(monkeypatch):
+    """
+    Installs a ModelRegistry of fake chat models for the test. fake_models(responses,
+    providers=...) answers with responses on each provider; model= swaps in another fake
+    model class, and provider=factory keywords install custom factories (e.g. a broken one).
+    """
+    def install(responses=(), providers=('vertex',), model=FakeListChatModel, **factories):
+        registry = google_ai.ModelRegistry({
+            **{provider: (lambda model_name: model(responses=list(responses))) for provider in providers},
+            **factories,
+        })
+        monkeypatch.setattr(google_ai, 'model_registry', registry)
+        return registry
+    return install
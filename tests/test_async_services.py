@@ -0,0 +1,52 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+import google_ai
+from background_loop import get_event_loop
+
+
+@pytest.fixture
+def fake_registry(fake_models):
+    return fake_models(["[HTML]<p>hi</p>[/HTML][CSS]p {}[/CSS]"])
+
+def test_every_persona_has_native_async_variant():
+    for service in google_ai.PERSONAS:
+        assert getattr(google_ai, service) in google_ai.ASYNC_VARIANTS
+
+def test_acall_uses_native_async_variant(fake_registry):
+    html, css = asyncio.run(google_ai.acall(google_ai.generate_website, "a page"))
+    assert html == "<p>hi</p>"
+    assert css == "p {}"
+
+def test_acall_runs_on_shared_loop(monkeypatch):
+    seen = []
+
+    async def variant(prompt):
+        seen.append(asyncio.get_running_loop())
+        return prompt.upper()
+
+    def service(prompt):
+        raise AssertionError("sync path should not be used")
+
+    monkeypatch.setitem(google_ai.ASYNC_VARIANTS, service, variant)
+    assert asyncio.run(google_ai.acall(service, "hi")) == "HI"
+    assert asyncio.run(google_ai.acall(service, "again")) == "AGAIN"
+    assert seen[0] is seen[1] is get_event_loop()
+
+def test_acall_falls_back_to_worker_thread():
+    def blocking_service(prompt):
+        return threading.current_thread() is threading.main_thread()
+
+    assert asyncio.run(google_ai.acall(blocking_service, "x")) is False
+
+def test_assistant_endpoint_awaits_async_chain(client, auth_headers, fake_models):
+    fake_models([" legal answer "])
+    response = client.post('/api/v1/legal/assistance',
+                           data=json.dumps({'prompt': 'contract review'}),
+                           content_type='application/json',
+                           headers=auth_headers)
+    assert response.status_code == 200
+    assert json.loads(response.data)['message'] == 'legal answer'
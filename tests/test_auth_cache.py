@@ -0,0 +1,90 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+from app import app, db, User, api_key_cache, stripe_events
+from auth_cache import AuthCache, AuthenticatedUser
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def record(user_id=1, plan='free'):
+    return AuthenticatedUser(user_id, 'someone', 'inactive', plan, None)
+
+@pytest.fixture
+def query_count():
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', count)
+
+def test_record_has_no_instance_dict():
+    with pytest.raises(AttributeError):
+        record().extra = True
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = AuthCache(ttl=5, clock=clock)
+    cache.put('key', record())
+    assert cache.get('key').id == 1
+    clock.now = 6
+    assert cache.get('key') is None
+    assert cache.stats() == {'entries': 0, 'hits': 1, 'misses': 1}
+
+def test_invalidate_user_drops_only_their_keys():
+    cache = AuthCache()
+    cache.put('a', record(1))
+    cache.put('b', record(2))
+    cache.invalidate_user(1)
+    assert cache.get('a') is None
+    assert cache.get('b').id == 2
+
+def test_cache_is_size_bounded():
+    cache = AuthCache(max_entries=2)
+    for i in range(3):
+        cache.put(f'key{i}', record(i))
+    assert cache.get('key0') is None
+    assert cache.stats()['entries'] == 2
+
+def test_repeat_requests_skip_the_database(client, auth_headers, query_count):
+    assert client.get('/api/v1/me_api', headers=auth_headers).status_code == 200
+    queries_after_first = len(query_count)
+    response = client.get('/api/v1/me_api', headers=auth_headers)
+    assert response.json['username'] == 'testuser'
+    assert len(query_count) == queries_after_first
+
+def test_invalid_key_is_rejected_and_not_cached(client):
+    response = client.get('/api/v1/me_api', headers={'X-API-Key': 'nope'})
+    assert response.status_code == 401
+    assert api_key_cache.stats()['entries'] == 0
+
+def test_webhook_invalidates_cached_subscription(client, auth_headers, monkeypatch):
+    assert client.get('/api/v1/me_api', headers=auth_headers).json['subscription_plan'] == 'free'
+    with app.app_context():
+        user_id = User.query.filter_by(username='testuser').first().id
+    monkeypatch.setenv('STRIPE_WEBHOOK_SECRET', 'whsec_test')
+    checkout_event = {
+        'id': 'evt_checkout',
+        'created': 1,
+        'type': 'checkout.session.completed',
+        'data': {'object': {'client_reference_id': str(user_id), 'customer': 'cus_1', 'metadata': {'plan': 'pro'}}},
+    }
+    with patch('stripe.Webhook.construct_event', return_value=checkout_event):
+        assert client.post('/api/v1/payment/webhook', data=json.dumps(checkout_event)).status_code == 200
+    stripe_events.drain()
+    data = client.get('/api/v1/me_api', headers=auth_headers).json
+    assert (data['subscription_status'], data['subscription_plan']) == ('active', 'pro')
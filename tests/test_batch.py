@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import pytest
+
+import google_ai
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.data.decode().splitlines()]
+
+@pytest.fixture
+def fake_registry(fake_models):
+    return fake_models(["  batch answer  "])
+
+def test_batch_streams_every_item_with_its_index(client, auth_headers, fake_registry):
+    items = [
+        {'service': 'provide_legal_assistance', 'prompt': 'contract'},
+        {'service': 'translate_text', 'prompt': 'hello', 'target_language': 'French'},
+        {'service': 'generate_social_media_post', 'prompt': 'launch day'},
+    ]
+    response = client.post('/api/v1/batch', json={'items': items}, headers=auth_headers)
+    assert response.mimetype == 'application/x-ndjson'
+    results = sorted(ndjson(response), key=lambda result: result['index'])
+    assert [result['index'] for result in results] == [0, 1, 2]
+    assert {result['status'] for result in results} == {'success'}
+    assert results[1]['service'] == 'translate_text'
+    assert results[0]['message'] == 'batch answer'
+
+def test_invalid_items_are_reported_without_failing_the_batch(client, auth_headers, fake_registry):
+    items = [
+        {'service': 'no_such_service', 'prompt': 'x'},
+        {'service': 'translate_text', 'prompt': 'hello'},
+        {'service': 'provide_legal_assistance', 'prompt': 'contract'},
+        'not an object',
+    ]
+    results = {result['index']: result for result in ndjson(
+        client.post('/api/v1/batch', json={'items': items}, headers=auth_headers))}
+    assert results[0]['error'] == 'Unknown service: no_such_service'
+    assert results[1]['error'] == 'Missing target_language'
+    assert results[2]['status'] == 'success'
+    assert results[3]['status'] == 'error'
+
+@pytest.mark.parametrize('body', [{}, {'items': []}, {'items': 'x'}, {'items': [{}], 'concurrency': 0}])
+def test_malformed_batch_is_rejected(client, auth_headers, body):
+    response = client.post('/api/v1/batch', json=body, headers=auth_headers)
+    assert response.status_code == 400
+
+def test_batch_requires_api_key(client):
+    response = client.post('/api/v1/batch', json={'items': [{'service': 'x', 'prompt': 'y'}]})
+    assert response.status_code == 401
+
+def test_batch_respects_concurrency_and_yields_in_completion_order(monkeypatch):
+    in_flight, peak = 0, 0
+
+    async def fake_ainvoke(service, inputs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Later items finish first, so completion order is the reverse of submission order.
+        await asyncio.sleep(0.01 * (10 - int(inputs['prompt'])))
+        in_flight -= 1
+        return inputs['prompt']
+
+    monkeypatch.setattr(google_ai, "ainvoke_service", fake_ainvoke)
+    items = [{'service': 'provide_legal_assistance', 'prompt': str(i)} for i in range(10)]
+    results = list(google_ai.batch_services(items, concurrency=10))
+    assert [result['index'] for result in results] == list(range(9, -1, -1))
+
+    peak = 0
+    list(google_ai.batch_services(items, concurrency=3))
+    assert peak == 3
+
+def test_failed_item_carries_the_service_error_prefix(monkeypatch):
+    async def broken(service, inputs):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(google_ai, "ainvoke_service", broken)
+    [result] = google_ai.batch_services([{'service': 'provide_ussd_blockchain_assistance', 'prompt': 'x'}])
+    assert result['error'] == 'USSD Blockchain AI Error: provider down'
@@ -1,6 +1,10 @@
 import pytest
+import asyncio
 import json
-from unittest.mock import patch, MagicMock
+import time
+from unittest.mock import patch
+
+import google_ai
 
 def test_conflict_debug_assistance_endpoint(client, auth_headers):
     """Test the conflict-debug assistance endpoint."""
@@ -31,3 +35,40 @@ def test_conflict_debug_assistance_no_prompt(client, auth_headers):
     assert response.status_code == 400
     data = json.loads(response.data)
     assert 'error' in data
+
+def _answer_after(seconds, answer):
+    async def call():
+        await asyncio.sleep(seconds)
+        return answer
+    return call
+
+async def _fail():
+    raise RuntimeError("provider down")
+
+def test_fan_out_returns_at_quorum_without_waiting_for_stragglers():
+    calls = {
+        "a": _answer_after(0, "A"),
+        "b": _answer_after(0.01, "B"),
+        "c": _answer_after(0.02, "C"),
+        "slow": _answer_after(5, "late"),
+    }
+    started = time.perf_counter()
+    outcomes = asyncio.run(google_ai.fan_out(calls, deadline=10, quorum=3))
+    assert time.perf_counter() - started < 1
+    assert [outcome["status"] for outcome in outcomes.values()] == ["ok", "ok", "ok", "skipped"]
+    assert outcomes["a"]["result"] == "A"
+    assert all("latency_ms" in outcome for outcome in outcomes.values())
+
+def test_fan_out_applies_per_model_deadline_and_keeps_errors():
+    calls = {"ok": _answer_after(0, "fine"), "hung": _answer_after(5, "late"), "broken": _fail}
+    outcomes = asyncio.run(google_ai.fan_out(calls, deadline=0.05, quorum=3))
+    assert outcomes["ok"]["status"] == "ok"
+    assert outcomes["hung"]["status"] == "timeout"
+    assert outcomes["broken"] == {"status": "error", "error": "provider down", "latency_ms": outcomes["broken"]["latency_ms"]}
+
+def test_conflict_debug_synthesizes_panel_answers(fake_models):
+    fake_models(["  panel answer  "], providers=("vertex", "openai", "anthropic", "nvidia"))
+    answer = google_ai.provide_conflict_debug_assistance("merge conflict in requirements.txt")
+    synthesis, latency = answer.split("\n\n")
+    assert synthesis == "panel answer"
+    assert latency.startswith("Model latency: Gemini ")
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+import crawler
+from background_loop import run_sync
+
+PAGE = b"""<html><body>
+<a href="/ok">ok</a>
+<a href="/ok#section">same page, other fragment</a>
+<a href="/missing">missing</a>
+<a href="/no-head">no head</a>
+<a href="mailto:someone@example.com">mail</a>
+</body></html>"""
+
+
+class Handler(BaseHTTPRequestHandler):
+    in_flight = 0
+    max_in_flight = 0
+    requests = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, body):
+        if self.path == '/':
+            status = 200
+        elif self.path.startswith('/ok') or self.path.startswith('/link'):
+            status = 200
+        elif self.path == '/no-head':
+            status = 405 if self.command == 'HEAD' else 200
+        elif self.path == '/hang':
+            time.sleep(1)
+            status = 200
+        else:
+            status = 404
+        cls = type(self)
+        with cls.lock:
+            cls.requests += 1
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(0.01)
+        with cls.lock:
+            cls.in_flight -= 1
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        if body:
+            self.wfile.write(PAGE)
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def do_GET(self):
+        self._respond(body=True)
+
+
+@pytest.fixture
+def site():
+    handler = type('SiteHandler', (Handler,), {'in_flight': 0, 'max_in_flight': 0, 'requests': 0, 'lock': threading.Lock()})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}', handler
+    server.shutdown()
+
+async def collect(links, **options):
+    async with httpx.AsyncClient() as client:
+        return [item async for item in crawler.check_links(client, links, **options)]
+
+def test_extract_links_deduplicates_and_skips_other_schemes():
+    links = crawler.extract_links('http://example.com/', PAGE)
+    assert [link['url'] for link in links] == [
+        'http://example.com/ok', 'http://example.com/missing', 'http://example.com/no-head',
+    ]
+    assert links[0]['text'] == 'ok'
+
+def test_crawl_classifies_links_with_head_fallback(site):
+    base_url, _ = site
+    results = run_sync(crawler.crawl(base_url + '/'))
+    assert sorted(r['url'] for r in results['ok']) == [base_url + '/no-head', base_url + '/ok']
+    assert [r['status'] for r in results['broken']] == [404]
+    assert results['slow'] == results['unchecked'] == []
+
+def test_concurrency_and_per_host_limits_are_respected(site):
+    base_url, handler = site
+    links = [{'url': f'{base_url}/link{i}', 'text': ''} for i in range(40)]
+    items = asyncio.run(collect(links, concurrency=8, per_host=3))
+    assert len(items) == 40
+    assert {category for category, _ in items} == {'ok'}
+    assert handler.max_in_flight <= 3
+
+def test_deadline_reports_unchecked_links(site):
+    base_url, _ = site
+    links = [{'url': f'{base_url}/hang', 'text': ''}, {'url': f'{base_url}/ok', 'text': ''}]
+    started = time.perf_counter()
+    items = asyncio.run(collect(links, concurrency=1, deadline=0.2))
+    assert time.perf_counter() - started < 0.9
+    assert [category for category, _ in items] == ['unchecked', 'unchecked']
+
+def test_unreachable_link_is_broken():
+    items = asyncio.run(collect([{'url': 'http://127.0.0.1:9/', 'text': 'closed port'}], timeout=1))
+    assert items[0][0] == 'broken'
+    assert items[0][1]['status'] == 'Error'
+
+def test_invalid_host_name_is_broken():
+    # idna raises InvalidCodepoint, which is not an httpx error.
+    items = asyncio.run(collect([{'url': 'http://xn--a.com/', 'text': 'bad punycode'}], deadline=5))
+    assert [category for category, _ in items] == ['broken']
+    assert items[0][1]['status'] == 'Error'
+
+def test_a_failing_worker_does_not_hang_the_crawl(site, monkeypatch):
+    base_url, _ = site
+
+    async def check_link(client, link_data, timeout):
+        raise RuntimeError('unexpected')
+
+    monkeypatch.setattr(crawler, 'check_link', check_link)
+    links = [{'url': f'{base_url}/ok', 'text': ''}, {'url': f'{base_url}/link1', 'text': ''}]
+    items = asyncio.run(collect(links, concurrency=1, deadline=5))
+    assert [category for category, _ in items] == ['unchecked', 'unchecked']
+
+def test_analyze_website_endpoint(client, auth_headers, site):
+    base_url, _ = site
+    response = client.post('/api/v1/analyze/website', json={'url': base_url + '/'}, headers=auth_headers)
+    message = response.json['message']
+    assert len(message['ok']) == 2
+    assert len(message['broken']) == 1
+
+def test_analyze_website_reports_fetch_errors(client, auth_headers, site):
+    base_url, _ = site
+    response = client.post('/api/v1/analyze/website', json={'url': base_url + '/missing'}, headers=auth_headers)
+    assert 'error' in response.json['message']
+
+def test_analyze_website_streams_ndjson(client, auth_headers, site):
+    base_url, _ = site
+    response = client.post('/api/v1/analyze/website?stream=ndjson', json={'url': base_url + '/'}, headers=auth_headers)
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    links, summary = lines[:-1], lines[-1]['summary']
+    assert sorted(line['link']['category'] for line in links) == ['broken', 'ok', 'ok']
+    assert (summary['ok'], summary['broken'], summary['total']) == (2, 1, 3)
+
+def test_analyze_website_streams_sse(client, auth_headers, site):
+    base_url, _ = site
+    headers = dict(auth_headers, Accept='text/event-stream')
+    response = client.post('/api/v1/analyze/website', json={'url': base_url + '/'}, headers=headers)
+    assert response.mimetype == 'text/event-stream'
+    events = response.data.decode().strip().split('\n\n')
+    assert [event.split('\n')[0] for event in events] == ['event: link'] * 3 + ['event: done']
+    done = json.loads(events[-1].split('data: ', 1)[1])
+    assert done['status'] == 'success'
+    assert done['summary']['total'] == 3
+
+def test_streaming_stops_the_crawl_when_the_client_goes_away(site):
+    base_url, handler = site
+    links = [{'url': f'{base_url}/link{i}', 'text': ''} for i in range(200)]
+    results = crawler.iter_check_links(links, concurrency=4, per_host=4)
+    next(results)
+    results.close()
+    time.sleep(0.1)
+    checked = handler.requests
+    time.sleep(0.2)
+    assert handler.requests == checked < 20
@@ -0,0 +1,160 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+
+import database
+from app import app, db, Payment
+from database import WriteQueue
+
+
+def test_database_url_comes_from_the_environment(monkeypatch):
+    monkeypatch.delenv('DATABASE_URL')
+    assert database.database_uri() == 'sqlite:///project.db'
+    monkeypatch.setenv('DATABASE_URL', 'postgres://app:secret@db:5432/app')
+    assert database.database_uri() == 'postgresql://app:secret@db:5432/app'
+
+def test_server_databases_get_a_tuned_pool(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '5')
+    options = database.engine_options('postgresql://db/app')
+    assert options['pool_size'] == 5
+    assert options['pool_pre_ping'] is True
+    assert options['pool_recycle'] == 1800
+    assert 'pool_size' not in database.engine_options('sqlite:///project.db')
+
+@pytest.fixture
+def store(tmp_path):
+    """A throwaway app with its own SQLite file and write queue."""
+    store_app = Flask(__name__)
+    store_app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_path}/store.db'
+    store_app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database.engine_options(store_app.config['SQLALCHEMY_DATABASE_URI'])
+    store_db = SQLAlchemy(store_app)
+    with store_app.app_context():
+        database.configure_sqlite(store_db.engine)
+        store_db.session.execute(text('CREATE TABLE counters (name TEXT PRIMARY KEY, value INTEGER)'))
+        store_db.session.commit()
+        yield store_db, WriteQueue(store_app, store_db)
+        store_db.engine.dispose()
+
+def test_sqlite_connections_use_wal(store):
+    store_db, _ = store
+    pragmas = [store_db.session.execute(text(f'PRAGMA {name}')).scalar()
+               for name in ('journal_mode', 'synchronous', 'busy_timeout')]
+    assert pragmas == ['wal', 1, 5000]
+
+def test_concurrent_writes_are_committed_in_batches(store):
+    store_db, writes = store
+    start = threading.Barrier(20)
+
+    def insert(i):
+        start.wait()
+        return writes.run(lambda: store_db.session.execute(
+            text('INSERT INTO counters VALUES (:name, :value)'), {'name': f'c{i}', 'value': i}).rowcount)
+
+    threads = [threading.Thread(target=insert, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store_db.session.execute(text('SELECT COUNT(*) FROM counters')).scalar() == 20
+    stats = writes.stats()
+    assert stats['writes'] == 20
+    assert stats['batches'] < 20
+
+def test_a_failing_write_does_not_undo_its_batch(store):
+    store_db, writes = store
+    writes.run(lambda: store_db.session.execute(text("INSERT INTO counters VALUES ('taken', 1)")))
+    holding, release = threading.Event(), threading.Event()
+    results, attempts = {}, []
+
+    def blocker():
+        holding.set()
+        release.wait(5)
+
+    def run(name, value):
+        def insert():
+            attempts.append(name)
+            return store_db.session.execute(
+                text('INSERT INTO counters VALUES (:name, :value)'), {'name': name, 'value': value}).rowcount
+        try:
+            results[name] = writes.run(insert)
+        except Exception as e:
+            results[name] = type(e).__name__
+
+    # Hold the writer so that the next three jobs queue up and run as one batch.
+    holder = threading.Thread(target=writes.run, args=(blocker,))
+    holder.start()
+    holding.wait(5)
+    threads = [threading.Thread(target=run, args=args) for args in (('a', 1), ('taken', 2), ('b', 3))]
+    for thread in threads:
+        thread.start()
+    while writes.stats()['queued'] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads + [holder]:
+        thread.join()
+    assert results == {'a': 1, 'taken': 'IntegrityError', 'b': 1}
+    # The failed batch was retried job by job, so jobs ran more than once: a job must only
+    # touch the database, where its first attempt was rolled back and left no trace.
+    assert attempts.count('taken') == 2
+    assert len(attempts) > 3
+    assert store_db.session.execute(text('SELECT name FROM counters ORDER BY name')).scalars().all() == ['a', 'b', 'taken']
+
+def test_a_job_raising_base_exception_still_answers_its_caller(store):
+    store_db, writes = store
+
+    def exit_writer():
+        store_db.session.execute(text("INSERT INTO counters VALUES ('lost', 1)"))
+        raise SystemExit
+
+    with pytest.raises(RuntimeError, match='aborted'):
+        writes.run(exit_writer)
+    # The writer is still serving the queue.
+    assert writes.run(lambda: store_db.session.execute(text("INSERT INTO counters VALUES ('kept', 1)")).rowcount) == 1
+    assert store_db.session.execute(text('SELECT name FROM counters')).scalars().all() == ['kept']
+
+def test_a_write_that_cannot_start_in_time_is_cancelled(store):
+    store_db, writes = store
+    writes.timeout = 0.05
+    holding, release = threading.Event(), threading.Event()
+
+    def blocker():
+        holding.set()
+        release.wait(5)
+
+    holder = threading.Thread(target=writes.run, args=(blocker,))
+    holder.start()
+    holding.wait(5)
+    with pytest.raises(TimeoutError):
+        writes.run(lambda: store_db.session.execute(text("INSERT INTO counters VALUES ('late', 1)")))
+    release.set()
+    holder.join()
+    writes.run(lambda: None)
+    assert store_db.session.execute(text('SELECT COUNT(*) FROM counters')).scalar() == 0
+
+def test_without_the_queue_writes_commit_inline(store):
+    store_db, _ = store
+    inline = WriteQueue(None, store_db, enabled=False)
+    inline.run(lambda: store_db.session.execute(text("INSERT INTO counters VALUES ('inline', 1)")))
+    assert inline.stats()['batches'] == 0
+    store_db.session.rollback()
+    assert store_db.session.execute(text("SELECT value FROM counters WHERE name = 'inline'")).scalar() == 1
+
+def test_payment_intent_is_recorded_through_the_writer(client, auth_headers):
+    stripe = MagicMock()
+    stripe.PaymentIntent.create.return_value.client_secret = 'pi_secret'
+    with patch('app.get_stripe', return_value=stripe):
+        response = client.post('/api/v1/payment/create-payment-intent',
+                               data=json.dumps({'amount': '12.50', 'currency': 'usd'}),
+                               content_type='application/json', headers=auth_headers)
+    assert response.status_code == 200
+    payment_id = response.get_json()['paymentId']
+    assert stripe.PaymentIntent.create.call_args.kwargs['metadata'] == {'payment_id': payment_id}
+    with app.app_context():
+        payment = db.session.get(Payment, payment_id)
+        assert (payment.amount, payment.status) == (1250, 'pending')
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+import google_ai
+from background_loop import run_sync
+from governor import ProviderLimits, Singleflight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = Singleflight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return 'answer'
+
+    with ThreadPoolExecutor(5) as executor:
+        futures = [executor.submit(flight.do, 'key', fn) for _ in range(5)]
+        while flight.stats()['calls'] < 5:
+            time.sleep(0.01)
+        release.set()
+        assert [future.result() for future in futures] == ['answer'] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {'calls': 5, 'coalesced': 4, 'in_flight': 0}
+
+def test_errors_reach_every_waiter_and_are_not_remembered():
+    flight = Singleflight()
+    with pytest.raises(ZeroDivisionError):
+        flight.do('key', lambda: 1 / 0)
+    assert flight.do('key', lambda: 'retried') == 'retried'
+
+def test_async_callers_share_one_task_and_survive_a_cancelled_peer():
+    flight = Singleflight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'answer'
+
+    async def main():
+        impatient = asyncio.create_task(asyncio.wait_for(flight.ado('key', work), 0.01))
+        patient = [asyncio.create_task(flight.ado('key', work)) for _ in range(3)]
+        with pytest.raises(asyncio.TimeoutError):
+            await impatient
+        return await asyncio.gather(*patient)
+
+    assert asyncio.run(main()) == ['answer'] * 3
+    assert len(calls) == 1
+    assert flight.stats()['coalesced'] == 3
+
+def test_provider_limit_caps_threads():
+    limits = ProviderLimits({'openai': 2})
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def call():
+        with limits.limit('openai'):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: call(), range(16)))
+    assert peak[0] == 2
+    stats = limits.stats()['openai']
+    assert stats['peak_in_flight'] == 2
+    assert stats['in_flight'] == 0
+    assert stats['queued'] > 0
+
+def test_provider_limit_is_shared_by_threads_and_coroutines():
+    limits = ProviderLimits({'nvidia': 1})
+    order = []
+    entered = threading.Event()
+    release = threading.Event()
+
+    def sync_holder():
+        with limits.limit('nvidia'):
+            entered.set()
+            release.wait(5)
+            order.append('thread')
+
+    async def async_caller():
+        async with limits.alimit('llamaindex-nvidia'):
+            order.append('coroutine')
+
+    thread = threading.Thread(target=sync_holder)
+    thread.start()
+    assert entered.wait(5)
+
+    async def main():
+        task = asyncio.create_task(async_caller())
+        await asyncio.sleep(0.05)
+        assert limits.stats()['nvidia']['waiting'] == 1
+        release.set()
+        await task
+
+    asyncio.run(main())
+    thread.join()
+    assert order == ['thread', 'coroutine']
+    assert limits.stats()['nvidia']['in_flight'] == 0
+
+def test_cancelled_waiter_does_not_leak_its_slot():
+    limits = ProviderLimits({'anthropic': 1})
+
+    async def main():
+        async with limits.alimit('anthropic'):
+            waiter = asyncio.create_task(limits.alimit('anthropic').__aenter__())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        async with limits.alimit('anthropic'):
+            return limits.stats()['anthropic']
+
+    stats = asyncio.run(main())
+    assert stats['in_flight'] == 1
+    assert stats['waiting'] == 0
+    assert limits.stats()['anthropic']['in_flight'] == 0
+
+def test_providers_without_a_limit_are_not_throttled():
+    limits = ProviderLimits({'vertex': 0})
+    with limits.limit('vertex'), limits.limit('vertex'):
+        pass
+    assert limits.stats() == {}
+
+def test_identical_prompts_are_coalesced_into_one_provider_call(fake_models, monkeypatch):
+    model = FakeListChatModel(responses=['campaign post', 'second call'], sleep=0.05)
+    fake_models(vertex=lambda name: model)
+    monkeypatch.setattr(google_ai, 'singleflight', Singleflight())
+
+    async def burst():
+        return await asyncio.gather(*[
+            google_ai.arun_service('generate_social_media_post', 'summer sale') for _ in range(10)
+        ])
+
+    assert run_sync(burst()) == ['campaign post'] * 10
+    assert model.i == 1
+    assert google_ai.singleflight.stats()['coalesced'] == 9
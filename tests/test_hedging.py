@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+import google_ai
+from background_loop import run_sync
+from hedging import HedgePolicy, LatencyHistogram
+
+
+def slow_model(answer, seconds, calls=None):
+    async def respond(prompt_value):
+        if calls is not None:
+            calls.append(answer)
+        await asyncio.sleep(seconds)
+        return answer
+    return RunnableLambda(lambda prompt_value: answer, afunc=respond)
+
+def _after(seconds, result, log=None):
+    async def call():
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append("cancelled")
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return call
+
+def test_histogram_percentile_and_decay():
+    histogram = LatencyHistogram(window=100)
+    for _ in range(90):
+        histogram.record(0.1)
+    for _ in range(9):
+        histogram.record(2.0)
+    assert 0.1 <= histogram.percentile(0.5) < 0.13
+    assert 2.0 <= histogram.percentile(0.95) < 2.5
+    histogram.record(2.0)
+    assert histogram.total == 50
+
+def test_delay_uses_the_default_until_enough_samples():
+    policy = HedgePolicy(enabled=True, default_delay=2.0, min_samples=5)
+    assert policy.delay("translate_text") == 2.0
+    for _ in range(5):
+        policy.record_latency("translate_text", 0.2)
+    assert 0.2 <= policy.delay("translate_text") < 0.25
+
+def test_fast_primary_is_not_hedged():
+    policy = HedgePolicy(enabled=True, default_delay=1)
+    result = asyncio.run(policy.call("svc", _after(0, "primary"), _after(0, "secondary")))
+    assert result == "primary"
+    assert policy.stats()["svc"]["hedged"] == 0
+
+def test_slow_primary_is_hedged_and_cancelled_when_the_secondary_wins():
+    policy = HedgePolicy(enabled=True, default_delay=0.02)
+    log = []
+    result = asyncio.run(policy.call("svc", _after(5, "primary", log), _after(0.01, "secondary")))
+    assert result == "secondary"
+    assert log == ["cancelled"]
+    stats = policy.stats()["svc"]
+    assert (stats["calls"], stats["hedged"], stats["hedge_wins"]) == (1, 1, 1)
+    assert stats["extra_request_ratio"] == 1.0
+
+def test_failed_hedge_falls_back_to_the_primary():
+    policy = HedgePolicy(enabled=True, default_delay=0.01)
+    result = asyncio.run(policy.call("svc", _after(0.05, "primary"), _after(0, RuntimeError("hedge down"))))
+    assert result == "primary"
+    assert policy.stats()["svc"]["hedge_wins"] == 0
+
+def test_primary_error_is_raised_when_both_fail():
+    policy = HedgePolicy(enabled=True, default_delay=0.01)
+    with pytest.raises(RuntimeError, match="primary down"):
+        asyncio.run(policy.call("svc", _after(0.02, RuntimeError("primary down")),
+                                _after(0, RuntimeError("hedge down"))))
+
+@pytest.fixture
+def slow_vertex(fake_models):
+    calls = []
+    fake_models(vertex=lambda model_name: slow_model("gemini translation", 2, calls),
+                openai=lambda model_name: slow_model("gpt translation", 0, calls))
+    return calls
+
+def test_translate_is_hedged_when_enabled(slow_vertex, monkeypatch):
+    monkeypatch.setattr(google_ai, "hedge_policy", HedgePolicy(enabled=True, default_delay=0.05))
+    result = run_sync(google_ai.arun_service("translate_text", "hola", "English"))
+    assert result == "gpt translation"
+    assert slow_vertex == ["gemini translation", "gpt translation"]
+    assert google_ai.hedge_policy.stats()["translate_text"]["hedge_wins"] == 1
+
+def test_hedging_is_opt_in(slow_vertex, fake_models, monkeypatch):
+    monkeypatch.setattr(google_ai, "hedge_policy", HedgePolicy(enabled=False, default_delay=0.05))
+    fake_models(vertex=lambda model_name: slow_model("gemini translation", 0.1, slow_vertex))
+    assert run_sync(google_ai.arun_service("translate_text", "hola", "English")) == "gemini translation"
+    assert slow_vertex == ["gemini translation"]
@@ -0,0 +1,121 @@
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+import google_ai
+from background_loop import run_sync
+from http_pool import HTTPPools
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    delay = 0.0
+    # Client (host, port) of every request, i.e. the connections the server saw.
+    peers = set()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        Handler.peers.add(self.client_address)
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    Handler.delay = 0.0
+    Handler.peers = set()
+
+def test_client_is_shared_per_provider_and_class():
+    pools = HTTPPools()
+    assert pools.client('openai', httpx.Client) is pools.client('openai', httpx.Client)
+    assert pools.client('openai', httpx.Client) is not pools.client('nvidia', httpx.Client)
+    assert pools.client('openai', httpx.AsyncClient) is not pools.client('openai', httpx.Client)
+
+def test_sequential_requests_reuse_one_keep_alive_connection(server):
+    pools = HTTPPools(http2=False)
+    client = pools.client('openai', httpx.Client)
+    for _ in range(5):
+        assert client.get(server).text == 'ok'
+    stats = pools.stats()['openai']
+    assert stats['requests'] == 5
+    assert len(Handler.peers) == 1
+    assert stats['active_requests'] == 0
+    assert stats['peak_active_requests'] == 1
+    assert stats['saturated'] == 0
+
+def test_full_pool_is_counted_as_saturated(server):
+    Handler.delay = 0.1
+    pools = HTTPPools(max_connections=2, http2=False)
+    client = pools.client('anthropic', httpx.Client)
+    with ThreadPoolExecutor(6) as executor:
+        first = [executor.submit(client.get, server) for _ in range(2)]
+        # Saturation is judged when a request starts, so the pool has to be busy by then.
+        while pools.stats()['anthropic']['active_requests'] < 2:
+            time.sleep(0.005)
+        rest = [executor.submit(client.get, server) for _ in range(4)]
+        assert all(future.result().status_code == 200 for future in first + rest)
+    stats = pools.stats()['anthropic']
+    assert stats['requests'] == 6
+    assert len(Handler.peers) <= 2
+    assert stats['saturated'] > 0
+    assert stats['active_requests'] == 0
+
+def test_async_client_records_requests(server):
+    pools = HTTPPools(http2=False)
+    client = pools.client('nvidia', httpx.AsyncClient)
+
+    async def fetch():
+        return (await client.get(server)).text
+
+    assert run_sync(fetch()) == 'ok'
+    assert pools.stats()['nvidia']['requests'] == 1
+    assert pools.stats()['nvidia']['active_requests'] == 0
+
+def test_streamed_response_holds_its_connection_until_closed(server):
+    pools = HTTPPools(http2=False)
+    client = pools.client('openai', httpx.Client)
+    with client.stream('GET', server) as response:
+        assert pools.stats()['openai']['active_requests'] == 1
+        assert response.read() == b'ok'
+    assert pools.stats()['openai']['active_requests'] == 0
+    assert pools.stats()['openai']['utilization'] == 0
+
+def test_provider_factories_use_the_shared_pools(monkeypatch):
+    import anthropic
+    import openai
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test')
+    monkeypatch.setenv('NVIDIA_API_KEY', 'test')
+    pools = HTTPPools()
+    monkeypatch.setattr(google_ai, 'http_pool', pools)
+
+    assert google_ai._openai_chat('gpt-4o').root_client._client is pools.client('openai', openai.DefaultHttpxClient)
+    nvidia = google_ai._nvidia_chat('meta/llama3-70b-instruct')
+    assert nvidia.root_async_client._client is pools.client('nvidia', openai.DefaultAsyncHttpxClient)
+    assert str(nvidia.root_client.base_url).startswith(google_ai.NVIDIA_BASE_URL)
+    claude = google_ai._anthropic_chat('claude-3-5-sonnet-20240620')
+    assert claude._client._client is pools.client('anthropic', anthropic.DefaultHttpxClient)
+    assert claude._async_client._client is pools.client('anthropic', anthropic.DefaultAsyncHttpxClient)
+
+def test_chat_anthropic_still_builds_its_clients_in_cached_properties():
+    # _anthropic_chat fills these in to share the pool; a langchain-anthropic upgrade that
+    # renames them must fail here rather than quietly bypass the pool.
+    from langchain_anthropic import ChatAnthropic
+    for name in google_ai.ANTHROPIC_CLIENT_PROPERTIES:
+        assert isinstance(getattr(ChatAnthropic, name, None), functools.cached_property), name
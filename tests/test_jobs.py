@@ -0,0 +1,195 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import app as app_module
+import google_ai
+from jobs import JobQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    handlers = {
+        'echo': lambda prompt: {'echo': prompt},
+        'fail': lambda prompt: 1 / 0,
+    }
+    return JobQueue(str(tmp_path / 'jobs.db'), handlers, workers=0, result_ttl=60, clock=clock)
+
+@pytest.fixture
+def app_queue(tmp_path, monkeypatch):
+    # workers=0 so tests run jobs explicitly with work_once().
+    queue = JobQueue(str(tmp_path / 'jobs.db'), app_module.JOB_HANDLERS, workers=0)
+    monkeypatch.setattr(app_module, 'job_queue', queue)
+    return queue
+
+def test_job_runs_and_keeps_its_result(queue):
+    job = queue.submit(1, 'echo', {'prompt': 'hi'})
+    assert job['status'] == 'queued'
+    assert queue.work_once() is True
+    job = queue.get(job['id'], 1)
+    assert job['status'] == 'succeeded'
+    assert job['result'] == {'echo': 'hi'}
+    assert job['finished_at'] is not None
+    assert queue.work_once() is False
+
+def test_failed_job_records_the_error(queue):
+    job = queue.submit(1, 'fail', {'prompt': 'x'})
+    queue.work_once()
+    job = queue.get(job['id'], 1)
+    assert job['status'] == 'failed'
+    assert 'division by zero' in job['error']
+
+def test_unknown_service_is_rejected(queue):
+    with pytest.raises(KeyError):
+        queue.submit(1, 'nope', {'prompt': 'x'})
+
+def test_higher_priority_is_claimed_first(queue, clock):
+    free = queue.submit(1, 'echo', {'prompt': 'free'}, priority=0)
+    clock.now += 1
+    pro = queue.submit(2, 'echo', {'prompt': 'pro'}, priority=20)
+    queue.work_once()
+    assert queue.get(pro['id'], 2)['status'] == 'succeeded'
+    assert queue.get(free['id'], 1)['status'] == 'queued'
+
+def test_jobs_are_private_to_their_owner(queue):
+    job = queue.submit(1, 'echo', {'prompt': 'hi'})
+    assert queue.get(job['id'], 2) is None
+    assert queue.cancel(job['id'], 2) is None
+    assert queue.get(job['id'], 1)['status'] == 'queued'
+
+def test_cancelled_queued_job_never_runs(queue):
+    job = queue.submit(1, 'echo', {'prompt': 'hi'})
+    assert queue.cancel(job['id'], 1)['status'] == 'cancelled'
+    assert queue.work_once() is False
+
+def test_cancelling_a_running_job_discards_its_result(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(prompt):
+        started.set()
+        release.wait(5)
+        return prompt
+
+    queue = JobQueue(str(tmp_path / 'jobs.db'), {'slow': slow}, workers=0)
+    job = queue.submit(1, 'slow', {'prompt': 'hi'})
+    worker = threading.Thread(target=queue.work_once)
+    worker.start()
+    assert started.wait(5)
+    assert queue.cancel(job['id'], 1)['status'] == 'running'
+    release.set()
+    worker.join()
+    job = queue.get(job['id'], 1)
+    assert job['status'] == 'cancelled'
+    assert job['result'] is None
+
+def test_finished_jobs_expire_after_the_ttl(queue, clock):
+    job = queue.submit(1, 'echo', {'prompt': 'hi'})
+    queue.work_once()
+    clock.now += 59
+    assert queue.get(job['id'], 1) is not None
+    clock.now += 2
+    assert queue.get(job['id'], 1) is None
+    assert queue.purge_expired() == 1
+    assert queue.stats() == {}
+
+def test_jobs_whose_lease_expired_are_requeued(queue, clock):
+    job = queue.submit(1, 'echo', {'prompt': 'hi'})
+    claim = queue._claim()
+    # A worker that restarts under the same pid (PID 1 in a container) finds its old job
+    # still running; only the lease tells that nobody is working on it anymore.
+    clock.now += 59
+    assert queue.requeue_orphans() == 0
+    clock.now += 2
+    assert queue.requeue_orphans() == 1
+    assert queue.get(job['id'], 1)['status'] == 'queued'
+    # The worker that lost the claim can no longer renew or finish the job.
+    assert not queue.renew(job['id'], claim['claim_id'])
+    assert queue.work_once() is True
+    assert queue.get(job['id'], 1)['result'] == {'echo': 'hi'}
+
+def test_running_jobs_renew_their_lease(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(prompt):
+        started.set()
+        release.wait(5)
+        return prompt
+
+    queue = JobQueue(str(tmp_path / 'jobs.db'), {'slow': slow}, workers=0, lease=0.15)
+    job = queue.submit(1, 'slow', {'prompt': 'hi'})
+    worker = threading.Thread(target=queue.work_once)
+    worker.start()
+    assert started.wait(5)
+    time.sleep(0.5)
+    assert queue.requeue_orphans() == 0
+    release.set()
+    worker.join()
+    assert queue.get(job['id'], 1)['status'] == 'succeeded'
+
+def test_queue_files_without_leases_are_migrated(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, user_id INTEGER NOT NULL, service TEXT NOT NULL, "
+                     "payload TEXT NOT NULL, priority INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL DEFAULT 'queued', "
+                     "cancel_requested INTEGER NOT NULL DEFAULT 0, owner_pid INTEGER, result TEXT, error TEXT, "
+                     "created_at REAL NOT NULL, started_at REAL, finished_at REAL, expires_at REAL)")
+        conn.execute("INSERT INTO jobs (id, user_id, service, payload, status, owner_pid, created_at) "
+                     "VALUES ('old', 1, 'echo', '{\"prompt\": \"hi\"}', 'running', 1, 0)")
+    queue = JobQueue(path, {'echo': lambda prompt: prompt}, workers=0)
+    assert queue.requeue_orphans() == 1
+    assert queue.work_once() is True
+    assert queue.get('old', 1)['status'] == 'succeeded'
+
+def test_worker_threads_drain_the_queue(tmp_path):
+    done = threading.Event()
+    queue = JobQueue(str(tmp_path / 'jobs.db'), {'echo': lambda prompt: done.set() or prompt}, workers=2)
+    try:
+        queue.submit(1, 'echo', {'prompt': 'hi'})
+        assert done.wait(5)
+    finally:
+        queue.stop()
+
+def test_job_endpoints(client, auth_headers, app_queue, monkeypatch):
+    monkeypatch.setattr(google_ai, 'generate_website', lambda prompt: ('<html></html>', 'body {}'))
+    response = client.post('/api/v1/jobs', json={'service': 'generate_website', 'prompt': 'shop'},
+                           headers=auth_headers)
+    assert response.status_code == 202
+    job = response.get_json()['job']
+    assert response.headers['Location'].endswith(f"/api/v1/jobs/{job['id']}")
+    assert job['status'] == 'queued'
+
+    app_queue.work_once()
+    job = client.get(f"/api/v1/jobs/{job['id']}", headers=auth_headers).get_json()['job']
+    assert job['status'] == 'succeeded'
+    assert job['result'] == {'html': '<html></html>', 'css': 'body {}'}
+
+def test_job_endpoint_cancel_and_not_found(client, auth_headers, app_queue):
+    job = client.post('/api/v1/jobs', json={'service': 'provide_llama_intelligence', 'prompt': 'x'},
+                      headers=auth_headers).get_json()['job']
+    response = client.delete(f"/api/v1/jobs/{job['id']}", headers=auth_headers)
+    assert response.get_json()['job']['status'] == 'cancelled'
+    assert client.get('/api/v1/jobs/missing', headers=auth_headers).status_code == 404
+
+@pytest.mark.parametrize('body', [{'service': 'generate_game', 'prompt': 'x'}, {'service': 'generate_website'}])
+def test_invalid_job_is_rejected(client, auth_headers, app_queue, body):
+    assert client.post('/api/v1/jobs', json=body, headers=auth_headers).status_code == 400
+
+def test_priority_follows_the_active_plan():
+    def user(plan, status):
+        return app_module.AuthenticatedUser(1, 'u', status, plan, None)
+    assert app_module.job_priority(user('pro', 'active')) > app_module.job_priority(user('premium', 'active'))
+    assert app_module.job_priority(user('pro', 'canceled')) == app_module.JOB_PRIORITIES['free']
@@ -0,0 +1,107 @@
+import json
+import re
+import threading
+from unittest.mock import patch
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+import google_ai
+from metrics import Registry
+from router import ModelRouter
+
+
+def sample(text, name, **labels):
+    """The value of the series name{labels} in an exposition, or None."""
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = "^" + re.escape(name) + (r"\{" + re.escape(wanted) + r"\}" if labels else "") + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+def test_per_thread_shards_are_merged_on_scrape():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+
+    def work():
+        for _ in range(1000):
+            requests.inc(("/a",))
+            latency.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latency.observe(0.05)
+
+    text = registry.render()
+    assert sample(text, "requests_total", route="/a") == 4000
+    assert sample(text, "latency_seconds_bucket", le="0.1") == 1
+    assert sample(text, "latency_seconds_bucket", le="1") == 4001
+    assert sample(text, "latency_seconds_bucket", le="+Inf") == 4001
+    assert sample(text, "latency_seconds_count") == 4001
+    # Counts of finished threads survive their shards being retired.
+    assert sample(registry.render(), "requests_total", route="/a") == 4000
+
+def test_labels_are_escaped_and_collectors_are_rendered():
+    registry = Registry()
+    registry.counter("errors_total", "Errors.", ("message",)).inc(('say "hi"\n',))
+    registry.collector(lambda: [("ratio", "gauge", "A ratio.", [({"cache": "x"}, 0.5)])])
+
+    @registry.collector
+    def broken():
+        raise RuntimeError("source down")
+
+    text = registry.render()
+    assert 'errors_total{message="say \\"hi\\"\\n"} 1' in text
+    assert "# TYPE ratio gauge\nratio{cache=\"x\"} 0.5" in text
+
+def test_clear_resets_counters():
+    registry = Registry()
+    counter = registry.counter("calls_total", "Calls.")
+    counter.inc()
+    registry.clear()
+    counter.inc()
+    assert sample(registry.render(), "calls_total") == 1
+
+@patch('google_ai.generate_social_media_post')
+def test_metrics_endpoint_reports_routes_auth_and_caches(mock_post, client, auth_headers):
+    mock_post.return_value = 'post'
+    for _ in range(2):
+        response = client.post('/api/v1/promotions', data=json.dumps({'description': 'sale'}),
+                               content_type='application/json', headers=auth_headers)
+        assert response.status_code == 200
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    assert sample(text, 'http_request_duration_seconds_count', method='POST',
+                  route='/api/v1/promotions', status='200') == 2
+    # The second request found the API key in the auth cache.
+    assert sample(text, 'auth_db_query_duration_seconds_count') == 1
+    assert sample(text, 'cache_hit_ratio', cache='api_key') == 0.5
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setenv('METRICS_TOKEN', 'scrape-secret')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+
+def test_provider_latency_errors_and_tokens(client, fake_models, monkeypatch):
+    def broken(model_name):
+        raise ConnectionError("vertex down")
+
+    answer = AIMessage(content="claude answer",
+                       usage_metadata={"input_tokens": 12, "output_tokens": 3, "total_tokens": 15})
+    fake_models(vertex=broken, anthropic=lambda model_name: GenericFakeChatModel(messages=iter([answer])))
+    monkeypatch.setattr(google_ai, "model_router", ModelRouter())
+    assert google_ai.provide_legal_assistance("contract") == "claude answer"
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert sample(text, 'llm_errors_total', provider='vertex', error='ConnectionError') == 1
+    assert sample(text, 'llm_request_duration_seconds_count', provider='vertex', outcome='error') == 1
+    assert sample(text, 'llm_request_duration_seconds_count', provider='anthropic', outcome='ok') == 1
+    assert sample(text, 'llm_tokens_total', provider='anthropic', direction='in') == 12
+    assert sample(text, 'llm_tokens_total', provider='anthropic', direction='out') == 3
+    assert sample(text, 'llm_reroutes_total') == 1
@@ -0,0 +1,58 @@
+import threading
+from unittest.mock import MagicMock
+
+import google_ai
+
+
+def make_registry():
+    factory = MagicMock(side_effect=lambda model_name: object())
+    return google_ai.ModelRegistry({"fake": factory, "other": factory}), factory
+
+def test_registry_builds_each_client_once():
+    registry, factory = make_registry()
+    first = registry.get("fake", "model-a")
+    second = registry.get("fake", "model-a")
+    assert first is second
+    assert factory.call_count == 1
+    stats = registry.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["clients"] == 1
+
+def test_registry_keys_by_provider_and_model():
+    registry, factory = make_registry()
+    assert registry.get("fake", "model-a") is not registry.get("fake", "model-b")
+    assert registry.get("fake", "model-a") is not registry.get("other", "model-a")
+    assert factory.call_count == 3
+
+def test_registry_invalidate_rebuilds_client():
+    registry, factory = make_registry()
+    old_a = registry.get("fake", "model-a")
+    other = registry.get("other", "model-a")
+    registry.invalidate(provider="fake")
+    assert registry.get("fake", "model-a") is not old_a
+    assert registry.get("other", "model-a") is other
+
+def test_registry_is_thread_safe():
+    registry, factory = make_registry()
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(registry.get("fake", "model-a"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert factory.call_count == 1
+    assert all(client is results[0] for client in results)
+
+def test_get_model_reuses_registry_client(monkeypatch):
+    registry, factory = make_registry()
+    registry._factories["vertex"] = factory
+    monkeypatch.setattr(google_ai, "model_registry", registry)
+    assert google_ai.get_model() is google_ai.get_model()
+    factory.assert_called_once_with("gemini-1.5-flash")
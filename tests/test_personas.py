@@ -0,0 +1,42 @@
+import pytest
+from langchain_core.prompts import ChatPromptTemplate
+
+import google_ai
+
+
+@pytest.fixture
+def fake_registry(fake_models):
+    return fake_models(["  fake answer  "], providers=("vertex", "openai", "anthropic", "nvidia"))
+
+@pytest.mark.parametrize("service", sorted(google_ai.PERSONAS))
+def test_persona_inputs_match_template_variables(service):
+    persona = google_ai.PERSONAS[service]
+    template = ChatPromptTemplate.from_messages([
+        ("system", persona["system"]),
+        ("user", persona["user"])
+    ])
+    assert set(template.input_variables) == set(persona.get("inputs", ("prompt",)))
+
+@pytest.mark.parametrize("service", sorted(google_ai.PERSONAS))
+def test_persona_service_function_exists(service):
+    assert callable(getattr(google_ai, service))
+
+def test_chain_is_compiled_once(fake_registry):
+    first = google_ai.get_chain("provide_legal_assistance")
+    assert google_ai.get_chain("provide_legal_assistance") is first
+
+def test_chain_is_rebuilt_after_invalidation(fake_registry):
+    first = google_ai.get_chain("provide_legal_assistance")
+    fake_registry.invalidate(provider="vertex")
+    assert google_ai.get_chain("provide_legal_assistance") is not first
+
+def test_thin_lookup_returns_stripped_text(fake_registry):
+    assert google_ai.provide_fintech_assistance("open banking") == "fake answer"
+    assert google_ai.translate_text("hola", "English") == "fake answer"
+
+def test_service_error_uses_persona_prefix(fake_models):
+    def broken(model_name):
+        raise RuntimeError("provider down")
+    fake_models(vertex=broken)
+    assert google_ai.provide_iaas_assistance("vm sizing") == "Error: provider down"
+    assert google_ai.provide_malware_defense_assistance("ransomware") == "Malware Defense AI Error: provider down"
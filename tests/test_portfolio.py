@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import event
+
+import app as app_module
+from app import app, db, Project
+from versions import VersionCounter
+
+
+@pytest.fixture
+def projects(client):
+    with app.app_context():
+        db.session.add_all(Project(title=f'Project {i}', description='d', image_url='img') for i in range(5))
+        db.session.commit()
+    return client
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def count(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', count)
+
+def test_pages_follow_the_cursor(projects):
+    titles, url, pages = [], '/api/v1/portfolio/projects?limit=2', 0
+    while url:
+        response = projects.get(url)
+        assert response.status_code == 200
+        titles += [project['title'] for project in response.get_json()]
+        link = response.headers.get('Link')
+        url = link[1:link.index('>')] if link else None
+        pages += 1
+    assert titles == [f'Project {i}' for i in range(5)]
+    assert pages == 3
+    assert set(response.get_json()[0]) == {'id', 'title', 'description', 'image_url'}
+
+def test_clients_that_do_not_page_get_every_project(projects, monkeypatch):
+    monkeypatch.setattr(app_module, 'PROJECTS_PAGE_SIZE', 2)
+    everything = projects.get('/api/v1/portfolio/projects')
+    assert len(everything.get_json()) == 5
+    assert 'Link' not in everything.headers
+    first_page = projects.get('/api/v1/portfolio/projects?cursor=0')
+    assert len(first_page.get_json()) == 2
+    assert 'rel="next"' in first_page.headers['Link']
+
+def test_invalid_paging_parameters(client):
+    assert client.get('/api/v1/portfolio/projects?limit=0').status_code == 400
+    assert client.get('/api/v1/portfolio/projects?limit=1000').status_code == 400
+    assert client.get('/api/v1/portfolio/projects?cursor=abc').status_code == 400
+
+def test_unchanged_projects_are_not_queried_again(projects, statements, auth_headers):
+    first = projects.get('/api/v1/portfolio/projects')
+    etag = first.headers['ETag']
+    queried = len(statements)
+    cached = projects.get('/api/v1/portfolio/projects', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+    assert len(statements) == queried
+
+    # Another page is a different representation.
+    assert projects.get('/api/v1/portfolio/projects?limit=2', headers={'If-None-Match': etag}).status_code == 200
+
+    assert projects.post('/api/v1/projects', json={'title': 'New', 'description': 'd'},
+                         headers=auth_headers).status_code == 201
+    changed = projects.get('/api/v1/portfolio/projects', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.get_json()[-1]['title'] == 'New'
+
+def test_version_is_shared_through_the_file(tmp_path):
+    path = str(tmp_path / 'projects.version')
+    reader, writer = VersionCounter(path), VersionCounter(path)
+    initial = reader.value()
+    assert initial.startswith('0-')
+    bumped = writer.bump()
+    assert bumped.startswith('1-')
+    assert reader.value() == bumped
+    # A counter that starts over does not repeat an earlier version.
+    (tmp_path / 'projects.version').unlink()
+    assert VersionCounter(path).value() != initial
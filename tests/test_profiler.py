@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from profiler import SamplingProfiler
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+def parked(stop):
+    stop.wait()
+
+def samples_in(collapsed, frame):
+    """Samples whose stack passes through frame."""
+    return sum(int(line.rsplit(' ', 1)[1]) for line in collapsed.splitlines() if f';{frame}' in line)
+
+@pytest.fixture
+def threads():
+    stop = threading.Event()
+    started = [threading.Thread(target=target, args=(stop,), name=name)
+               for target, name in ((spin, 'spinner-1'), (parked, 'parked-1'))]
+    for thread in started:
+        thread.start()
+    time.sleep(0.01)
+    yield
+    stop.set()
+    for thread in started:
+        thread.join()
+
+def test_busy_stacks_are_counted_and_waiting_ones_hidden(threads):
+    profiler = SamplingProfiler()
+    for _ in range(5):
+        profiler.sample()
+    busy = profiler.collapsed()
+    assert 'spinner-N;threading.Thread._bootstrap;' in busy
+    assert samples_in(busy, 'test_profiler.spin') == 5
+    assert samples_in(busy, 'test_profiler.parked') == 0
+    assert 'test_profiler.parked;threading.Event.wait;threading.Condition.wait' in profiler.collapsed(include_idle=True)
+    assert profiler.stats()['samples'] == 5
+
+def test_stack_count_is_bounded(threads):
+    profiler = SamplingProfiler(max_stacks=1)
+    profiler.sample()
+    assert '[truncated]' in profiler.collapsed(include_idle=True)
+    # Beyond the limit, stacks are only told apart by whether they were idle.
+    assert profiler.stats()['stacks'] <= 3
+
+def test_background_sampling_starts_once_per_process(threads):
+    profiler = SamplingProfiler(enabled=True, hz=200)
+    profiler.ensure_started()
+    first = profiler._thread
+    profiler.ensure_started()
+    assert profiler._thread is first
+    time.sleep(0.1)
+    profiler.stop()
+    assert profiler.stats()['samples'] > 5
+    assert 'sampling-profiler' not in profiler.collapsed(include_idle=True)
+
+def test_disabled_profiler_never_starts():
+    profiler = SamplingProfiler(enabled=False)
+    profiler.ensure_started()
+    assert profiler.stats()['running'] is False
+
+def test_profile_endpoint(client, threads, monkeypatch):
+    monkeypatch.setenv('ADMIN_TOKEN', 'admin-secret')
+    admin = {'Authorization': 'Bearer admin-secret'}
+    assert client.get('/debug/profile').status_code == 401
+    assert client.get('/debug/profile', headers=admin).status_code == 404
+
+    profiler = SamplingProfiler(enabled=True, hz=1)
+    monkeypatch.setattr(app_module, 'profiler', profiler)
+    profiler.sample()
+    response = client.get('/debug/profile?reset=1', headers=admin)
+    profiler.stop()
+    assert response.status_code == 200
+    assert response.headers['X-Profile-Samples'] == '1'
+    assert samples_in(response.get_data(as_text=True), 'test_profiler.spin') == 1
+    assert profiler.stats()['samples'] == 0
@@ -0,0 +1,121 @@
+import threading
+
+import pytest
+
+import app as app_module
+from rate_limit import MemoryBackend, RateLimiter, SQLiteBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryBackend()
+    return SQLiteBackend(str(tmp_path / 'rate_limits.db'))
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def test_bucket_allows_a_burst_up_to_the_limit(backend, clock):
+    limiter = RateLimiter({'free': 3}, backend, clock)
+    assert [limiter.check(1, 'free')[:2] for _ in range(3)] == [(True, 2), (True, 1), (True, 0)]
+    allowed, remaining, retry_after = limiter.check(1, 'free')
+    assert (allowed, remaining) == (False, 0)
+    assert retry_after == 20
+
+def test_bucket_refills_at_the_plan_rate(backend, clock):
+    limiter = RateLimiter({'free': 60}, backend, clock)
+    for _ in range(60):
+        assert limiter.check(1, 'free')[0]
+    assert not limiter.check(1, 'free')[0]
+    clock.now += 1
+    assert limiter.check(1, 'free')[0]
+    assert not limiter.check(1, 'free')[0]
+    clock.now += 3600
+    assert limiter.check(1, 'free')[1] == 59
+
+def test_users_have_separate_buckets(backend, clock):
+    limiter = RateLimiter({'free': 1}, backend, clock)
+    assert limiter.check(1, 'free')[0]
+    assert not limiter.check(1, 'free')[0]
+    assert limiter.check(2, 'free')[0]
+
+def test_costly_requests_take_several_tokens_or_none(backend, clock):
+    limiter = RateLimiter({'free': 60}, backend, clock)
+    assert limiter.check(1, 'free', cost=50)[:2] == (True, 10)
+    allowed, remaining, retry_after = limiter.check(1, 'free', cost=20)
+    assert (allowed, remaining, retry_after) == (False, 10, 10)
+    assert limiter.check(1, 'free', cost=10)[:2] == (True, 0)
+    # More than the plan allows per minute never fits in the bucket.
+    assert limiter.check(2, 'free', cost=61) == (False, 60, None)
+    assert limiter.check(2, 'free')[:2] == (True, 59)
+
+def test_plans_set_the_capacity_and_zero_is_unlimited(clock):
+    limiter = RateLimiter({'free': 1, 'pro': 0}, clock=clock)
+    assert limiter.check(1, 'free')[0]
+    assert not limiter.check(1, 'free')[0]
+    assert all(limiter.check(2, 'pro') == (True, None, 0) for _ in range(100))
+    assert limiter.limit('unknown') == 1
+
+def test_sqlite_buckets_are_shared_between_connections(tmp_path, clock):
+    path = str(tmp_path / 'rate_limits.db')
+    limiter = RateLimiter({'free': 50}, SQLiteBackend(path), clock)
+    results = []
+
+    def worker():
+        # Each thread gets its own connection, like separate worker processes would.
+        for _ in range(20):
+            results.append(limiter.check(1, 'free')[0])
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 50
+    assert RateLimiter({'free': 50}, SQLiteBackend(path), clock).check(1, 'free')[0] is False
+
+def test_endpoint_returns_429_with_retry_after(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(app_module, 'rate_limiter', RateLimiter({'free': 2}))
+    for remaining in ('1', '0'):
+        response = client.get('/api/v1/me_api', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers['X-RateLimit-Limit'] == '2'
+        assert response.headers['X-RateLimit-Remaining'] == remaining
+    response = client.get('/api/v1/me_api', headers=auth_headers)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) == 30
+    assert 'Rate limit exceeded' in response.get_json()['error']
+
+def test_batch_items_draw_down_the_bucket(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(app_module, 'rate_limiter', RateLimiter({'free': 10}))
+    monkeypatch.setattr(app_module.google_ai, 'batch_services', lambda items, concurrency: iter([]))
+    items = [{'service': 'provide_legal_assistance', 'prompt': str(i)} for i in range(6)]
+    response = client.post('/api/v1/batch', json={'items': items}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers['X-RateLimit-Remaining'] == '4'
+    response = client.post('/api/v1/batch', json={'items': items}, headers=auth_headers)
+    assert response.status_code == 429
+    assert response.headers['X-RateLimit-Remaining'] == '4'
+    assert int(response.headers['Retry-After']) == 12
+    assert client.get('/api/v1/me_api', headers=auth_headers).headers['X-RateLimit-Remaining'] == '3'
+
+    response = client.post('/api/v1/batch', json={'items': items * 2}, headers=auth_headers)
+    assert response.status_code == 429
+    assert 'Retry-After' not in response.headers
+    assert '10 requests per minute' in response.get_json()['error']
+
+def test_lapsed_subscriptions_are_limited_as_free():
+    def user(plan, status):
+        return app_module.AuthenticatedUser(1, 'u', status, plan, None)
+    assert app_module.effective_plan(user('pro', 'active')) == 'pro'
+    assert app_module.effective_plan(user('pro', 'inactive')) == 'free'
+    assert app_module.effective_plan(user(None, 'active')) == 'free'
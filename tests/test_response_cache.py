@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+import google_ai
+from response_cache import ResponseCache, hashed_ngram_embedding
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def counting_registry(fake_models):
+    calls = []
+
+    class CountingModel(FakeListChatModel):
+        def _call(self, *args, **kwargs):
+            calls.append(1)
+            return super()._call(*args, **kwargs)
+
+    fake_models(["first answer", "second answer"], model=CountingModel)
+    return calls
+
+def test_exact_hit_ignores_whitespace():
+    cache = ResponseCache()
+    cache.put("svc", ("vertex", "m"), {"prompt": "hello   world"}, "answer")
+    assert cache.get("svc", ("vertex", "m"), {"prompt": "\nhello world  \r\n"}) == "answer"
+    assert cache.get("svc", ("vertex", "other"), {"prompt": "hello world"}) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_indentation_and_line_breaks_are_kept():
+    cache = ResponseCache()
+    code = "if ready:\n    start()\nstop()"
+    cache.put("svc", ("vertex", "m"), {"prompt": code}, "stop runs every time")
+    assert cache.get("svc", ("vertex", "m"), {"prompt": "if ready:\n    start()\n    stop()"}) is None
+    assert cache.get("svc", ("vertex", "m"), {"prompt": "if ready: start() stop()"}) is None
+    assert cache.get("svc", ("vertex", "m"), {"prompt": code + "   \n"}) == "stop runs every time"
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(ttl=10, clock=clock)
+    cache.put("svc", "m", {"prompt": "p"}, "answer")
+    clock.now = 9
+    assert cache.get("svc", "m", {"prompt": "p"}) == "answer"
+    clock.now = 11
+    assert cache.get("svc", "m", {"prompt": "p"}) is None
+    assert cache.stats()["entries"] == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("svc", "m", {"prompt": "a"}, "A")
+    cache.put("svc", "m", {"prompt": "b"}, "B")
+    cache.get("svc", "m", {"prompt": "a"})
+    cache.put("svc", "m", {"prompt": "c"}, "C")
+    assert cache.get("svc", "m", {"prompt": "b"}) is None
+    assert cache.get("svc", "m", {"prompt": "a"}) == "A"
+    assert cache.stats()["evictions"] == 1
+
+def test_semantic_tier_matches_near_duplicates_only():
+    cache = ResponseCache(semantic_threshold=0.85)
+    cache.put("svc", "m", {"prompt": "How do I register a company in Togo?"}, "answer")
+    assert cache.get("svc", "m", {"prompt": "how do I register a company in Togo"}) == "answer"
+    assert cache.get("svc", "m", {"prompt": "What is the weather in Lome today?"}) is None
+    assert cache.stats()["semantic_hits"] == 1
+
+def test_semantic_tier_skips_multi_input_services():
+    cache = ResponseCache(semantic_threshold=0.5)
+    cache.put("svc", "m", {"text": "hello there", "target_language": "French"}, "bonjour")
+    assert cache.get("svc", "m", {"text": "hello there!", "target_language": "German"}) is None
+
+def test_embedding_is_normalized():
+    vector = hashed_ngram_embedding("some prompt")
+    assert abs(sum(v * v for v in vector) - 1.0) < 1e-9
+
+def test_run_service_serves_repeats_from_cache(counting_registry):
+    assert google_ai.run_service("provide_legal_assistance", "contract") == "first answer"
+    assert google_ai.run_service("provide_legal_assistance", "contract ") == "first answer"
+    assert google_ai.run_service("provide_fintech_assistance", "contract") == "second answer"
+    assert len(counting_registry) == 2
+
+def test_async_and_stream_paths_share_the_cache(counting_registry):
+    assert "".join(google_ai.stream_service("provide_legal_assistance", "contract")) == "first answer"
+    assert asyncio.run(google_ai.arun_service("provide_legal_assistance", "contract")) == "first answer"
+    stats = google_ai.response_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+def test_opted_out_service_is_not_cached(counting_registry):
+    google_ai.debug_code("print(1)", "python")
+    google_ai.debug_code("print(1)", "python")
+    assert len(counting_registry) == 2
+
+def test_errors_are_not_cached(fake_models):
+    def broken(model_name):
+        raise RuntimeError("provider down")
+
+    fake_models(vertex=broken)
+    assert google_ai.run_service("provide_legal_assistance", "x").endswith("provider down")
+    assert google_ai.response_cache.stats()["entries"] == 0
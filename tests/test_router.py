@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+import google_ai
+from background_loop import run_sync
+from router import CircuitBreaker, ModelRouter, ProviderUnavailable, parse_fallbacks
+
+GEMINI = ("vertex", "gemini-1.5-flash")
+CLAUDE = ("anthropic", "claude-3-5-sonnet-20240620")
+LLAMA = ("nvidia", "meta/llama-3.1-405b-instruct")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def broken(*args):
+    raise RuntimeError("provider down")
+
+def test_parse_fallbacks():
+    chains = parse_fallbacks("vertex:gemini-1.5-flash>anthropic:claude-3-5-sonnet-20240620>nvidia:meta/llama-3.1-405b-instruct;"
+                             "openai:gpt-4o>vertex:gemini-1.5-flash")
+    assert chains[GEMINI] == [CLAUDE, LLAMA]
+    assert chains[("openai", "gpt-4o")] == [GEMINI]
+
+def test_breaker_opens_after_consecutive_failures_and_probes_once():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, recovery_time=30, clock=clock)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+def test_cancelled_probe_lets_the_next_call_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=1, clock=clock)
+    breaker.record_failure()
+    clock.now += 1
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+def test_call_fails_over_along_the_chain():
+    router = ModelRouter({GEMINI: [CLAUDE, LLAMA]})
+    tried = []
+
+    def attempt(provider, model_name):
+        tried.append(provider)
+        if provider != "nvidia":
+            raise RuntimeError(f"{provider} down")
+        return "llama answer"
+
+    assert router.call(GEMINI, attempt) == "llama answer"
+    assert tried == ["vertex", "anthropic", "nvidia"]
+    assert router.stats()["reroutes"] == 2
+    assert router.stats()["providers"]["vertex"]["failures"] == 1
+
+def test_first_error_is_raised_when_every_model_fails():
+    router = ModelRouter({GEMINI: [CLAUDE]})
+    calls = iter([RuntimeError("vertex down"), RuntimeError("anthropic down")])
+
+    def attempt(provider, model_name):
+        raise next(calls)
+
+    with pytest.raises(RuntimeError, match="vertex down"):
+        router.call(GEMINI, attempt)
+
+def test_open_circuit_is_skipped_without_a_call():
+    router = ModelRouter({GEMINI: [CLAUDE]}, failure_threshold=2)
+    for _ in range(2):
+        router.record("vertex", False)
+    tried = []
+    assert router.call(GEMINI, lambda provider, name: tried.append(provider) or "claude answer") == "claude answer"
+    assert tried == ["anthropic"]
+
+def test_fail_fast_when_every_circuit_is_open():
+    router = ModelRouter({GEMINI: [CLAUDE]}, failure_threshold=1)
+    router.record("vertex", False)
+    router.record("anthropic", False)
+    with pytest.raises(ProviderUnavailable, match="circuit open for vertex, anthropic"):
+        router.call(GEMINI, broken)
+
+def test_unhealthy_providers_are_tried_last():
+    router = ModelRouter({GEMINI: [CLAUDE, LLAMA]}, failure_threshold=100, latency_target=1)
+    for _ in range(10):
+        router.record("vertex", True, latency=20)
+    assert router.health("vertex").score < 0.25
+    assert router.plan(GEMINI) == [CLAUDE, LLAMA, GEMINI]
+    assert router.plan(GEMINI, fallbacks=False) == [GEMINI]
+
+def test_async_call_fails_over_and_releases_on_cancel():
+    router = ModelRouter({GEMINI: [CLAUDE]}, failure_threshold=1, recovery_time=0)
+    router.record("vertex", False)
+
+    async def hang(provider, model_name):
+        await asyncio.sleep(10)
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(router.acall(GEMINI, hang), 0.01)
+        # The cancelled half-open probe did not count as a verdict, so vertex can be probed again.
+        return router.breaker("vertex").allow()
+
+    assert asyncio.run(main())
+
+def test_personas_fail_over_to_claude(fake_models, monkeypatch):
+    fake_models(["claude answer"], providers=("anthropic",), vertex=broken)
+    monkeypatch.setattr(google_ai, "model_router", ModelRouter({GEMINI: [CLAUDE]}))
+    assert google_ai.provide_legal_assistance("contract") == "claude answer"
+    assert run_sync(google_ai.arun_service("provide_fintech_assistance", "open banking")) == "claude answer"
+    assert "".join(google_ai.stream_service("provide_biotech_assistance", "crispr")) == "claude answer"
+    assert google_ai.model_router.stats()["providers"]["vertex"]["failures"] == 3
+
+def test_persona_fails_fast_while_the_circuit_is_open(fake_models, monkeypatch):
+    calls = []
+
+    def counting_broken(model_name):
+        calls.append(model_name)
+        raise RuntimeError("provider down")
+
+    fake_models(vertex=counting_broken)
+    monkeypatch.setattr(google_ai, "model_router", ModelRouter({}, failure_threshold=2))
+    assert google_ai.provide_iaas_assistance("a") == "Error: provider down"
+    assert google_ai.provide_iaas_assistance("b") == "Error: provider down"
+    assert google_ai.provide_iaas_assistance("c") == "Error: circuit open for vertex"
+    assert len(calls) == 2
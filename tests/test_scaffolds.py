@@ -0,0 +1,71 @@
+import io
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+import app as app_module
+from app import app, app_scaffold, backend_scaffold, game_scaffold, generate_game, generate_website, website_scaffold
+from scaffolds import scaffold
+
+
+@pytest.fixture(autouse=True)
+def fresh_scaffolds():
+    for project in (game_scaffold, app_scaffold, backend_scaffold, website_scaffold):
+        project.clear()
+
+def test_fields_are_joined_into_the_precompiled_parts():
+    calls = []
+
+    @scaffold('name')
+    def greeting(name):
+        calls.append(name)
+        return 'Files for {name}'.format(name=name), {'index.html': f'\n<h1>{name}</h1>\n', 'notes': 'plain'}
+
+    assert greeting.message(name='Ada') == 'Files for Ada\n**index.html:**\n```html\n<h1>Ada</h1>\n```\n**notes:**\n```\nplain\n```'
+    assert greeting.files(name='{x}') == {'index.html': '<h1>{x}</h1>', 'notes': 'plain'}
+    # Rendered once, with a marker instead of the value.
+    assert calls == ['\x00name\x00']
+
+def test_game_is_compiled_once_per_locale():
+    with patch('app._', wraps=app_module._) as gettext:
+        with app.test_request_context(headers={'Accept-Language': 'es'}):
+            spanish = generate_game('name: Space Quest')
+            generate_game('description: again')
+        with app.test_request_context(headers={'Accept-Language': 'en'}):
+            english = generate_game('')
+        translated = gettext.call_count
+        with app.test_request_context(headers={'Accept-Language': 'es'}):
+            generate_game('name: Third')
+    assert gettext.call_count == translated
+    assert spanish.startswith('Aquí tienes el código generado para tu juego.')
+    assert '<h1>Space Quest</h1>' in spanish
+    assert '<h1>Guess the Number</h1>' in english
+
+def test_website_sections_and_errors():
+    with app.test_request_context():
+        page = generate_website('title: Shop\nsection: Hello\n  text: Welcome\n  images: 2')
+        assert "<title>Shop</title>" in page
+        assert page.count("<img src='https://via.placeholder.com/150'") == 2
+        assert "alt='placeholder image 2'" in page
+        assert generate_website('section: A\n  images: 11') == 'Error on line 2: Number of images must be between 0 and 10.'
+
+def test_zip_download(client, auth_headers):
+    response = client.post('/api/v1/develop/game?format=zip', json={'prompt': 'name: Space Quest'},
+                           headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+    assert 'filename=Space_Quest.zip' in response.headers['Content-Disposition']
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        assert archive.namelist() == ['index.html', 'style.css', 'script.js']
+        assert '<h1>Space Quest</h1>' in archive.read('index.html').decode()
+
+    backend = client.post('/api/v1/develop/backend?format=zip', json={'prompt': 'route: /ping'}, headers=auth_headers)
+    assert 'filename=backend.zip' in backend.headers['Content-Disposition']
+    with zipfile.ZipFile(io.BytesIO(backend.data)) as archive:
+        assert "@app.route('/ping'" in archive.read('backend.py').decode()
+
+def test_bundles_are_reproducible():
+    with app.test_request_context():
+        values = game_scaffold.values('name: Same')
+        assert game_scaffold.bundle(**values) == game_scaffold.bundle(**values)
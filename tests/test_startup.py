@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from bootstrap import once
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Top-level packages of the provider SDKs that must stay out of a cold start.
+PROVIDER_SDKS = {
+    'vertexai', 'langchain', 'langchain_core', 'langchain_google_vertexai', 'langchain_openai',
+    'langchain_anthropic', 'langchain_nvidia_ai_endpoints', 'llama_index', 'openai', 'anthropic',
+    'facebook_business', 'stripe',
+}
+
+def run_python(code, tmp_path):
+    """Runs code in a fresh interpreter with its own instance folder and an in-memory database."""
+    env = dict(os.environ, INSTANCE_PATH=str(tmp_path), DATABASE_URL='sqlite://')
+    return subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, env=env,
+                          capture_output=True, text=True, timeout=120, check=True)
+
+def loaded_packages(code, tmp_path):
+    """Top-level packages in sys.modules after running code."""
+    listing = "\nprint(' '.join(sorted({name.split('.')[0] for name in sys.modules})))\n"
+    result = run_python("import sys\n" + code + listing, tmp_path)
+    return set(result.stdout.split())
+
+def test_importing_app_loads_no_provider_sdk(tmp_path):
+    packages = loaded_packages("import app", tmp_path)
+    assert 'app' in packages
+    assert not packages & PROVIDER_SDKS
+
+def test_public_pages_serve_without_provider_sdks(tmp_path):
+    packages = loaded_packages(
+        "from app import app, db\n"
+        "with app.app_context():\n"
+        "    db.create_all()\n"
+        "client = app.test_client()\n"
+        "for path in ('/', '/api/config', '/api/v1/portfolio/projects'):\n"
+        "    assert client.get(path).status_code == 200, path\n",
+        tmp_path,
+    )
+    assert not packages & PROVIDER_SDKS
+
+def test_once_runs_initializer_a_single_time():
+    calls = []
+
+    @once
+    def initialize():
+        calls.append(1)
+        return 'ready'
+
+    assert initialize() == initialize() == 'ready'
+    assert calls == [1]
+    assert initialize.done()
+
+def test_once_retries_after_a_failure():
+    attempts = []
+
+    @once
+    def initialize():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError('credentials not ready')
+        return 'ready'
+
+    with pytest.raises(RuntimeError):
+        initialize()
+    assert not initialize.done()
+    assert initialize() == 'ready'
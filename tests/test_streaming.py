@@ -0,0 +1,49 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+
+def parse_sse(body):
+    events = []
+    for raw_event in body.decode().strip().split('\n\n'):
+        event_type, data = 'message', None
+        for line in raw_event.split('\n'):
+            if line.startswith('event:'):
+                event_type = line[len('event:'):].strip()
+            elif line.startswith('data:'):
+                data = json.loads(line[len('data:'):])
+        events.append((event_type, data))
+    return events
+
+@pytest.fixture
+def fake_registry(fake_models):
+    return fake_models(["  streamed answer"])
+
+def test_stream_query_parameter_sends_tokens(client, auth_headers, fake_registry):
+    response = client.post('/api/v1/legal/assistance?stream=1',
+                           json={'prompt': 'contract review'},
+                           headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    events = parse_sse(response.data)
+    assert events[-1] == ('done', {'status': 'success'})
+    tokens = [data['token'] for event_type, data in events[:-1]]
+    assert len(tokens) > 1
+    assert ''.join(tokens) == 'streamed answer'
+
+def test_accept_header_selects_stream(client, auth_headers, fake_registry):
+    headers = dict(auth_headers, Accept='text/event-stream')
+    response = client.post('/api/v1/fintech/assistance', json={'prompt': 'payments'}, headers=headers)
+    assert response.mimetype == 'text/event-stream'
+
+def test_default_response_is_still_json(client, auth_headers, fake_registry):
+    response = client.post('/api/v1/legal/assistance', json={'prompt': 'contract review'}, headers=auth_headers)
+    assert response.json == {'status': 'success', 'message': 'streamed answer'}
+
+@patch('google_ai.provide_legal_assistance')
+def test_non_persona_service_streams_single_chunk(mock_gen, client, auth_headers):
+    mock_gen.return_value = 'Mock legal response'
+    response = client.post('/api/v1/legal/assistance?stream=1', json={'prompt': 'x'}, headers=auth_headers)
+    events = parse_sse(response.data)
+    assert events == [('message', {'token': 'Mock legal response'}), ('done', {'status': 'success'})]
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from background_loop import run_sync
+from tracing import NOOP_SPAN, OTLPExporter, RingBufferExporter, Tracer
+
+
+def spans_by_name(trace):
+    spans = {}
+    for span in trace['spans']:
+        spans.setdefault(span['name'], []).append(span)
+    return spans
+
+def test_nested_spans_form_one_trace():
+    buffer = RingBufferExporter()
+    tracer = Tracer([buffer])
+    with tracer.span('request') as root:
+        with tracer.span('auth'):
+            pass
+        with pytest.raises(ValueError):
+            with tracer.span('llm.call', provider='vertex'):
+                raise ValueError('bad answer')
+        assert buffer.traces() == []
+
+    trace = buffer.get(root.trace_id)
+    spans = spans_by_name(trace)
+    assert trace['name'] == 'request'
+    assert spans['auth'][0]['parent_id'] == root.span_id
+    assert spans['llm.call'][0]['error'] == 'ValueError: bad answer'
+    assert spans['llm.call'][0]['attributes'] == {'provider': 'vertex'}
+    assert buffer.traces()[0]['errors'] == 1
+
+def test_children_follow_coroutines_onto_the_background_loop():
+    buffer = RingBufferExporter()
+    tracer = Tracer([buffer])
+
+    async def work():
+        async def member(name):
+            with tracer.span(name):
+                await asyncio.sleep(0)
+        await asyncio.gather(member('a'), member('b'))
+
+    with tracer.span('request') as root:
+        run_sync(work())
+    assert {span['parent_id'] for span in buffer.get(root.trace_id)['spans'][1:]} == {root.span_id}
+
+def test_unsampled_requests_record_nothing():
+    buffer = RingBufferExporter()
+    tracer = Tracer([buffer], sample_rate=0)
+    with tracer.span('request') as root:
+        assert tracer.start_span('child') is NOOP_SPAN
+    assert root is NOOP_SPAN and buffer.traces() == []
+
+def test_traceparent_is_continued_only_when_sampled(monkeypatch):
+    buffer = RingBufferExporter()
+    tracer = Tracer([buffer], sample_rate=0.5)
+    sampled, unsampled = ('00-' + 'a' * 32 + '-' + 'b' * 16 + flags for flags in ('-01', '-00'))
+    monkeypatch.setattr('tracing.random.random', lambda: 0.1)
+    assert tracer.start_span('request', traceparent=unsampled) is NOOP_SPAN
+    span = tracer.start_span('request', traceparent=sampled)
+    span.end()
+    assert buffer.get('a' * 32)['spans'][0]['parent_id'] == 'b' * 16
+    # The caller's sampled flag does not bypass our own sample rate.
+    monkeypatch.setattr('tracing.random.random', lambda: 0.9)
+    assert tracer.start_span('request', traceparent=sampled) is NOOP_SPAN
+
+def test_spans_ending_on_many_threads_are_all_exported():
+    buffer = RingBufferExporter()
+    tracer = Tracer([buffer])
+    root = tracer.start_span('request')
+    token = tracer.activate(root)
+    children = [tracer.start_span(f'child {i}') for i in range(200)]
+    tracer.deactivate(token)
+    threads = [threading.Thread(target=child.end) for child in children]
+    for thread in threads:
+        thread.start()
+    root.end()
+    for thread in threads:
+        thread.join()
+    assert len(buffer.get(root.trace_id)['spans']) == 201
+
+def test_ring_buffer_keeps_the_newest_traces():
+    buffer = RingBufferExporter(capacity=2)
+    tracer = Tracer([buffer])
+    for name in ('first', 'second', 'third'):
+        tracer.start_span(name).end()
+    assert [trace['name'] for trace in buffer.traces()] == ['third', 'second']
+
+def test_otlp_payload():
+    tracer = Tracer([])
+    with tracer.span('request', kind='server') as root:
+        child = tracer.start_span('llm.call', provider='openai', attempt=1)
+        child.end(RuntimeError('down'))
+    spans = OTLPExporter('http://collector:4318/').payload([root, child])['resourceSpans'][0]['scopeSpans'][0]['spans']
+    assert spans[0]['kind'] == 2 and 'parentSpanId' not in spans[0]
+    assert spans[1]['parentSpanId'] == root.span_id
+    assert spans[1]['status'] == {'code': 2, 'message': 'RuntimeError: down'}
+    assert {'key': 'attempt', 'value': {'intValue': '1'}} in spans[1]['attributes']
+    assert int(spans[1]['endTimeUnixNano']) >= int(spans[1]['startTimeUnixNano'])
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setenv('ADMIN_TOKEN', 'admin-secret')
+    return {'Authorization': 'Bearer admin-secret'}
+
+def test_debug_traces_need_the_admin_token(client, monkeypatch):
+    assert client.get('/debug/traces').status_code == 404
+    monkeypatch.setenv('ADMIN_TOKEN', 'admin-secret')
+    assert client.get('/debug/traces', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+def test_conflict_debug_request_is_traced_end_to_end(client, auth_headers, admin, fake_models):
+    fake_models(['panel answer'], providers=('vertex', 'openai', 'anthropic', 'nvidia'))
+    response = client.post('/api/v1/conflict-debug/assistance', data=json.dumps({'prompt': 'merge conflict'}),
+                           content_type='application/json', headers=auth_headers)
+    assert response.status_code == 200
+    trace_id = response.headers['X-Trace-Id']
+
+    listed = client.get('/debug/traces', headers=admin).get_json()['traces']
+    assert listed[0]['trace_id'] == trace_id
+    trace = client.get(f'/debug/traces/{trace_id}', headers=admin).get_json()['trace']
+    assert trace['name'] == 'POST /api/v1/conflict-debug/assistance'
+    spans = spans_by_name(trace)
+    ids = {span['name']: span['span_id'] for span in trace['spans']}
+    assert spans['auth'][0]['parent_id'] == ids['POST /api/v1/conflict-debug/assistance']
+    panel = [span for span in spans['llm.call'] if span['parent_id'] != ids['conflict_debug.synthesis']]
+    assert {span['attributes']['provider'] for span in panel} == {'vertex', 'openai', 'anthropic', 'nvidia'}
+    synthesis = [span for span in spans['llm.call'] if span['parent_id'] == ids['conflict_debug.synthesis']]
+    assert len(synthesis) == 1
+    assert 'prompt.build' in spans and 'response.serialize' in spans
+    assert client.get('/debug/traces/unknown', headers=admin).status_code == 404
+
+def test_streamed_response_keeps_its_trace_open_until_the_body_ends(client, auth_headers, admin, fake_models):
+    fake_models(['streamed answer'])
+    response = client.post('/api/v1/legal/assistance?stream=1', data=json.dumps({'prompt': 'contract'}),
+                           content_type='application/json', headers=auth_headers)
+    assert 'streamed answer' in ''.join(
+        json.loads(line[6:])['token'] for line in response.get_data(as_text=True).splitlines()
+        if line.startswith('data: {"token"'))
+    response.close()
+    trace = client.get(f"/debug/traces/{response.headers['X-Trace-Id']}", headers=admin).get_json()['trace']
+    spans = spans_by_name(trace)
+    assert spans['llm.stream'][0]['attributes']['provider'] == 'vertex'
+    assert spans['llm.stream'][0]['parent_id'] == trace['spans'][0]['span_id']
+    assert trace['duration_ms'] >= spans['llm.stream'][0]['duration_ms']
@@ -0,0 +1,147 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app import app, apply_stripe_event, db, db_writes, Payment, start_webhook_applier, StripeEvent, stripe_events, User
+from webhooks import EventApplier
+
+
+def payment_event(event_id, payment_id, kind='payment_intent.succeeded', created=1):
+    return {
+        'id': event_id,
+        'created': created,
+        'type': kind,
+        'data': {'object': {'id': f'pi_{event_id}', 'metadata': {'payment_id': str(payment_id)}}},
+    }
+
+@pytest.fixture
+def payments(client):
+    with app.app_context():
+        user_id = User.query.filter_by(username='testuser').first().id
+        rows = [Payment(user_id=user_id, amount=100, currency='usd', status='pending') for _ in range(3)]
+        db.session.add_all(rows)
+        db.session.commit()
+        yield [row.id for row in rows]
+
+@pytest.fixture
+def applier(monkeypatch):
+    clock = [1000.0]
+    applied = []
+    started = []
+    applier = EventApplier(app, db, db_writes, StripeEvent, apply_stripe_event, applied.extend,
+                           max_attempts=3, retry_delay=60, clock=lambda: clock[0])
+    # Tests apply events explicitly instead of from the background thread.
+    monkeypatch.setattr(applier, 'ensure_started', lambda: started.append(True))
+    applier.clock_value, applier.applied, applier.started = clock, applied, started
+    return applier
+
+def record(applier, event):
+    return applier.record(event['id'], event['type'], json.dumps(event), event['created'])
+
+def statuses():
+    return dict(db.session.query(Payment.id, Payment.status).all())
+
+def test_retried_deliveries_are_recorded_once(payments, applier):
+    event = payment_event('evt_1', payments[0])
+    assert record(applier, event) is True
+    assert record(applier, event) is False
+    assert applier.drain() == 1
+    assert record(applier, event) is False
+    assert applier.drain() == 0
+    assert statuses()[payments[0]] == 'succeeded'
+    assert applier.stats() == {'events': {'applied': 1}, 'batches': 1, 'duplicates': 2}
+
+def test_pending_events_are_applied_in_one_batch(payments, applier):
+    # Stripe's creation order wins over arrival order.
+    record(applier, payment_event('evt_late', payments[0], 'payment_intent.payment_failed', created=2))
+    record(applier, payment_event('evt_early', payments[0], created=1))
+    record(applier, payment_event('evt_other', payments[1]))
+    assert applier.drain() == 3
+    assert applier.batches == 1
+    assert statuses() == {payments[0]: 'failed', payments[1]: 'succeeded', payments[2]: 'pending'}
+
+def test_an_event_that_cannot_be_applied_does_not_undo_the_batch(client, payments, applier):
+    with app.app_context():
+        user_id = User.query.filter_by(username='testuser').first().id
+    checkout = {'id': 'evt_checkout', 'created': 1, 'type': 'checkout.session.completed',
+                'data': {'object': {'client_reference_id': str(user_id), 'customer': 'cus_1', 'metadata': {}}}}
+    record(applier, checkout)
+    record(applier, payment_event('evt_bad', 'not-a-number'))
+    record(applier, payment_event('evt_good', payments[2]))
+    assert applier.drain() == 3
+    held_back = db.session.get(StripeEvent, 'evt_bad')
+    assert (held_back.status, held_back.attempts) == ('pending', 1) and 'not-a-number' in held_back.error
+    assert statuses()[payments[2]] == 'succeeded'
+    assert db.session.get(User, user_id).subscription_plan == 'premium'
+    assert applier.applied == [user_id]
+
+def test_old_applied_events_are_purged(payments, applier):
+    record(applier, payment_event('evt_old', payments[0]))
+    applier.drain()
+    record(applier, payment_event('evt_pending', payments[1]))
+    applier.clock_value[0] += applier.retention + 1
+    assert applier.purge() == 1
+    assert applier.stats()['events'] == {'pending': 1}
+
+def test_webhook_acknowledges_and_applies_in_the_background(client, payments, monkeypatch):
+    monkeypatch.setenv('STRIPE_WEBHOOK_SECRET', 'whsec_test')
+    event = payment_event('evt_route', payments[0])
+    with patch('stripe.Webhook.construct_event', return_value=event):
+        first = client.post('/api/v1/payment/webhook', data=json.dumps(event))
+        retry = client.post('/api/v1/payment/webhook', data=json.dumps(event))
+    assert (first.get_json()['duplicate'], retry.get_json()['duplicate']) == (False, True)
+    stripe_events.drain()
+    assert statuses()[payments[0]] == 'succeeded'
+    assert stripe_events.stats()['events'] == {'applied': 1}
+
+def test_duplicates_wake_the_applier(payments, applier):
+    event = payment_event('evt_1', payments[0])
+    record(applier, event)
+    applier.started.clear()
+    applier._wakeup.clear()
+    # A process that recorded the event died before applying it; Stripe's retry is all that arrives.
+    assert record(applier, event) is False
+    assert applier.started and applier._wakeup.is_set()
+
+def test_failed_events_are_retried_with_backoff(payments, applier):
+    record(applier, payment_event('evt_bad', 'not-a-number'))
+    retries = []
+    for _ in range(3):
+        assert applier.drain() == 1
+        assert applier.drain() == 0
+        event = db.session.get(StripeEvent, 'evt_bad')
+        db.session.expire(event)
+        if event.status == 'pending':
+            retries.append(event.retry_at - applier.clock_value[0])
+            applier.clock_value[0] = event.retry_at
+    assert retries == [60, 120]
+    assert (event.status, event.attempts) == ('failed', 3)
+    assert applier.drain() == 0
+
+def test_failed_events_can_be_requeued(payments, applier):
+    record(applier, payment_event('evt_bad', payments[0]))
+    record(applier, payment_event('evt_other', payments[1]))
+    db.session.query(StripeEvent).update({'status': 'failed', 'attempts': 3})
+    db.session.commit()
+    assert applier.requeue_failed(['evt_bad']) == 1
+    assert applier.drain() == 1
+    assert statuses()[payments[0]] == 'succeeded'
+    assert applier.requeue_failed() == 1
+    assert applier.drain() == 1
+    assert applier.stats()['events'] == {'applied': 2}
+
+def test_the_applier_starts_with_the_worker(client, monkeypatch):
+    start_webhook_applier()
+    assert stripe_events._thread is None
+    monkeypatch.setitem(app.config, 'TESTING', False)
+    start_webhook_applier()
+    assert stripe_events._thread.is_alive()
+
+def test_requeue_command(payments, applier):
+    record(applier, payment_event('evt_bad', payments[0]))
+    db.session.query(StripeEvent).update({'status': 'failed', 'attempts': 3})
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=['requeue-stripe-events', 'evt_bad'])
+    assert 'Requeued 1 failed Stripe events.' in result.output
+    assert applier.stats()['events'] == {'pending': 1}
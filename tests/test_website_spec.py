@@ -0,0 +1,117 @@
+import random
+
+from app import app, generate_website
+from website_spec import (IMAGES_OUT_OF_RANGE, INVALID_FORMAT, INVALID_IMAGES, OUTSIDE_SECTION, SpecError,
+                          emit_main, parse)
+
+IMAGE_TAGS = [f'[{count} images]\n' for count in range(11)]
+
+
+def reference(spec):
+    """The original line-by-line parser: the first error as (kind, line), or the <main> markup."""
+    sections, current = [], None
+    for number, line in enumerate(spec.splitlines(), 1):
+        if not line.strip():
+            continue
+        indentation = len(line) - len(line.lstrip(' '))
+        try:
+            key, value = line.strip().split(':', 1)
+        except ValueError:
+            return (INVALID_FORMAT, number)
+        key, value = key.strip().lower(), value.strip()
+        if indentation == 0:
+            current = None
+            if key == 'section':
+                current = {'title': value, 'content': {}}
+                sections.append(current)
+        elif current is not None:
+            current['content'][key] = (value, number)
+        else:
+            return (OUTSIDE_SECTION, number)
+    main = ''
+    for section in sections:
+        main += f"    <section>\n      <h2>{section['title']}</h2>\n"
+        if 'text' in section['content']:
+            main += f"      <p>{section['content']['text'][0]}</p>\n"
+        if 'images' in section['content']:
+            value, number = section['content']['images']
+            try:
+                count = int(value)
+            except ValueError:
+                return (INVALID_IMAGES, number)
+            if not 0 <= count <= 10:
+                return (IMAGES_OUT_OF_RANGE, number)
+            main += IMAGE_TAGS[count] if count else ''
+        main += "    </section>\n"
+    return main
+
+def random_spec(rng, sections):
+    keys = ['text', 'images', 'Text', 'alt', 'images']
+    values = ['hello', 'a: b', ' spaced ', '3', '0', '10', '11', '-1', 'x', '', '1_0']
+    lines = [f'title: {rng.choice(values)}']
+    for i in range(sections):
+        lines.append(f'section: S{i}')
+        for _ in range(rng.randrange(4)):
+            line = f"{' ' * rng.randrange(1, 5)}{rng.choice(keys)}: {rng.choice(values)}"
+            roll = rng.random()
+            if roll < 0.02:
+                line = line.replace(':', '')
+            elif roll < 0.04:
+                line = line.lstrip()
+            elif roll < 0.06:
+                line = '\t' + line
+            lines.append(line)
+        if rng.random() < 0.05:
+            lines.append(rng.choice(['', '   ', 'footer: bye', '  orphan: true']))
+    return '\n'.join(lines)
+
+def test_spec_becomes_a_tree():
+    site, errors = parse('title: Shop\nheader: Hi\nsection: One\n  text: First\n  images: 2\nsection: Two\nfooter: Bye')
+    assert errors == []
+    assert (site.title, site.header, site.footer) == ('Shop', 'Hi', 'Bye')
+    assert [(section.title, section.line, section.text, section.images) for section in site.sections] == \
+        [('One', 3, 'First', 2), ('Two', 6, None, 0)]
+    assert emit_main(site, IMAGE_TAGS) == \
+        '    <section>\n      <h2>One</h2>\n      <p>First</p>\n[2 images]\n    </section>\n' \
+        '    <section>\n      <h2>Two</h2>\n    </section>\n'
+
+def test_every_error_is_reported_with_its_line():
+    spec = 'section: A\n  images: many\nno colon here\nsection: B\n  images: 3\n  images: 12\ntitle: x\n  text: lost'
+    assert parse(spec)[1] == [SpecError(2, INVALID_IMAGES), SpecError(3, INVALID_FORMAT),
+                              SpecError(6, IMAGES_OUT_OF_RANGE), SpecError(8, OUTSIDE_SECTION)]
+
+def test_generate_website_lists_all_errors():
+    with app.test_request_context(headers={'Accept-Language': 'en'}):
+        message = generate_website('section: A\n  images: 11\n  text\n')
+    assert message == ("Error on line 2: Number of images must be between 0 and 10.\n"
+                       "Error on line 3: Invalid format. Each line must be in 'key: value' format.")
+
+def test_fuzzed_specs_match_the_original_parser():
+    rng = random.Random(25)
+    outcomes = set()
+    for _ in range(500):
+        spec = random_spec(rng, rng.randrange(1, 30))
+        site, errors = parse(spec)
+        expected = reference(spec)
+        if isinstance(expected, tuple):
+            # The original stopped at its first error; it must be among the ones reported.
+            assert SpecError(expected[1], expected[0]) in errors, spec
+            outcomes.add(expected[0])
+        else:
+            assert errors == [], spec
+            assert emit_main(site, IMAGE_TAGS) == expected, spec
+            outcomes.add('valid')
+    assert outcomes == {'valid', INVALID_FORMAT, OUTSIDE_SECTION, INVALID_IMAGES, IMAGES_OUT_OF_RANGE}
+
+def test_thousands_of_sections():
+    rng = random.Random(2024)
+    spec = random_spec(rng, 5000)
+    site, errors = parse(spec)
+    lines = spec.splitlines()
+    assert all(1 <= error.line <= len(lines) for error in errors)
+    assert [error.line for error in errors] == sorted(error.line for error in errors)
+    assert len(site.sections) == 5000
+    clean = '\n'.join(f'section: S{i}\n  text: t{i}\n  images: {i % 11}' for i in range(5000))
+    site, errors = parse(clean)
+    assert errors == []
+    assert emit_main(site, IMAGE_TAGS) == reference(clean)
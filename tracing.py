@@ -0,0 +1,363 @@
+"""
+Request tracing.
+
+A trace is the tree of spans of one request: the Flask route, authentication, each
+service call with its prompt build and provider attempts, the provider HTTP requests
+and the response serialization. The current span lives in a context variable, so
+coroutines scheduled on the background loop and tasks fanned out from them become
+children of the span that started them.
+
+Finished traces go to the in-process ring buffer behind /debug/traces and, when
+OTEL_EXPORTER_OTLP_ENDPOINT is set, to an OpenTelemetry collector over OTLP/HTTP (JSON
+encoding, so no OpenTelemetry SDK is needed). TRACE_SAMPLE_RATE keeps only a share of
+the requests. An inbound traceparent is continued only when its caller sampled it (flag
+01), and the sample rate still applies, so clients cannot force their requests into the
+buffer or the collector.
+"""
+import contextvars
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar("current_span", default=None)
+
+# W3C trace context header: version-trace_id-parent_id-flags.
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+SAMPLED_FLAG = 0x01
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "attributes", "start", "duration",
+                 "error", "_started", "_trace")
+
+    def __init__(self, name, trace_id, parent_id, kind, attributes, trace):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration = None
+        self.error = None
+        self._started = time.perf_counter()
+        self._trace = trace
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self, error=None):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self._trace.finish(self)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stands in for the spans of requests that were not sampled, and for their children."""
+    trace_id = None
+
+    def set(self, **attributes):
+        pass
+
+    def end(self, error=None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Trace:
+    def __init__(self, tracer, root_id):
+        self.tracer = tracer
+        self.root_id = root_id
+        self.spans = []
+        self.done = False
+        # Spans end on request threads and on the background loop.
+        self._lock = threading.Lock()
+
+    def finish(self, span):
+        with self._lock:
+            if self.done:
+                # Ended after its request, e.g. a stream drained after the response started.
+                spans = [span]
+            elif span.span_id == self.root_id:
+                self.done = True
+                self.spans.append(span)
+                spans = self.spans
+            else:
+                self.spans.append(span)
+                return
+        self.tracer.export(spans)
+
+
+class RingBufferExporter:
+    """Keeps the spans of the last `capacity` traces in memory."""
+
+    def __init__(self, capacity=200):
+        self.capacity = capacity
+        self._traces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        with self._lock:
+            for span in spans:
+                if span.trace_id not in self._traces:
+                    self._traces[span.trace_id] = []
+                    while len(self._traces) > self.capacity:
+                        self._traces.popitem(last=False)
+                self._traces[span.trace_id].append(span)
+
+    def get(self, trace_id):
+        with self._lock:
+            spans = list(self._traces.get(trace_id, ()))
+        return _summary(trace_id, spans, with_spans=True) if spans else None
+
+    def traces(self, limit=50, min_duration=0.0):
+        """Newest first, skipping traces whose root took less than min_duration seconds."""
+        with self._lock:
+            items = [(trace_id, list(spans)) for trace_id, spans in reversed(self._traces.items())]
+        result = []
+        for trace_id, spans in items:
+            summary = _summary(trace_id, spans)
+            if (summary["duration_ms"] or 0) >= min_duration * 1000:
+                result.append(summary)
+            if len(result) >= limit:
+                break
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+
+def _summary(trace_id, spans, with_spans=False):
+    ids = {span.span_id for span in spans}
+    root = next((span for span in spans if span.parent_id not in ids), spans[0])
+    summary = {
+        "trace_id": trace_id,
+        "name": root.name,
+        "start": root.start,
+        "duration_ms": round(root.duration * 1000, 3) if root.duration is not None else None,
+        "spans": len(spans),
+        "errors": sum(span.error is not None for span in spans),
+    }
+    if with_spans:
+        summary["spans"] = [span.to_dict() for span in sorted(spans, key=lambda span: span.start)]
+    return summary
+
+
+class OTLPExporter:
+    """
+    Sends spans to an OpenTelemetry collector (OTLP/HTTP with JSON bodies) from a
+    background thread, in batches, so requests never wait on the collector. Spans are
+    dropped when the queue is full or the collector fails.
+    """
+    KINDS = {"internal": 1, "server": 2, "client": 3}
+
+    def __init__(self, endpoint, headers=None, service_name="ai-services", batch_size=512, max_queue=10000,
+                 interval=2.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.headers = headers or {}
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """None unless OTEL_EXPORTER_OTLP_ENDPOINT is set; OTEL_EXPORTER_OTLP_HEADERS is "key=value,..."."""
+        endpoint = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+        if not endpoint:
+            return None
+        headers = dict(part.split("=", 1) for part in os.environ.get("OTEL_EXPORTER_OTLP_HEADERS", "").split(",")
+                       if "=" in part)
+        return cls(endpoint, headers, os.environ.get("OTEL_SERVICE_NAME", "ai-services"))
+
+    def export(self, spans):
+        for span in spans:
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                self.dropped += 1
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        import httpx
+        with httpx.Client(timeout=10) as client:
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.interval
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                    except queue.Empty:
+                        break
+                try:
+                    client.post(self.url, json=self.payload(batch), headers=self.headers).raise_for_status()
+                except Exception as e:
+                    self.dropped += len(batch)
+                    print(f"OTLP export of {len(batch)} spans failed: {e}")
+
+    def payload(self, spans):
+        return {"resourceSpans": [{
+            "resource": {"attributes": _attributes({"service.name": self.service_name})},
+            "scopeSpans": [{"scope": {"name": "ai-services"}, "spans": [self._span(span) for span in spans]}],
+        }]}
+
+    def _span(self, span):
+        start = int(span.start * 1e9)
+        otlp = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": self.KINDS.get(span.kind, 1),
+            "startTimeUnixNano": str(start),
+            "endTimeUnixNano": str(start + int(span.duration * 1e9)),
+            "attributes": _attributes(span.attributes),
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            otlp["parentSpanId"] = span.parent_id
+        return otlp
+
+
+def _attributes(attributes):
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        result.append({"key": key, "value": typed})
+    return result
+
+
+class Tracer:
+    def __init__(self, exporters=(), sample_rate=1.0):
+        self.exporters = list(exporters)
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def from_env(cls, buffer):
+        """TRACE_SAMPLE_RATE (0 to 1) and the optional OTLP exporter; buffer is the /debug/traces ring buffer."""
+        exporters = [buffer]
+        otlp = OTLPExporter.from_env()
+        if otlp is not None:
+            exporters.append(otlp)
+        return cls(exporters, float(os.environ.get("TRACE_SAMPLE_RATE", "1")))
+
+    def current(self):
+        return _current.get()
+
+    def start_span(self, name, kind="internal", traceparent=None, **attributes):
+        """
+        Starts a span under the current one without making it current; call span.end().
+        Without a current span a new trace starts if it is sampled, continuing
+        `traceparent` when given.
+        """
+        parent = _current.get()
+        if parent is NOOP_SPAN:
+            return NOOP_SPAN
+        if parent is not None:
+            return Span(name, parent.trace_id, parent.span_id, kind, attributes, parent._trace)
+        match = TRACEPARENT.match(traceparent or "")
+        if match and not int(match.group(3), 16) & SAMPLED_FLAG:
+            return NOOP_SPAN
+        if random.random() >= self.sample_rate:
+            return NOOP_SPAN
+        if match:
+            trace_id, parent_id = match.group(1), match.group(2)
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+        span = Span(name, trace_id, parent_id, kind, attributes, None)
+        span._trace = _Trace(self, span.span_id)
+        return span
+
+    def activate(self, span):
+        """Makes span the current span; returns a token for deactivate()."""
+        return _current.set(span)
+
+    def deactivate(self, token):
+        _current.reset(token)
+
+    @contextmanager
+    def span(self, name, kind="internal", **attributes):
+        """Runs the block in a new current span, which records the block's exception if it raises."""
+        span = self.start_span(name, kind, **attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.end(e)
+            raise
+        finally:
+            _current.reset(token)
+            span.end()
+
+    def export(self, spans):
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception as e:
+                print(f"Trace exporter {type(exporter).__name__} failed: {e}")
+
+
+def iterate_in(span, iterable):
+    """
+    Yields from iterable with span current while each item is produced, e.g. for a
+    response body that is streamed after its request handler returned.
+    """
+    iterator = iter(iterable)
+    try:
+        while True:
+            token = _current.set(span)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _current.reset(token)
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+buffer = RingBufferExporter(int(os.environ.get("TRACE_BUFFER_SIZE", "200")))
+tracer = Tracer.from_env(buffer)
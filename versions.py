@@ -0,0 +1,67 @@
+"""
+Version counters for HTTP validators (ETags) that every server process agrees on.
+
+A counter lives in a small file in the instance folder. Writers call bump() after
+committing a change; readers call value(), which costs one stat() while the file is
+unchanged, so an If-None-Match request can be answered without touching the database.
+Every bump also writes a new random token next to the counter. Two processes bumping
+at the same moment may both write the same counter, but never the same version, and a
+counter that starts over (a fresh instance folder) never repeats an ETag a client may
+still have cached.
+"""
+import os
+import secrets
+import threading
+
+
+class VersionCounter:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stat = None
+        self._value = None
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                token, counter = f.read().split()
+            return token, int(counter)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, token, counter):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.{threading.get_ident()}"
+        with open(temporary, "w") as f:
+            f.write(f"{token} {counter}\n")
+        # Replacing the file gives it a new inode, which value() notices even when the
+        # modification time does not change.
+        os.replace(temporary, self.path)
+
+    def value(self):
+        """The current version as a string, e.g. "7-3f9c1a2b"."""
+        with self._lock:
+            while True:
+                try:
+                    stat = os.stat(self.path)
+                except FileNotFoundError:
+                    self._write(secrets.token_hex(4), 0)
+                    continue
+                key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                if key == self._stat:
+                    return self._value
+                # Read after stat: if the file is replaced in between, the next call
+                # sees a new stat and reads again.
+                current = self._read()
+                if current is not None:
+                    self._stat, self._value = key, f"{current[1]}-{current[0]}"
+                    return self._value
+                self._write(secrets.token_hex(4), 0)
+
+    def bump(self):
+        """Moves to a new version and returns it."""
+        with self._lock:
+            _, counter = self._read() or (None, 0)
+            self._write(secrets.token_hex(4), counter + 1)
+            self._stat = None
+        return self.value()
@@ -0,0 +1,244 @@
+"""
+Idempotent webhook ingestion.
+
+A webhook request only records the event, keyed by the provider's event id, and is
+acknowledged as soon as that insert commits; a delivery whose id is already recorded
+(a provider retry) is acknowledged without writing anything. EventApplier then applies
+recorded events in the background: each round takes up to `batch_size` pending events
+in the provider's order and applies them all in one transaction. If one of them cannot
+be applied, the round is redone with a savepoint per event, so that only that event is
+held back: it is retried with exponential backoff, and marked failed once it has failed
+`max_attempts` times. requeue_failed() puts failed events back in the queue (e.g. after a
+fix is deployed); the app exposes it as `flask requeue-stripe-events`.
+
+The event table is a Flask-SQLAlchemy model with the columns id, type, payload (the
+event JSON), status ('pending', 'applied' or 'failed'), error, attempts (failed
+attempts so far), retry_at (epoch seconds before which a retried event is not taken),
+created (the provider's timestamp) and received_at (epoch seconds).
+"""
+import importlib
+import json
+import os
+import threading
+import time
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+PURGE_INTERVAL = 3600
+_UNSET = object()
+
+
+class EventApplier:
+    def __init__(self, app, db, writes, model, apply, on_applied=None, batch_size=500, poll_interval=5.0,
+                 retention=30 * 86400, max_attempts=5, retry_delay=60.0, clock=time.time):
+        """
+        writes is the WriteQueue that runs the transactions. apply(event) applies one
+        decoded event with db.session and returns a value that is passed, together with
+        the rest of the batch's non-None values, to on_applied once the batch has
+        committed (e.g. to invalidate caches). Applied events are kept for `retention`
+        seconds so that late retries are still recognized. An event that cannot be applied
+        is retried after retry_delay seconds, doubling after each further failure.
+        """
+        self.app = app
+        self.db = db
+        self.writes = writes
+        self.model = model
+        self.apply = apply
+        self.on_applied = on_applied
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._applying = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._started_pid = None
+        self._last_purge = 0.0
+        self._insert = _UNSET
+        self.batches = 0
+        self.duplicates = 0
+
+    @classmethod
+    def from_env(cls, app, db, writes, model, apply, on_applied=None):
+        """
+        STRIPE_EVENT_BATCH, STRIPE_EVENT_POLL_INTERVAL (seconds), STRIPE_EVENT_RETENTION (days),
+        STRIPE_EVENT_MAX_ATTEMPTS and STRIPE_EVENT_RETRY_DELAY (seconds).
+        """
+        return cls(
+            app, db, writes, model, apply, on_applied,
+            batch_size=int(os.environ.get("STRIPE_EVENT_BATCH", "500")),
+            poll_interval=float(os.environ.get("STRIPE_EVENT_POLL_INTERVAL", "5")),
+            retention=float(os.environ.get("STRIPE_EVENT_RETENTION", "30")) * 86400,
+            max_attempts=int(os.environ.get("STRIPE_EVENT_MAX_ATTEMPTS", "5")),
+            retry_delay=float(os.environ.get("STRIPE_EVENT_RETRY_DELAY", "60")),
+        )
+
+    def record(self, event_id, event_type, payload, created=None):
+        """
+        Stores an event for the applier and wakes it. Returns False if the event was
+        already recorded. payload is the event JSON as received.
+        """
+        model, session = self.model, self.db.session
+        row = {"id": event_id, "type": event_type, "payload": payload, "status": "pending",
+               "attempts": 0, "created": created, "received_at": self.clock()}
+        statement = self._insert_statement()
+
+        def insert():
+            if statement is not None:
+                return session.execute(statement, row).rowcount == 1
+            if session.get(model, event_id) is not None:
+                return False
+            session.add(model(**row))
+            session.flush()
+            return True
+
+        try:
+            recorded = self.writes.run(insert)
+        except IntegrityError:
+            # Another process recorded the same delivery in the meantime.
+            recorded = False
+        if not recorded:
+            self.duplicates += 1
+        # A retry may be all that is left of an event that a crashed process recorded, so
+        # duplicates wake the applier too.
+        self.ensure_started()
+        self._wakeup.set()
+        return recorded
+
+    def _insert_statement(self):
+        """INSERT ... ON CONFLICT DO NOTHING where the dialect has it: one statement, and duplicates insert nothing."""
+        if self._insert is _UNSET:
+            dialect = self.db.engine.dialect.name
+            self._insert = None
+            if dialect in ("sqlite", "postgresql"):
+                insert = importlib.import_module(f"sqlalchemy.dialects.{dialect}").insert
+                self._insert = insert(self.model.__table__).on_conflict_do_nothing()
+        return self._insert
+
+    def _apply_batch(self):
+        model, session = self.model, self.db.session
+        events = (session.query(model.id, model.type, model.payload, model.attempts)
+                  .filter(model.status == "pending",
+                          or_(model.retry_at.is_(None), model.retry_at <= self.clock()))
+                  .order_by(model.created, model.received_at)
+                  .limit(self.batch_size)
+                  # Postgres: processes applying at the same time take different events.
+                  .with_for_update(skip_locked=True).all())
+        if not events:
+            return 0, []
+        try:
+            # Events rarely fail, so the whole batch is tried under a single savepoint first.
+            with session.begin_nested():
+                results = [self.apply(json.loads(event.payload)) for event in events]
+            updates = [{"id": event.id, "status": "applied"} for event in events]
+        except Exception:
+            results, updates = self._apply_one_by_one(events)
+        session.execute(update(model), updates)
+        return len(events), [result for result in results if result is not None]
+
+    def _apply_one_by_one(self, events):
+        session = self.db.session
+        results, updates = [], []
+        for event in events:
+            try:
+                with session.begin_nested():
+                    results.append(self.apply(json.loads(event.payload)))
+                updates.append({"id": event.id, "status": "applied"})
+            except Exception as e:
+                updates.append(self._failure(event, e))
+        return results, updates
+
+    def _failure(self, event, error):
+        attempts = (event.attempts or 0) + 1
+        if attempts >= self.max_attempts:
+            print(f"Error applying webhook event {event.id} ({event.type}), giving up after {attempts} attempts: {error}")
+            return {"id": event.id, "status": "failed", "error": str(error), "attempts": attempts}
+        delay = self.retry_delay * 2 ** (attempts - 1)
+        print(f"Error applying webhook event {event.id} ({event.type}), retrying in {delay:.0f}s: {error}")
+        return {"id": event.id, "status": "pending", "error": str(error), "attempts": attempts,
+                "retry_at": self.clock() + delay}
+
+    def apply_pending(self):
+        """Applies one batch of pending events and returns how many were taken."""
+        with self._applying:
+            count, results = self.writes.run(self._apply_batch)
+            if count:
+                self.batches += 1
+            if results and self.on_applied is not None:
+                self.on_applied(results)
+            return count
+
+    def drain(self):
+        """Applies pending events until none are left; returns how many were taken."""
+        total = 0
+        while True:
+            count = self.apply_pending()
+            total += count
+            if count < self.batch_size:
+                return total
+
+    def requeue_failed(self, event_ids=None):
+        """
+        Puts failed events (all of them, or those in event_ids) back in the queue with a
+        fresh set of attempts and returns how many were requeued.
+        """
+        def requeue():
+            query = self.db.session.query(self.model).filter(self.model.status == "failed")
+            if event_ids is not None:
+                query = query.filter(self.model.id.in_(list(event_ids)))
+            return query.update({"status": "pending", "attempts": 0, "retry_at": None}, synchronize_session=False)
+
+        count = self.writes.run(requeue)
+        if count:
+            self._wakeup.set()
+        return count
+
+    def purge(self):
+        """Deletes applied events older than the retention period and returns how many were removed."""
+        self._last_purge = self.clock()
+        cutoff = self.clock() - self.retention
+        return self.writes.run(lambda: self.db.session.query(self.model).filter(
+            self.model.status == "applied", self.model.received_at < cutoff).delete())
+
+    def _run(self):
+        with self.app.app_context():
+            while not self._stopping.is_set():
+                try:
+                    if self.clock() - self._last_purge > PURGE_INTERVAL:
+                        self.purge()
+                    self.drain()
+                except Exception as e:
+                    print(f"Webhook applier error: {e}")
+                # Events recorded by other processes are picked up on the next poll.
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def ensure_started(self):
+        """Starts the applier thread of this process on first use (again after a fork)."""
+        if self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="webhook-applier", daemon=True)
+            self._thread.start()
+            self._started_pid = os.getpid()
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+        self._started_pid = None
+
+    def stats(self):
+        with self.app.app_context():
+            rows = self.db.session.query(self.model.status, self.db.func.count()).group_by(self.model.status).all()
+        return {"events": dict(rows), "batches": self.batches, "duplicates": self.duplicates}
@@ -0,0 +1,147 @@
+"""
+Parser for the website spec accepted by generate_website.
+
+A spec is a list of "key: value" lines. Top-level lines set site fields (title, header,
+footer); a "section: <title>" line opens a section, and the indented lines after it
+set that section's fields (text, images):
+
+    title: My Shop
+    section: Welcome
+      text: Fresh bread every morning
+      images: 2
+
+tokenize() walks the spec once and parse() builds the tree from the tokens as they come,
+so a spec is read in a single pass. Errors do not stop the parse: every bad line is
+reported with its line number. emit_main() renders the sections by collecting the
+pieces in a list and joining them once, which stays linear in the size of the spec.
+"""
+from typing import Iterator, Optional
+
+MAX_IMAGES = 10
+SITE_FIELDS = ("title", "header", "footer")
+
+# SpecError kinds
+INVALID_FORMAT = "invalid_format"
+OUTSIDE_SECTION = "outside_section"
+INVALID_IMAGES = "invalid_images"
+IMAGES_OUT_OF_RANGE = "images_out_of_range"
+
+
+class Token:
+    """One non-blank spec line."""
+    __slots__ = ("line", "indent", "key", "value")
+
+    def __init__(self, line: int, indent: int, key: Optional[str], value: str):
+        self.line = line
+        self.indent = indent
+        self.key = key  # None when the line has no ':'
+        self.value = value
+
+
+class SpecError:
+    __slots__ = ("line", "kind")
+
+    def __init__(self, line: int, kind: str):
+        self.line = line
+        self.kind = kind
+
+    def __eq__(self, other):
+        return isinstance(other, SpecError) and (self.line, self.kind) == (other.line, other.kind)
+
+    def __repr__(self):
+        return f"<SpecError line {self.line}: {self.kind}>"
+
+
+class Section:
+    __slots__ = ("title", "line", "text", "images", "images_value", "images_line")
+
+    def __init__(self, title: str, line: int):
+        self.title = title
+        self.line = line
+        self.text: Optional[str] = None
+        self.images = 0
+        self.images_value: Optional[str] = None  # as written; checked when the section ends
+        self.images_line = 0
+
+
+class Site:
+    __slots__ = ("title", "header", "footer", "sections")
+
+    def __init__(self):
+        self.title: Optional[str] = None
+        self.header: Optional[str] = None
+        self.footer: Optional[str] = None
+        self.sections: list[Section] = []
+
+
+def tokenize(spec: str) -> Iterator[Token]:
+    for number, line in enumerate(spec.splitlines(), 1):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        key, colon, value = stripped.partition(":")
+        yield Token(number, len(line) - len(line.lstrip(" ")),
+                    key.strip().lower() if colon else None, value.strip())
+
+
+def _close(section: Optional[Section], errors: list[SpecError]) -> None:
+    # A key given twice keeps its last value, so images are only checked once the
+    # section is complete.
+    if section is None or section.images_value is None:
+        return
+    try:
+        count = int(section.images_value)
+    except ValueError:
+        errors.append(SpecError(section.images_line, INVALID_IMAGES))
+        return
+    if not 0 <= count <= MAX_IMAGES:
+        errors.append(SpecError(section.images_line, IMAGES_OUT_OF_RANGE))
+        return
+    section.images = count
+
+
+def parse(spec: str) -> tuple[Site, list[SpecError]]:
+    """The site described by spec, and every error found in it, in line order."""
+    site, errors = Site(), []
+    section = None
+    for token in tokenize(spec):
+        if token.key is None:
+            errors.append(SpecError(token.line, INVALID_FORMAT))
+        elif token.indent == 0:
+            _close(section, errors)
+            section = None
+            if token.key == "section":
+                section = Section(token.value, token.line)
+                site.sections.append(section)
+            elif token.key in SITE_FIELDS:
+                setattr(site, token.key, token.value)
+        elif section is None:
+            errors.append(SpecError(token.line, OUTSIDE_SECTION))
+        elif token.key == "text":
+            section.text = token.value
+        elif token.key == "images":
+            section.images_value, section.images_line = token.value, token.line
+    _close(section, errors)
+    errors.sort(key=lambda error: error.line)
+    return site, errors
+
+
+def emit_main(site: Site, image_tags: list[str]) -> str:
+    """
+    The <main> content of the page. image_tags[n] is the markup of n images, so alt
+    texts are rendered (and translated) once rather than per image.
+    """
+    parts = []
+    append = parts.append
+    for section in site.sections:
+        append("    <section>\n      <h2>")
+        append(section.title)
+        append("</h2>\n")
+        if section.text is not None:
+            append("      <p>")
+            append(section.text)
+            append("</p>\n")
+        if section.images:
+            append(image_tags[section.images])
+        append("    </section>\n")
+    return "".join(parts)